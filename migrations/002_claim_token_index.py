@@ -0,0 +1,22 @@
+"""
+Migration 002: Claim Token Index
+--------------------------------
+The worker claims jobs in batches by stamping a `claim_token` with
+update_many and then fetching by that token. Index it so the fetch
+doesn't scan the whole generations collection.
+"""
+
+from pymongo.database import Database
+import pymongo
+
+
+def up(db: Database):
+    print("  - Creating claim_token index on generations...")
+
+    # Sparse: only claimed jobs carry a token.
+    db.generations.create_index(
+        [("claim_token", pymongo.ASCENDING)],
+        sparse=True,
+    )
+
+    print("  - Claim token index created successfully.")
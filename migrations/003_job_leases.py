@@ -0,0 +1,20 @@
+"""
+Migration 003: Job Lease Index
+------------------------------
+The worker's reaper periodically looks for PROCESSING jobs whose
+`leased_until` is in the past and returns them to PENDING.
+"""
+
+from pymongo.database import Database
+import pymongo
+
+
+def up(db: Database):
+    print("  - Creating lease index on generations...")
+
+    db.generations.create_index([
+        ("status", pymongo.ASCENDING),
+        ("leased_until", pymongo.ASCENDING)
+    ])
+
+    print("  - Lease index created successfully.")
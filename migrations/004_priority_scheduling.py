@@ -0,0 +1,22 @@
+"""
+Migration 004: Priority Scheduling Index
+----------------------------------------
+The worker picks PENDING jobs by priority tier, then groups them per owner
+(user_id, falling back to resume_id) for fair-share round-robin.
+"""
+
+from pymongo.database import Database
+import pymongo
+
+
+def up(db: Database):
+    print("  - Creating priority scheduling index on generations...")
+
+    # Serves the scheduler's $match + $sort without an in-memory sort
+    db.generations.create_index([
+        ("status", pymongo.ASCENDING),
+        ("priority", pymongo.DESCENDING),
+        ("createdAt", pymongo.ASCENDING)
+    ])
+
+    print("  - Priority scheduling index created successfully.")
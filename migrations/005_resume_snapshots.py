@@ -0,0 +1,59 @@
+"""
+Migration 005: Content-Addressed Resume Snapshots
+-------------------------------------------------
+Generation jobs can reference (resume_id, version_number) instead of
+embedding resume_data. Payloads are stored once per distinct content in
+`resume_snapshots` (keyed by SHA-256 of the canonical JSON), and each
+version records its `content_hash`.
+
+Backfills hashes + snapshots for existing versions. Existing `data`
+fields are left in place for readers that still expect them.
+"""
+
+from pymongo.database import Database
+import pymongo
+from pymongo import UpdateOne
+
+from src.snapshots import content_hash
+
+
+BATCH_SIZE = 500
+
+
+def up(db: Database):
+    print("  - Creating snapshot indexes...")
+
+    # Resolve a version's snapshot by hash (and find versions sharing content)
+    db.resumeversions.create_index([("content_hash", pymongo.ASCENDING)], sparse=True)
+
+    print("  - Backfilling content hashes for existing versions...")
+    cursor = db.resumeversions.find(
+        {"content_hash": {"$exists": False}, "data": {"$exists": True}},
+        {"data": 1},
+    )
+
+    snapshot_ops, version_ops, total = [], [], 0
+    for version in cursor:
+        digest = content_hash(version["data"])
+        snapshot_ops.append(UpdateOne(
+            {"_id": digest},
+            {"$setOnInsert": {"data": version["data"]}},
+            upsert=True,
+        ))
+        version_ops.append(UpdateOne(
+            {"_id": version["_id"]},
+            {"$set": {"content_hash": digest}},
+        ))
+        if len(version_ops) >= BATCH_SIZE:
+            db.resume_snapshots.bulk_write(snapshot_ops, ordered=False)
+            db.resumeversions.bulk_write(version_ops, ordered=False)
+            total += len(version_ops)
+            snapshot_ops, version_ops = [], []
+
+    if version_ops:
+        db.resume_snapshots.bulk_write(snapshot_ops, ordered=False)
+        db.resumeversions.bulk_write(version_ops, ordered=False)
+        total += len(version_ops)
+
+    distinct = db.resume_snapshots.estimated_document_count()
+    print(f"  - Hashed {total} version(s); {distinct} distinct snapshot(s) stored.")
@@ -0,0 +1,37 @@
+"""
+Migration 006: Generation Retention (TTL)
+-----------------------------------------
+Terminal jobs carry `expireAt` (set by the worker from GENERATIONS_TTL_DAYS)
+and MongoDB's TTL monitor deletes them once that time passes. Jobs without
+`expireAt` (pending/processing, or TTL disabled) are never expired.
+
+Backfills `expireAt` for jobs that finished before this migration.
+Run scripts/retention.py --archive-days N first if you want them exported
+to cold storage before they expire.
+"""
+
+from pymongo.database import Database
+import pymongo
+
+from src.config import Config
+
+
+def up(db: Database):
+    print("  - Creating TTL index on generations.expireAt...")
+
+    db.generations.create_index(
+        [("expireAt", pymongo.ASCENDING)],
+        expireAfterSeconds=0,
+    )
+
+    ttl_days = Config.get_instance().GENERATIONS_TTL_DAYS
+    if ttl_days <= 0:
+        print("  - GENERATIONS_TTL_DAYS is 0; not backfilling expireAt.")
+        return
+
+    ttl_ms = int(ttl_days * 86400 * 1000)
+    result = db.generations.update_many(
+        {"status": {"$in": ["COMPLETED", "FAILED"]}, "expireAt": {"$exists": False}},
+        [{"$set": {"expireAt": {"$add": [{"$ifNull": ["$updatedAt", "$$NOW"]}, ttl_ms]}}}],
+    )
+    print(f"  - Backfilled expireAt on {result.modified_count} finished job(s).")
@@ -0,0 +1,25 @@
+"""
+Migration 007: Per-Owner Queue Indexes
+--------------------------------------
+After ranking (owner, priority) groups, the worker reads each selected
+group's oldest PENDING jobs with a small query per owner (user_id, falling
+back to resume_id, then the job's own _id). These indexes serve those
+queries in createdAt order, so a large backlog is never scanned or sorted.
+"""
+
+from pymongo.database import Database
+import pymongo
+
+
+def up(db: Database):
+    print("  - Creating per-owner queue indexes on generations...")
+
+    for owner_field in ("user_id", "resume_id"):
+        db.generations.create_index([
+            ("status", pymongo.ASCENDING),
+            (owner_field, pymongo.ASCENDING),
+            ("priority", pymongo.DESCENDING),
+            ("createdAt", pymongo.ASCENDING)
+        ])
+
+    print("  - Per-owner queue indexes created successfully.")
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+scripts/bench.py
+----------------
+Benchmarks for the render/compile hot path, with a stored result history
+so a slowdown fails the run.
+
+    escape          LatexSanitizer.escape on one large synthetic string (--escape-kb)
+    sanitize        LatexSanitizer.sanitize_payload on a synthetic resume (--scale)
+    render          ResumeGenerator.generate_tex_from_data (sanitize + Jinja render)
+    validate        Draft7Validator + FormatChecker over the same resume
+    compile_cold    first PDFCompiler.compile_tex of the run (fonts/format not cached yet)
+    compile_warm    later compiles of the same .tex
+    worker_e2e      seconds per job through real src.worker processes and MongoDB
+                    (only with --mongo-uri or --start-mongod)
+
+Each benchmark reports the median seconds per operation over --rounds
+rounds (each round repeats the operation for at least --min-time). Results
+are appended to --history (JSON lines, one run per line); a benchmark
+fails when its median is more than --threshold slower than the median of
+the last --window runs recorded on the same host. Regressed results are
+recorded under `regressed` and left out of later baselines, so a slow run
+can't drag the baseline towards itself; --accept records them as normal
+results once a slowdown is intended. compile_cold is a single sample and
+is recorded but never checked. Benchmarks whose tools
+are missing (pdflatex, MongoDB) are skipped.
+
+Usage (inside Docker):
+    docker-compose run --rm builder python scripts/bench.py
+    docker-compose run --rm builder python scripts/bench.py --only escape,render --rounds 10
+    docker-compose run --rm builder python scripts/bench.py --start-mongod --jobs 100 --workers 2
+    docker-compose run --rm builder python scripts/bench.py --threshold 0.1 --no-record
+    docker-compose run --rm builder python scripts/bench.py --only render --accept
+
+Exit codes:
+    0 — no regressions
+    1 — at least one benchmark regressed past the threshold (unless --accept)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+# Resolve project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jsonschema import Draft7Validator, FormatChecker
+
+from src.utils import LatexSanitizer
+from scripts.synthetic import synthetic_resume, synthetic_text
+
+DEFAULT_HISTORY = PROJECT_ROOT / ".cache" / "bench" / "history.jsonl"
+
+# Recorded, but too noisy (one sample) to gate on
+UNCHECKED = {"compile_cold"}
+
+# Results shared between benchmarks of one run (the cold and warm compiles)
+_cache: dict = {}
+
+
+class Skipped(Exception):
+    """A benchmark's prerequisites (pdflatex, MongoDB) are not available."""
+
+
+# -----------------------------------------------------------------------
+# Measurement
+# -----------------------------------------------------------------------
+
+def measure(func: Callable[[], object], rounds: int, min_time: float) -> list[float]:
+    """Seconds per call for each round; a round repeats `func` for at least `min_time`."""
+    func()  # warm-up (imports, template compilation, regex caches)
+    samples = []
+    for _ in range(rounds):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        samples.append(elapsed / calls)
+    return samples
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the compiler's per-build prints while timing."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# -----------------------------------------------------------------------
+# Benchmarks
+# -----------------------------------------------------------------------
+
+def bench_escape(args) -> list[float]:
+    text = synthetic_text(random.Random(args.seed), args.escape_kb * 1024, unicode=True, special=True)
+    return measure(lambda: LatexSanitizer.escape(text), args.rounds, args.min_time)
+
+
+def bench_sanitize(args) -> list[float]:
+    data = synthetic_resume(random.Random(args.seed), scale=args.scale, unicode=True, special=True)
+    return measure(lambda: LatexSanitizer.sanitize_payload(data), args.rounds, args.min_time)
+
+
+def bench_render(args) -> list[float]:
+    from src.generator import ResumeGenerator
+
+    generator = ResumeGenerator()
+    data = synthetic_resume(random.Random(args.seed), scale=args.scale, unicode=True, special=True)
+    return measure(lambda: generator.generate_tex_from_data(data), args.rounds, args.min_time)
+
+
+def bench_validate(args) -> list[float]:
+    with open(PROJECT_ROOT / "schema" / "resume.schema.json", "r", encoding="utf-8") as f:
+        validator = Draft7Validator(json.load(f), format_checker=FormatChecker())
+    data = synthetic_resume(random.Random(args.seed), scale=args.scale, unicode=True, special=True)
+    if any(validator.iter_errors(data)):
+        raise RuntimeError("synthetic resume does not match the schema")
+    return measure(lambda: list(validator.iter_errors(data)), args.rounds, args.min_time)
+
+
+def _compile_samples(args) -> dict[str, list[float]]:
+    """Both compile benchmarks share one build: the first compile is cold, the rest warm."""
+    if shutil.which("pdflatex") is None:
+        raise Skipped("pdflatex not on PATH")
+    if "compile" not in _cache:
+        from src.compiler import PDFCompiler
+        from src.generator import ResumeGenerator
+
+        data = synthetic_resume(random.Random(args.seed), scale=1, unicode=True, special=True)
+        build_dir = Path(tempfile.mkdtemp(prefix="bench-compile-"))
+        try:
+            tex_path = build_dir / "bench.tex"
+            tex_path.write_text(ResumeGenerator().generate_tex_from_data(data), encoding="utf-8")
+            compiler = PDFCompiler()
+            samples = []
+            with quiet():
+                for _ in range(1 + args.compile_rounds):
+                    start = time.perf_counter()
+                    compiler.compile_tex(tex_path)
+                    samples.append(time.perf_counter() - start)
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+        _cache["compile"] = {"compile_cold": samples[:1], "compile_warm": samples[1:]}
+    return _cache["compile"]
+
+
+def bench_compile_cold(args) -> list[float]:
+    return _compile_samples(args)["compile_cold"]
+
+
+def bench_compile_warm(args) -> list[float]:
+    return _compile_samples(args)["compile_warm"]
+
+
+def bench_worker_e2e(args) -> list[float]:
+    if not (args.mongo_uri or args.start_mongod):
+        raise Skipped("needs --mongo-uri or --start-mongod")
+    if shutil.which("pdflatex") is None:
+        raise Skipped("pdflatex not on PATH")
+
+    from pymongo import MongoClient
+    from scripts.worker_harness import HARNESS_TAG, insert_jobs, spawn_workers, start_mongod
+
+    mongod = None
+    if args.start_mongod:
+        mongod, uri = start_mongod(args.mongod_port)
+    else:
+        uri = args.mongo_uri
+
+    client = MongoClient(uri)
+    db = client.get_default_database(default="resume_builder")
+    db.generations.delete_many({"harness": HARNESS_TAG})
+    workers = spawn_workers(args.workers, uri)
+    try:
+        time.sleep(3)  # let each worker open its change stream
+        data = synthetic_resume(random.Random(args.seed), scale=1, unicode=True, special=True)
+        start = time.monotonic()
+        insert_jobs(db, data, args.jobs, resumes=max(1, args.jobs // 2))
+        done = 0
+        while time.monotonic() - start < args.e2e_timeout:
+            done = db.generations.count_documents(
+                {"harness": HARNESS_TAG, "status": {"$in": ["COMPLETED", "FAILED"]}}
+            )
+            if done >= args.jobs:
+                break
+            time.sleep(0.2)
+        elapsed = time.monotonic() - start
+        if done < args.jobs:
+            raise RuntimeError(f"only {done}/{args.jobs} jobs finished within {args.e2e_timeout:.0f}s")
+        return [elapsed / args.jobs]
+    finally:
+        for proc in workers:
+            proc.terminate()
+        for proc in workers:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        db.generations.delete_many({"harness": HARNESS_TAG})
+        client.close()
+        if mongod is not None:
+            mongod.terminate()
+            mongod.wait(timeout=10)
+
+
+BENCHMARKS: dict[str, Callable] = {
+    "escape": bench_escape,
+    "sanitize": bench_sanitize,
+    "render": bench_render,
+    "validate": bench_validate,
+    "compile_cold": bench_compile_cold,
+    "compile_warm": bench_compile_warm,
+    "worker_e2e": bench_worker_e2e,
+}
+
+
+# -----------------------------------------------------------------------
+# History and regression check
+# -----------------------------------------------------------------------
+
+def load_history(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    runs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    runs.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return runs
+
+
+def append_history(path: Path, run: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run) + "\n")
+
+
+def baselines(history: list[dict], host: str, window: int) -> dict[str, float]:
+    """Median of each benchmark's last `window` recorded values on `host`, skipping regressed ones."""
+    values: dict[str, list[float]] = {}
+    for run in history:
+        if run.get("host") != host:
+            continue
+        regressed = set(run.get("regressed", []))
+        for name, seconds in run.get("results", {}).items():
+            if name not in regressed:
+                values.setdefault(name, []).append(seconds)
+    return {name: statistics.median(series[-window:]) for name, series in values.items() if series}
+
+
+def regressions(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[tuple[str, float, float]]:
+    """(name, current, baseline) for each benchmark slower than baseline * (1 + threshold)."""
+    slower = []
+    for name, seconds in results.items():
+        if name in UNCHECKED or name not in baseline:
+            continue
+        if seconds > baseline[name] * (1 + threshold):
+            slower.append((name, seconds, baseline[name]))
+    return slower
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, factor in (("s", 1), ("ms", 1e3), ("µs", 1e6)):
+        if seconds * factor >= 1:
+            return f"{seconds * factor:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+# -----------------------------------------------------------------------
+# Main
+# -----------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the render/compile hot path and check for regressions")
+    parser.add_argument("--only", help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per benchmark (default: 5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round (default: 0.2)")
+    parser.add_argument("--compile-rounds", type=int, default=5, help="Warm pdflatex compiles (default: 5)")
+    parser.add_argument("--escape-kb", type=int, default=256, help="Size of the escape() input in KB (default: 256)")
+    parser.add_argument("--scale", type=int, default=4, help="Synthetic resume size multiplier (default: 4)")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the synthetic payloads")
+    parser.add_argument("--mongo-uri", help="Replica set for worker_e2e (change streams required)")
+    parser.add_argument("--start-mongod", action="store_true", help="Launch a throwaway replica set for worker_e2e")
+    parser.add_argument("--mongod-port", type=int, default=27118, help="Port for --start-mongod")
+    parser.add_argument("--jobs", type=int, default=50, help="Jobs for worker_e2e (default: 50)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for worker_e2e (default: 1)")
+    parser.add_argument("--e2e-timeout", type=float, default=600, help="Seconds to wait for worker_e2e jobs")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY, help=f"Result history (default: {DEFAULT_HISTORY.relative_to(PROJECT_ROOT)})")
+    parser.add_argument("--window", type=int, default=5, help="Past runs the baseline is the median of (default: 5)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs baseline (default: 0.25 = 25%%)")
+    parser.add_argument("--no-record", action="store_true", help="Don't append this run to the history")
+    parser.add_argument("--accept", action="store_true", help="Record this run as a baseline even if it regressed (exits 0)")
+    args = parser.parse_args()
+
+    names = list(BENCHMARKS)
+    if args.only:
+        names = [name.strip() for name in args.only.split(",") if name.strip()]
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    host = platform.node()
+    baseline = baselines(load_history(args.history), host, args.window)
+
+    results: dict[str, float] = {}
+    print(f"\n{'benchmark':<14} {'median':>12} {'min':>12} {'ops/s':>10} {'baseline':>12}")
+    for name in names:
+        try:
+            samples = BENCHMARKS[name](args)
+        except Skipped as e:
+            print(f"{name:<14} skipped ({e})")
+            continue
+        median = statistics.median(samples)
+        results[name] = median
+        base = _format_seconds(baseline[name]) if name in baseline else "-"
+        print(f"{name:<14} {_format_seconds(median):>12} {_format_seconds(min(samples)):>12} "
+              f"{1 / median:>10.1f} {base:>12}")
+
+    slower = regressions(results, baseline, args.threshold)
+    if results and not args.no_record:
+        run = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "host": host,
+            "python": platform.python_version(),
+            "revision": _git_revision(),
+            "results": results,
+        }
+        if slower and not args.accept:
+            run["regressed"] = [name for name, _, _ in slower]
+        append_history(args.history, run)
+
+    print()
+    if slower:
+        for name, seconds, base in slower:
+            print(f"REGRESSION: {name} {_format_seconds(seconds)} vs baseline {_format_seconds(base)} "
+                  f"(+{(seconds / base - 1) * 100:.0f}%, threshold {args.threshold * 100:.0f}%)")
+        if not args.accept:
+            sys.exit(1)
+        print("Accepted: recorded as baseline results." if not args.no_record else "Accepted (not recorded).")
+        return
+    print(f"No regressions (threshold {args.threshold * 100:.0f}% over the median of the last {args.window} runs on {host}).")
+
+
+if __name__ == "__main__":
+    main()
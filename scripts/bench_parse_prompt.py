@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_parse_prompt.py
+-----------------------------
+Input tokens and latency per parse: the old prompt (whole schema
+pretty-printed inline) vs the compact prompt + structured response_schema.
+
+Runs AIPipeline against a recorded fake client: every call replays a
+recorded model response (default: data/fs_resume.json) and reports
+usage_metadata the way Gemini does. Input tokens are estimated from the
+request (prompt text + response_schema in wire format + a fixed cost per
+PDF page), and latency is modelled as
+
+    base + input_tokens * per-input-token + output_tokens * per-output-token
+
+so the comparison is deterministic and needs no API key. Pass --live to
+run the same comparison against the real API instead (uses real quota).
+
+Usage (inside Docker):
+    docker-compose run --rm builder python scripts/bench_parse_prompt.py
+    docker-compose run --rm builder python scripts/bench_parse_prompt.py --runs 3 --time-scale 0.1
+    docker-compose run --rm builder python scripts/bench_parse_prompt.py --runs 20 --recording data/be_resume.json
+    docker-compose run --rm builder python scripts/bench_parse_prompt.py --live template_resume/template.pdf
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Resolve project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.ai_pipeline import AIPipeline
+
+SCHEMA_PATH = PROJECT_ROOT / "schema" / "resume.schema.json"
+
+# Gemini bills a PDF page as 258 tokens; ~4 characters per text token
+PDF_PAGE_TOKENS = 258
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, round(len(text) / CHARS_PER_TOKEN))
+
+
+class RecordedClient:
+    """
+    google-genai client surface (files / models / aio) replaying one recorded
+    response. Records the usage of every generate_content call in `calls`.
+    """
+
+    def __init__(self, response_text: str, pages: int = 1, base_latency: float = 0.25,
+                 input_token_latency: float = 0.00005, output_token_latency: float = 0.004,
+                 time_scale: float = 1.0):
+        self.response_text = response_text
+        self.pages = pages
+        self.time_scale = time_scale
+        self.base_latency = base_latency
+        self.input_token_latency = input_token_latency
+        self.output_token_latency = output_token_latency
+        self.calls: list[SimpleNamespace] = []
+
+        client = self
+
+        class Files:
+            def upload(self, file, config=None):
+                return SimpleNamespace(name=f"files/{Path(file).stem}", state=SimpleNamespace(name="ACTIVE"))
+
+            def get(self, name):
+                return SimpleNamespace(name=name, state=SimpleNamespace(name="ACTIVE"))
+
+            def delete(self, name):
+                pass
+
+        class Models:
+            def generate_content(self, model, contents, config=None):
+                response, latency = client._respond(contents, config)
+                time.sleep(latency)
+                return response
+
+        class AsyncFiles:
+            async def upload(self, file, config=None):
+                return Files().upload(file, config)
+
+            async def get(self, name):
+                return Files().get(name)
+
+            async def delete(self, name):
+                pass
+
+        class AsyncModels:
+            async def generate_content(self, model, contents, config=None):
+                response, latency = client._respond(contents, config)
+                await asyncio.sleep(latency)
+                return response
+
+        self.files = Files()
+        self.models = Models()
+        self.aio = SimpleNamespace(files=AsyncFiles(), models=AsyncModels())
+
+    def _respond(self, contents, config) -> tuple[SimpleNamespace, float]:
+        prompt_tokens = self.pages * PDF_PAGE_TOKENS
+        prompt_tokens += sum(estimate_tokens(part) for part in contents if isinstance(part, str))
+        schema = getattr(config, "response_schema", None)
+        if schema is not None:
+            wire = schema.model_dump(mode="json", by_alias=True, exclude_none=True)
+            prompt_tokens += estimate_tokens(json.dumps(wire, separators=(",", ":")))
+        output_tokens = estimate_tokens(self.response_text)
+
+        usage = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+        self.calls.append(usage)
+        latency = self.time_scale * (
+            self.base_latency
+            + prompt_tokens * self.input_token_latency
+            + output_tokens * self.output_token_latency
+        )
+        return SimpleNamespace(text=self.response_text, usage_metadata=usage), latency
+
+
+class UsageRecorder:
+    """Wraps a real client so prompt/output token counts can be read back per call."""
+
+    def __init__(self, client):
+        self.calls: list = []
+        self.files = client.files
+        recorder = self
+
+        class Models:
+            def generate_content(self, model, contents, config=None):
+                response = client.models.generate_content(model=model, contents=contents, config=config)
+                recorder.calls.append(response.usage_metadata)
+                return response
+
+        self.models = Models()
+        self.aio = client.aio
+
+
+def run(pipeline: AIPipeline, client, pdf_path: Path, runs: int) -> dict:
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        pipeline.parse_pdf_to_json(pdf_path)
+        latencies.append(time.perf_counter() - started)
+    usage = client.calls[-runs:]
+    return {
+        "prompt_tokens": statistics.mean(u.prompt_token_count or 0 for u in usage),
+        "output_tokens": statistics.mean(u.candidates_token_count or 0 for u in usage),
+        "p50_s": statistics.median(latencies),
+        "mean_s": statistics.mean(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse prompt size and latency: inline schema vs response_schema")
+    parser.add_argument("pdf", nargs="?", help="PDF to parse (required with --live; a placeholder is used otherwise)")
+    parser.add_argument("--runs", type=int, default=5, help="Parses per variant (default: 5)")
+    parser.add_argument("--recording", default=str(PROJECT_ROOT / "data" / "fs_resume.json"),
+                        help="Recorded model response to replay (default: data/fs_resume.json)")
+    parser.add_argument("--pages", type=int, default=1, help="PDF pages billed by the fake client (default: 1)")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Scale the fake client's simulated latency, e.g. 0.1 for a quick run (default: 1.0)")
+    parser.add_argument("--live", action="store_true", help="Call the real Gemini API instead of the recorded client")
+    args = parser.parse_args()
+
+    if args.live and not args.pdf:
+        parser.error("--live needs a PDF to parse")
+    if args.pdf and not Path(args.pdf).is_file():
+        parser.error(f"PDF not found: {args.pdf}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.pdf:
+            pdf_path = Path(args.pdf)
+        else:
+            pdf_path = Path(tmp) / "recorded.pdf"
+            pdf_path.write_bytes(b"%PDF-1.5 recorded")
+
+        results = {}
+        for label, inline_schema in (("before (inline schema)", True), ("after (response_schema)", False)):
+            if args.live:
+                from google import genai
+                client = UsageRecorder(genai.Client(api_key=os.environ["GEMINI_API_KEY"]))
+            else:
+                recording = Path(args.recording).read_text(encoding="utf-8")
+                client = RecordedClient(json.dumps(json.loads(recording)), pages=args.pages, time_scale=args.time_scale)
+            pipeline = AIPipeline(
+                SCHEMA_PATH, client=client, requests_per_minute=0, local_first=False,
+                inline_schema=inline_schema, repair_rounds=0, stream=False,
+            )
+            results[label] = run(pipeline, client, pdf_path, args.runs)
+
+    print(f"\n{'variant':<26}{'prompt tok':>12}{'output tok':>12}{'p50 s':>9}{'mean s':>9}")
+    for label, r in results.items():
+        print(f"{label:<26}{r['prompt_tokens']:>12.0f}{r['output_tokens']:>12.0f}{r['p50_s']:>9.3f}{r['mean_s']:>9.3f}")
+    before, after = results.values()
+    saved = 1 - after["prompt_tokens"] / before["prompt_tokens"]
+    print(f"\nInput tokens per parse: -{saved:.0%}; p50 latency {before['p50_s']:.3f}s -> {after['p50_s']:.3f}s\n")
+
+
+if __name__ == "__main__":
+    main()
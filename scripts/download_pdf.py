@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+scripts/download_pdf.py
+-----------------------
+Stream a generated PDF out of artifact storage (ARTIFACT_STORAGE: local,
+gridfs or s3).
+
+Accepts a generation job id (its stored PDF is looked up) or a storage ref
+(GridFS file id, S3 key, or output/ filename). The PDF is copied chunk by
+chunk, never loaded whole.
+
+Usage (inside Docker):
+    # Save a job's PDF into the current directory under its filename
+    docker-compose run --rm builder python scripts/download_pdf.py 65f1c0ffee0000000000abcd
+
+    # Save to an explicit path, or write to stdout with "-"
+    docker-compose run --rm builder python scripts/download_pdf.py 65f1c0ffee0000000000abcd -o /tmp/resume.pdf
+    docker-compose run --rm -T builder python scripts/download_pdf.py 65f1c0ffee0000000000abcd -o - > resume.pdf
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+from bson import ObjectId
+
+# Resolve project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config import Config
+from src.db import Database
+from src.storage import ArtifactNotFoundError, open_storage
+
+
+def resolve_ref(db, storage, identifier: str) -> tuple[str, str]:
+    """
+    Map a job id to (ref, filename) of its stored PDF; anything else is
+    taken as a storage ref.
+    """
+    if ObjectId.is_valid(identifier):
+        job = db.generations.find_one(
+            {"_id": ObjectId(identifier)},
+            {"status": 1, "output_filename": 1, "pdf_path": 1, storage.ref_field: 1},
+        )
+        if job is not None:
+            ref = storage.ref_from_job(job)
+            if ref is None:
+                raise ArtifactNotFoundError(
+                    f"Job {identifier} ({job.get('status')}) has no PDF in {storage.name} storage."
+                )
+            return ref, f"{job.get('output_filename') or identifier}.pdf"
+    filename = f"{identifier}.pdf" if ObjectId.is_valid(identifier) else Path(identifier).name
+    return identifier, filename
+
+
+def main():
+    config = Config.get_instance()
+
+    parser = argparse.ArgumentParser(description="Download a generated PDF from artifact storage.")
+    parser.add_argument("id", help="Generation job id, or a storage ref (GridFS id / S3 key / filename).")
+    parser.add_argument(
+        "-o", "--output",
+        default=None,
+        help="Destination file, or '-' for stdout (default: ./<filename>)."
+    )
+    args = parser.parse_args()
+
+    db = Database.get_db()
+    storage = open_storage(config, db)
+
+    try:
+        ref, filename = resolve_ref(db, storage, args.id)
+        if args.output == "-":
+            storage.download_to(ref, sys.stdout.buffer)
+            return
+
+        destination = Path(args.output) if args.output else Path.cwd() / filename
+        partial = destination.with_name(destination.name + ".part")
+        try:
+            with open(partial, "wb") as f:
+                storage.download_to(ref, f)
+            partial.replace(destination)
+        finally:
+            partial.unlink(missing_ok=True)
+    except ArtifactNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Saved {destination}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
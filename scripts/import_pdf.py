@@ -0,0 +1,98 @@
+"""
+scripts/import_pdf.py
+---------------------
+PDF resume(s) -> JSON -> our LaTeX layout -> PDF in artifact storage, in one
+pipelined run (src/import_pipeline.py). Parsing, validation, rendering and
+compiling happen in memory and overlap across inputs; no intermediate JSON
+is written unless --save-json is given.
+
+Usage (inside Docker):
+    docker-compose run --rm builder python scripts/import_pdf.py legacy/jane.pdf
+    docker-compose run --rm builder python scripts/import_pdf.py legacy/ --concurrency 16 --compile-concurrency 4
+    docker-compose run --rm builder python scripts/import_pdf.py legacy/ --save-json data/parsed
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# Resolve project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.ai_pipeline import AIPipeline
+from src.config import Config
+from src.import_pipeline import ImportPipeline, ImportResult
+from src.parse_cache import ParseCache
+from src.storage import open_storage
+from scripts.parse_pdf import collect_pdfs, json_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import PDF resumes: parse, validate, render and compile in one pass")
+    parser.add_argument("pdf_paths", nargs="+", help="PDF files and/or directories of PDFs")
+    parser.add_argument("--concurrency", "-c", type=int, default=None, help="PDFs parsed at once (default: PARSE_CONCURRENCY)")
+    parser.add_argument("--compile-concurrency", type=int, default=None,
+                        help="pdflatex builds at once (default: IMPORT_COMPILE_CONCURRENCY)")
+    parser.add_argument("--rpm", type=float, default=None, help="Max model requests per minute (default: PARSE_REQUESTS_PER_MINUTE)")
+    parser.add_argument("--save-json", metavar="DIR", help="Also write each parsed JSON to DIR/<name>.json (DIR/<folder>/<name>.json for shared names)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and don't update the parse cache")
+    args = parser.parse_args()
+
+    pdf_paths = collect_pdfs(args.pdf_paths)
+    missing = [p for p in pdf_paths if not p.exists()]
+    if missing or not pdf_paths:
+        for p in missing:
+            print(f"Error: PDF File not found at {p}")
+        if not pdf_paths:
+            print("Error: no PDF files found.")
+        sys.exit(1)
+
+    try:
+        config = Config.get_instance()
+        cache = None if args.no_cache else ParseCache(config.PARSE_CACHE_DIR, config.PARSE_CACHE_MAX_ENTRIES)
+        ai = AIPipeline(
+            PROJECT_ROOT / "schema" / "resume.schema.json",
+            max_concurrency=args.concurrency, requests_per_minute=args.rpm, cache=cache,
+        )
+        storage = open_storage(config)
+        importer = ImportPipeline(ai, storage, compile_concurrency=args.compile_concurrency)
+    except Exception as e:
+        print(f"Failed to initialize import pipeline: {e}")
+        sys.exit(1)
+
+    json_dir = Path(args.save_json) if args.save_json else None
+    json_outputs = json_paths(pdf_paths, json_dir) if json_dir else {}
+
+    def on_result(result: ImportResult):
+        name = result.source.name
+        if json_dir and result.data is not None:
+            json_path = json_outputs[result.source]
+            json_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(result.data, f, indent=2, ensure_ascii=False)
+        if result.error is not None:
+            print(f"  ✗ {name}: {result.error}")
+        elif result.errors:
+            print(f"  ⚠ {name}: {len(result.errors)} schema error(s), not built")
+            for message in result.errors[:5]:
+                print(f"      - {message}")
+        else:
+            print(f"  ✓ {name} -> {result.ref} ({storage.name})")
+
+    print(f"\n🚀 Importing {len(pdf_paths)} PDF(s): {ai.max_concurrency} parsing / "
+          f"{importer.compile_concurrency} compiling at a time...\n")
+    started = time.monotonic()
+    results = asyncio.run(importer.run(pdf_paths, on_result=on_result))
+    elapsed = time.monotonic() - started
+
+    built = sum(1 for r in results if r.ok)
+    print(f"\nDone in {elapsed:.1f}s — {built}/{len(results)} built. Storage: {storage.name}\n")
+    sys.exit(0 if built == len(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+scripts/load_test.py
+--------------------
+Synthetic load for the `generations` queue, for capacity planning.
+
+Inserts PENDING jobs at a steady --rate for --duration seconds, optionally
+with a --burst of extra jobs every --burst-every seconds. Each job embeds a
+synthetic resume (scripts/synthetic.py) drawn from a size mix, some with
+accented/typographic Unicode and some with characters the LaTeX sanitizer
+has to escape. Run one or more workers separately (src.worker or
+scripts/worker_harness.py) against the same database.
+
+Once every job is terminal (or --timeout passes) it reports, from the
+documents' own timestamps:
+    claim latency     claimedAt - createdAt   (time spent queued)
+    end-to-end        updatedAt - createdAt   (terminal status written; the
+                                              server stamps updatedAt when the
+                                              StatusWriter's bulk write lands)
+    processing        timings.total_ms        (worker's own measurement)
+as p50/p90/p95/p99/max, plus a throughput curve: jobs submitted and
+finished per --bucket seconds. --csv writes the curve for plotting.
+Latencies mix this machine's clock (createdAt) with the workers'
+(claimedAt) and the database server's (updatedAt); run them on the same
+host or keep clocks in sync.
+
+Jobs are tagged with `load_test: <run id>` and deleted afterwards unless
+--keep is given.
+
+Usage (inside Docker):
+    docker-compose run --rm builder python scripts/load_test.py --jobs 1
+    docker-compose run --rm builder python scripts/load_test.py --rate 5 --duration 60
+    docker-compose run --rm builder python scripts/load_test.py --rate 2 --duration 120 --burst 50 --burst-every 30
+    docker-compose run --rm builder python scripts/load_test.py --rate 10 --duration 60 --mix small:1 --csv curve.csv
+"""
+
+import argparse
+import csv
+import math
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+# Resolve project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from pymongo import MongoClient
+
+from scripts.synthetic import synthetic_resume
+
+# Resume size classes -> synthetic_resume(scale=...)
+SIZES = {"small": 1, "medium": 3, "large": 6}
+DEFAULT_MIX = "small:0.6,medium:0.3,large:0.1"
+TERMINAL = ["COMPLETED", "FAILED"]
+
+
+# -----------------------------------------------------------------------
+# Load shape
+# -----------------------------------------------------------------------
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parse "small:0.6,large:0.4" into {"small": 0.6, "large": 0.4}."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition(":")
+        name = name.strip()
+        if name not in SIZES:
+            raise ValueError(f"unknown size '{name}' (choose from {', '.join(SIZES)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("size mix needs at least one positive weight")
+    return mix
+
+
+def schedule(rate: float, duration: float, burst: int = 0, burst_every: float = 0) -> list[tuple[float, int]]:
+    """
+    (offset seconds, jobs to insert) events: one job every 1/rate seconds,
+    plus `burst` jobs at 0, burst_every, 2 * burst_every, ... Sorted by offset.
+    """
+    events: dict[float, int] = {}
+    if rate > 0:
+        for i in range(int(rate * duration)):
+            offset = round(i / rate, 3)
+            events[offset] = events.get(offset, 0) + 1
+    if burst > 0 and burst_every > 0:
+        for i in range(int(duration // burst_every) + 1):
+            offset = round(i * burst_every, 3)
+            if offset < duration or i == 0:
+                events[offset] = events.get(offset, 0) + burst
+    return sorted(events.items())
+
+
+def make_job(rng: random.Random, run_id: str, index: int, mix: dict[str, float], owners: int,
+             unicode_ratio: float, special_ratio: float) -> dict:
+    size = rng.choices(list(mix), weights=list(mix.values()))[0]
+    unicode = rng.random() < unicode_ratio
+    special = rng.random() < special_ratio
+    now = datetime.utcnow()
+    return {
+        "resume_id": f"load_{run_id}_{index % owners:04d}",
+        "version_number": 1,
+        "status": "PENDING",
+        "output_filename": f"Load_{run_id}_{index:06d}",
+        "resume_data": synthetic_resume(rng, scale=SIZES[size], unicode=unicode, special=special, code="LOAD"),
+        "meta_code": "LOAD",
+        "drive_link": None,
+        "pdf_path": None,
+        "error_log": None,
+        "load_test": run_id,
+        "load_profile": {"size": size, "unicode": unicode, "special": special},
+        "createdAt": now,
+        "updatedAt": now,
+    }
+
+
+# -----------------------------------------------------------------------
+# Report
+# -----------------------------------------------------------------------
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_row(name: str, values: list[float]) -> str:
+    if not values:
+        return f"  {name:<14} (no data)"
+    cols = [percentile(values, p) for p in (50, 90, 95, 99)] + [max(values)]
+    return f"  {name:<14} " + " ".join(f"{v:>9.2f}" for v in cols) + f"   n={len(values)}"
+
+
+def throughput_curve(jobs: list[dict], bucket: float) -> list[tuple[float, int, int]]:
+    """(bucket start offset, jobs submitted, jobs finished) per `bucket` seconds since the first insert."""
+    if not jobs:
+        return []
+    start = min(job["createdAt"] for job in jobs)
+    submitted: dict[int, int] = {}
+    finished: dict[int, int] = {}
+    for job in jobs:
+        i = int((job["createdAt"] - start).total_seconds() // bucket)
+        submitted[i] = submitted.get(i, 0) + 1
+        if job.get("status") in TERMINAL:
+            i = int((job["updatedAt"] - start).total_seconds() // bucket)
+            finished[i] = finished.get(i, 0) + 1
+    last = max(max(submitted), max(finished, default=0))
+    return [(i * bucket, submitted.get(i, 0), finished.get(i, 0)) for i in range(last + 1)]
+
+
+def report(jobs: list[dict], bucket: float, csv_path: Path | None = None) -> None:
+    statuses: dict[str, int] = {}
+    for job in jobs:
+        statuses[job.get("status", "?")] = statuses.get(job.get("status", "?"), 0) + 1
+
+    claim = [(j["claimedAt"] - j["createdAt"]).total_seconds() for j in jobs if j.get("claimedAt")]
+    done = [j for j in jobs if j.get("status") in TERMINAL]
+    end_to_end = [(j["updatedAt"] - j["createdAt"]).total_seconds() for j in done]
+    processing = [j["timings"]["total_ms"] / 1000 for j in done if j.get("timings", {}).get("total_ms") is not None]
+
+    print(f"\nJobs: {len(jobs)}  Statuses: {statuses}")
+    print(f"\nLatency (seconds)    {'p50':>9} {'p90':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    print(latency_row("claim", claim))
+    print(latency_row("end-to-end", end_to_end))
+    print(latency_row("processing", processing))
+
+    by_size: dict[str, list[float]] = {}
+    for job in done:
+        size = job.get("load_profile", {}).get("size", "?")
+        by_size.setdefault(size, []).append((job["updatedAt"] - job["createdAt"]).total_seconds())
+    if len(by_size) > 1:
+        print("\nEnd-to-end by resume size")
+        for size in sorted(by_size, key=lambda s: SIZES.get(s, 0)):
+            print(latency_row(size, by_size[size]))
+
+    curve = throughput_curve(jobs, bucket)
+    if curve:
+        peak = max(max(s, f) for _, s, f in curve) or 1
+        print(f"\nThroughput per {bucket:g}s (jobs/s submitted -> finished)")
+        for offset, submitted, finished in curve:
+            bar = "#" * round(finished / peak * 40)
+            print(f"  {offset:>7.0f}s  {submitted / bucket:>7.2f} -> {finished / bucket:>7.2f}  {bar}")
+        if done:
+            span = max(j["updatedAt"] for j in done) - min(j["createdAt"] for j in jobs)
+            print(f"\n  Overall: {len(done)} finished in {span.total_seconds():.1f}s "
+                  f"({len(done) / max(span.total_seconds(), 1e-9):.2f} jobs/s)")
+
+    if csv_path and curve:
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["offset_s", "submitted_per_s", "finished_per_s"])
+            for offset, submitted, finished in curve:
+                writer.writerow([offset, submitted / bucket, finished / bucket])
+        print(f"  Curve written to {csv_path}")
+
+
+# -----------------------------------------------------------------------
+# Main
+# -----------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic job load and report queue latency and throughput")
+    parser.add_argument("--uri", help="MongoDB URI (default: MONGODB_URI from config)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Steady jobs per second (default: 1)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to generate load for (default: 30)")
+    parser.add_argument("--jobs", type=int, help="Insert exactly this many jobs at once instead of --rate/--duration")
+    parser.add_argument("--burst", type=int, default=0, help="Extra jobs inserted at once every --burst-every seconds")
+    parser.add_argument("--burst-every", type=float, default=0, help="Seconds between bursts (first burst at t=0)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Resume size weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--unicode-ratio", type=float, default=0.3, help="Share of resumes with Unicode text (default: 0.3)")
+    parser.add_argument("--special-ratio", type=float, default=0.5, help="Share of resumes with LaTeX special characters (default: 0.5)")
+    parser.add_argument("--owners", type=int, default=20, help="Distinct resume_ids to spread jobs over (default: 20)")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait for jobs after the last insert (default: 300)")
+    parser.add_argument("--bucket", type=float, default=5, help="Throughput curve bucket in seconds (default: 5)")
+    parser.add_argument("--csv", type=Path, help="Write the throughput curve to this CSV file")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the synthetic resumes")
+    parser.add_argument("--keep", action="store_true", help="Leave the generated jobs in the database")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.jobs is not None:
+        events = [(0.0, args.jobs)]
+    else:
+        events = schedule(args.rate, args.duration, args.burst, args.burst_every)
+    total = sum(count for _, count in events)
+    if total == 0:
+        parser.error("nothing to insert: set --jobs, or a positive --rate / --burst")
+
+    if args.uri:
+        uri = args.uri
+    else:
+        from src.config import Config
+        uri = Config.get_instance().DB_URI
+
+    client = MongoClient(uri)
+    db = client.get_default_database(default="resume_builder")
+    rng = random.Random(args.seed)
+    run_id = uuid.uuid4().hex[:8]
+
+    print(f"\n[LOAD] Run {run_id}: {total} job(s) over {events[-1][0]:.0f}s "
+          f"(mix {args.mix}, {args.owners} owners)")
+    try:
+        started = time.monotonic()
+        index = 0
+        for offset, count in events:
+            delay = offset - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+            batch = [
+                make_job(rng, run_id, index + i, mix, args.owners, args.unicode_ratio, args.special_ratio)
+                for i in range(count)
+            ]
+            db.generations.insert_many(batch)
+            index += count
+        behind = time.monotonic() - started - events[-1][0]
+        if behind > 1:
+            print(f"[WARN] Inserts finished {behind:.1f}s behind schedule; the offered rate was lower than requested.")
+
+        print(f"[LOAD] All {total} job(s) inserted. Waiting for workers...")
+        deadline = time.monotonic() + args.timeout
+        done = 0
+        while time.monotonic() < deadline:
+            done = db.generations.count_documents({"load_test": run_id, "status": {"$in": TERMINAL}})
+            if done >= total:
+                break
+            time.sleep(0.5)
+        if done < total:
+            print(f"[WARN] Timed out with {total - done} job(s) unfinished.")
+
+        jobs = list(db.generations.find(
+            {"load_test": run_id},
+            {"status": 1, "createdAt": 1, "claimedAt": 1, "updatedAt": 1, "timings.total_ms": 1, "load_profile": 1},
+        ))
+        report(jobs, args.bucket, args.csv)
+    except KeyboardInterrupt:
+        print("\n[LOAD] Interrupted.")
+    finally:
+        if not args.keep:
+            db.generations.delete_many({"load_test": run_id})
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,194 @@
+"""
+scripts/parse_pdf.py
+--------------------
+Parse PDF resumes into structured JSON using Gemini.
+
+Usage (inside Docker):
+    # One PDF -> data/parsed_<CODE>_resume.json (or -o path)
+    docker-compose run --rm builder python scripts/parse_pdf.py legacy/jane.pdf
+
+    # Bulk onboarding: many PDFs / directories, parsed concurrently into data/parsed/<name>.json
+    # (PDFs that share a name keep their folders: data/parsed/a/cv.json, data/parsed/b/cv.json)
+    docker-compose run --rm builder python scripts/parse_pdf.py legacy/ --concurrency 16
+
+Results are cached in PARSE_CACHE_DIR, so re-running on the same PDFs is
+instant; pass --no-cache to force a fresh parse.
+"""
+
 import argparse
+import asyncio
 import sys
 import os
 import json
+import time
 from pathlib import Path
 
 # Add the project root to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.ai_pipeline import AIPipeline
+from src.config import Config
+from src.parse_cache import ParseCache
 from scripts.validate import validate_resume
 
+
+def collect_pdfs(inputs: list[str]) -> list[Path]:
+    """Expand directories to the PDFs inside them; keep explicit files as given."""
+    pdfs = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            pdfs.extend(sorted(path.rglob("*.pdf")))
+        else:
+            pdfs.append(path)
+    return pdfs
+
+
+def json_paths(pdf_paths: list[Path], output_dir: Path) -> dict[Path, Path]:
+    """
+    Output JSON path per PDF: output_dir/<name>.json, or, for PDFs that share
+    a name (a/cv.pdf, b/cv.pdf), their paths below the folder they have in
+    common mirrored under output_dir (a/cv.json, b/cv.json).
+    """
+    by_stem: dict[str, list[Path]] = {}
+    for pdf_path in pdf_paths:
+        by_stem.setdefault(pdf_path.stem, []).append(pdf_path)
+
+    outputs = {}
+    for stem, same_name in by_stem.items():
+        if len(same_name) == 1:
+            outputs[same_name[0]] = output_dir / f"{stem}.json"
+            continue
+        resolved = [p.resolve() for p in same_name]
+        common = Path(os.path.commonpath([p.parent for p in resolved]))
+        print(f"  ⚠ {len(same_name)} PDFs are named {same_name[0].name}; keeping their folders under {output_dir}")
+        for pdf_path, full in zip(same_name, resolved):
+            outputs[pdf_path] = output_dir / full.relative_to(common).with_suffix(".json")
+    return outputs
+
+
+def validate_and_save(parsed_data: dict, final_output: Path, schema_path: Path) -> list[str]:
+    """Validate against the schema, then write to `final_output`. Returns the schema errors."""
+    final_output.parent.mkdir(parents=True, exist_ok=True)
+    output_temp_path = final_output.with_name(f".{final_output.name}.tmp")
+
+    # Write temporarily
+    with open(output_temp_path, "w", encoding="utf-8") as f:
+        json.dump(parsed_data, f, indent=2)
+
+    errors = validate_resume(output_temp_path, schema_path)
+
+    # Move temp to final
+    os.replace(output_temp_path, final_output)
+    return errors
+
+
+def parse_single(pipeline: AIPipeline, pdf_path: Path, output: str | None, project_root: Path, schema_path: Path):
+    print(f"\n🚀 Starting Gemini PDF extraction for {pdf_path.name}...\n")
+    parsed_data = pipeline.parse_pdf_to_json(pdf_path)
+
+    # Determine output path
+    if output:
+        final_output = Path(output)
+    else:
+        # Let the AI dictate the code if it found one
+        code = parsed_data.get("meta", {}).get("code", "NEW")
+        final_output = project_root / "data" / f"parsed_{code}_resume.json"
+
+    # Validate against schema
+    print("\n🔎 Validating generated JSON against strict offline schema...")
+    errors = validate_and_save(parsed_data, final_output, schema_path)
+
+    if errors:
+        print(f"\n⚠️ Warning: The generated JSON still has schema validation errors after {pipeline.repair_rounds} repair round(s):")
+        for e in errors:
+            print(f"   - {e}")
+        print("\nYou may need to manually fix these in the output file.")
+    else:
+        print("✅ Success! The generated JSON is 100% compliant with the schema.")
+
+    print(f"\n💾 Saved parsed JSON to: {final_output}\n")
+
+
+def parse_bulk(pipeline: AIPipeline, pdf_paths: list[Path], output_dir: Path, schema_path: Path) -> int:
+    """Parse many PDFs concurrently; each result is validated and saved as it arrives. Returns failures."""
+    print(f"\n🚀 Parsing {len(pdf_paths)} PDF(s), up to {pipeline.max_concurrency} at a time...\n")
+    started = time.monotonic()
+    counts = {"ok": 0, "invalid": 0, "failed": 0}
+    outputs = json_paths(pdf_paths, output_dir)
+
+    def on_result(pdf_path: Path, parsed_data: dict | None, error: Exception | None):
+        if error is not None:
+            counts["failed"] += 1
+            print(f"  ✗ {pdf_path.name}: {error}")
+            return
+        final_output = outputs[pdf_path]
+        errors = validate_and_save(parsed_data, final_output, schema_path)
+        shown = final_output.relative_to(output_dir)
+        if errors:
+            counts["invalid"] += 1
+            print(f"  ⚠ {pdf_path.name} -> {shown} ({len(errors)} schema error(s))")
+        else:
+            counts["ok"] += 1
+            print(f"  ✓ {pdf_path.name} -> {shown}")
+
+    asyncio.run(pipeline.parse_many(pdf_paths, on_result=on_result))
+
+    elapsed = time.monotonic() - started
+    print(
+        f"\nDone in {elapsed:.1f}s — {counts['ok']} valid, {counts['invalid']} with schema errors, "
+        f"{counts['failed']} failed. Output: {output_dir}\n"
+    )
+    return counts["failed"]
+
+
 def main():
-    parser = argparse.ArgumentParser(description="Parse a PDF resume into structured JSON using Gemini 1.5 Pro")
-    parser.add_argument("pdf_path", help="Path to the input PDF file")
-    parser.add_argument("--output", "-o", help="Path to save the output JSON. Defaults to data/parsed_RESUME.json")
-    
+    parser = argparse.ArgumentParser(description="Parse PDF resumes into structured JSON using Gemini")
+    parser.add_argument("pdf_paths", nargs="+", help="PDF files and/or directories of PDFs")
+    parser.add_argument("--output", "-o", help="Path to save the output JSON (single PDF only). Defaults to data/parsed_<CODE>_resume.json")
+    parser.add_argument("--output-dir", help="Directory for bulk results (default: data/parsed/)")
+    parser.add_argument("--concurrency", "-c", type=int, default=None, help="PDFs parsed at once in bulk mode (default: PARSE_CONCURRENCY)")
+    parser.add_argument("--rpm", type=float, default=None, help="Max model requests per minute (default: PARSE_REQUESTS_PER_MINUTE)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and don't update the parse cache")
+
     args = parser.parse_args()
-    
-    pdf_path = Path(args.pdf_path)
-    if not pdf_path.exists():
-        print(f"Error: PDF File not found at {pdf_path}")
+
+    pdf_paths = collect_pdfs(args.pdf_paths)
+    missing = [p for p in pdf_paths if not p.exists()]
+    if missing or not pdf_paths:
+        for p in missing:
+            print(f"Error: PDF File not found at {p}")
+        if not pdf_paths:
+            print("Error: no PDF files found.")
         sys.exit(1)
-        
+
     project_root = Path(__file__).resolve().parent.parent
     schema_path = project_root / "schema" / "resume.schema.json"
-    
+
     try:
-        pipeline = AIPipeline(schema_path)
+        config = Config.get_instance()
+        cache = None if args.no_cache else ParseCache(config.PARSE_CACHE_DIR, config.PARSE_CACHE_MAX_ENTRIES)
+        pipeline = AIPipeline(
+            schema_path, max_concurrency=args.concurrency, requests_per_minute=args.rpm, cache=cache
+        )
     except Exception as e:
         print(f"Failed to initialize AI Pipeline: {e}")
         sys.exit(1)
-    
-    try:
-        print(f"\n🚀 Starting Gemini 1.5 Pro PDF extraction for {pdf_path.name}...\n")
-        parsed_data = pipeline.parse_pdf_to_json(pdf_path)
-        
-        # Validate against schema
-        print("\n🔎 Validating generated JSON against strict offline schema...")
-        output_temp_path = project_root / "data" / "temp_validate.json"
-        
-        # Write temporarily
-        with open(output_temp_path, "w", encoding="utf-8") as f:
-            json.dump(parsed_data, f, indent=2)
-            
-        errors = validate_resume(output_temp_path, schema_path)
-        
-        if errors:
-            print("\n⚠️ Warning: The generated JSON has schema validation errors:")
-            for e in errors:
-                print(f"   - {e}")
-            print("\nYou may need to manually fix these in the output file.")
-        else:
-            print("✅ Success! The generated JSON is 100% compliant with the schema.")
-            
-        # Determine output path
-        if args.output:
-            final_output = Path(args.output)
-        else:
-            # Let the AI dictate the code if it found one
-            code = parsed_data.get("meta", {}).get("code", "NEW")
-            final_output = project_root / "data" / f"parsed_{code}_resume.json"
-            
-        # Move temp to final
-        os.replace(output_temp_path, final_output)
-        
-        print(f"\n💾 Saved parsed JSON to: {final_output}\n")
-        
-    except Exception as e:
-        print(f"\n❌ Pipeline failed: {e}")
+
+    if len(pdf_paths) == 1 and not args.output_dir:
+        try:
+            parse_single(pipeline, pdf_paths[0], args.output, project_root, schema_path)
+        except Exception as e:
+            print(f"\n❌ Pipeline failed: {e}")
+            sys.exit(1)
+        return
+
+    if args.output:
+        print("Error: --output only applies to a single PDF; use --output-dir for bulk runs.")
         sys.exit(1)
+    output_dir = Path(args.output_dir) if args.output_dir else project_root / "data" / "parsed"
+    failed = parse_bulk(pipeline, pdf_paths, output_dir, schema_path)
+    sys.exit(1 if failed else 0)
 
 if __name__ == "__main__":
     main()
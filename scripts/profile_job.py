@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+scripts/profile_job.py
+----------------------
+Fetch and summarize a job's stored profile (src/profiling.py).
+
+Profiles are recorded for jobs inserted with `profile: true`, or sampled
+with PROFILE_SAMPLE_RATE. The job's `profile_artifact` points at the file
+in artifact storage; this script downloads it, prints the hottest
+functions plus the job's pdflatex wall time, and saves the file:
+
+    *.folded  folded stacks: flamegraph.pl job.folded > job.svg, or open in speedscope
+    *.prof    pstats dump: python -m pstats job.prof, or snakeviz job.prof
+
+Usage (inside Docker):
+    docker-compose run --rm builder python scripts/profile_job.py 65f1c0ffee0000000000abcd
+    docker-compose run --rm builder python scripts/profile_job.py 65f1c0ffee0000000000abcd --top 40 -o /tmp/job.folded
+"""
+
+import argparse
+import io
+import marshal
+import pstats
+import sys
+from pathlib import Path
+
+from bson import ObjectId
+
+# Resolve project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config import Config
+from src.db import Database
+from src.storage import ArtifactNotFoundError, open_storage
+
+
+def summarize_folded(text: str, top: int = 20) -> list[tuple[str, int, int]]:
+    """(frame, self samples, total samples) for the `top` frames by total, from folded stacks."""
+    self_counts: dict[str, int] = {}
+    total_counts: dict[str, int] = {}
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack or not count.isdigit():
+            continue
+        frames = stack.split(";")
+        self_counts[frames[-1]] = self_counts.get(frames[-1], 0) + int(count)
+        # Recursive frames count once per stack
+        for frame in set(frames):
+            total_counts[frame] = total_counts.get(frame, 0) + int(count)
+    ranked = sorted(total_counts, key=lambda frame: (-total_counts[frame], -self_counts.get(frame, 0)))
+    return [(frame, self_counts.get(frame, 0), total_counts[frame]) for frame in ranked[:top]]
+
+
+def print_folded(data: bytes, top: int) -> None:
+    rows = summarize_folded(data.decode("utf-8"), top)
+    samples = sum(int(line.rpartition(" ")[2]) for line in data.decode("utf-8").splitlines() if line)
+    print(f"\n{'total':>7} {'self':>7}  frame   ({samples} samples)")
+    for frame, own, total in rows:
+        print(f"{total / samples:>7.1%} {own / samples:>7.1%}  {frame}")
+
+
+def print_pstats(data: bytes, top: int) -> None:
+    stats = pstats.Stats(_StatsSource(marshal.loads(data)), stream=sys.stdout)
+    stats.sort_stats("cumulative").print_stats(top)
+
+
+class _StatsSource:
+    """pstats.Stats accepts any object with create_stats() and a `stats` dict."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def main():
+    config = Config.get_instance()
+
+    parser = argparse.ArgumentParser(description="Download and summarize a job's profile.")
+    parser.add_argument("job_id", help="Generation job id")
+    parser.add_argument("--top", type=int, default=25, help="Functions to show (default: 25)")
+    parser.add_argument("-o", "--output", default=None, help="Where to save the profile (default: ./profile_<id>.<ext>)")
+    args = parser.parse_args()
+
+    if not ObjectId.is_valid(args.job_id):
+        print(f"Error: '{args.job_id}' is not a job id.", file=sys.stderr)
+        sys.exit(1)
+
+    db = Database.get_db()
+    job = db.generations.find_one(
+        {"_id": ObjectId(args.job_id)},
+        {"status": 1, "output_filename": 1, "profile_artifact": 1, "timings": 1},
+    )
+    if job is None or not job.get("profile_artifact"):
+        state = "not found" if job is None else f"{job.get('status')}, not profiled"
+        print(f"Error: no profile for job {args.job_id} ({state}). "
+              f"Insert jobs with profile: true or set PROFILE_SAMPLE_RATE.", file=sys.stderr)
+        sys.exit(1)
+
+    artifact = job["profile_artifact"]
+    storage = open_storage(config, db)
+    if artifact.get("storage") and artifact["storage"] != storage.name:
+        print(f"Error: profile is in {artifact['storage']} storage, but ARTIFACT_STORAGE is {storage.name}.",
+              file=sys.stderr)
+        sys.exit(1)
+
+    buffer = io.BytesIO()
+    try:
+        storage.download_to(artifact["ref"], buffer)
+    except ArtifactNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    data = buffer.getvalue()
+
+    print(f"Job {args.job_id} ({job.get('output_filename')}, {job.get('status')})")
+    print(f"  total {artifact.get('total_ms', 0):.0f} ms, pdflatex {artifact.get('pdflatex_ms', 0):.0f} ms "
+          f"({artifact['format']} profile)")
+    for stage, ms in (job.get("timings") or {}).items():
+        if stage != "total_ms":
+            print(f"    {stage:<22} {ms:>9.1f}")
+
+    if not data:
+        print("\n(empty profile: the job finished before the first sample)")
+    elif artifact["format"] == "pstats":
+        print_pstats(data, args.top)
+    else:
+        print_folded(data, args.top)
+
+    extension = "prof" if artifact["format"] == "pstats" else "folded"
+    destination = Path(args.output) if args.output else Path.cwd() / f"profile_{args.job_id}.{extension}"
+    destination.write_bytes(data)
+    print(f"\nSaved {destination}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
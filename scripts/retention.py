@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+scripts/retention.py
+--------------------
+Apply the retention policy: export old finished jobs to cold storage and
+prune/compact PDFs and job profiles in output/ (or GridFS / S3 storage).
+
+Workers never sweep on their own: run this from exactly one place on a
+schedule, e.g. a host crontab entry
+    0 3 * * * cd /srv/resume-builder && docker-compose run --rm builder python scripts/retention.py --archive-days 30
+Output rules default to OUTPUT_RETENTION_DAYS / OUTPUT_MAX_FILES (both 0 = off).
+
+Usage (inside Docker):
+    # Archive jobs finished more than 30 days ago, then prune output/
+    docker-compose run --rm builder python scripts/retention.py --archive-days 30
+
+    # Only prune output/, zipping swept PDFs into archive/pdfs/
+    docker-compose run --rm builder python scripts/retention.py --compact
+
+    # See what would happen
+    docker-compose run --rm builder python scripts/retention.py --archive-days 30 --dry-run
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Resolve project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config import Config
+from src.retention import RetentionSweeper
+
+
+def main():
+    config = Config.get_instance()
+
+    parser = argparse.ArgumentParser(description="Archive old generation jobs and prune output/ artifacts.")
+    parser.add_argument(
+        "--archive-days",
+        type=float,
+        default=None,
+        help="Export finished jobs older than this many days to ARCHIVE_DIR and delete them."
+    )
+    parser.add_argument(
+        "--pdf-days",
+        type=float,
+        default=config.OUTPUT_RETENTION_DAYS,
+        help=f"Sweep PDFs and profiles older than this many days (default: {config.OUTPUT_RETENTION_DAYS:g}, 0 = off)."
+    )
+    parser.add_argument(
+        "--max-files",
+        type=int,
+        default=config.OUTPUT_MAX_FILES,
+        help=f"Keep at most this many artifacts in output/ (default: {config.OUTPUT_MAX_FILES}, 0 = off)."
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Zip swept files into ARCHIVE_DIR/pdfs/ (profiles: profiles/) instead of just deleting them."
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would be archived/swept without changing anything."
+    )
+    args = parser.parse_args()
+
+    remote = config.ARTIFACT_STORAGE != "local"
+    db = None
+    storage = None
+    if args.archive_days is not None or remote:
+        from src.db import Database
+        Database.connect()
+        db = Database.get_db()
+    if remote:
+        from src.storage import open_storage
+        storage = open_storage(config, db)
+
+    sweeper = RetentionSweeper(config, db, dry_run=args.dry_run, storage=storage)
+
+    if args.archive_days is not None:
+        count = sweeper.archive_generations(args.archive_days)
+        verb = "Would archive" if args.dry_run else "Archived"
+        print(f"{verb} {count} finished job(s) older than {args.archive_days:g} day(s).")
+
+    swept = sweeper.sweep_output(max_age_days=args.pdf_days, max_files=args.max_files, compact=args.compact)
+    for path in swept:
+        print(f"  - {path.name}")
+    print(f"{len(swept)} artifact(s) {'would be ' if args.dry_run else ''}removed from output/.")
+
+    if remote and not args.dry_run:
+        count = sweeper.sweep_stored(max_age_days=args.pdf_days)
+        print(f"{count} artifact(s) removed from {storage.name} storage.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+scripts/synthetic.py
+--------------------
+Deterministic synthetic resumes for benchmarks and load tests. Every
+resume is valid against schema/resume.schema.json and renders with the
+base template; `scale` multiplies the number of entries and bullets, and
+the text can mix in accented/typographic Unicode and every character the
+LaTeX sanitizer escapes, plus **bold** and [link](url) Markdown.
+
+Usage:
+    import random
+    from scripts.synthetic import synthetic_resume, synthetic_text
+
+    data = synthetic_resume(random.Random(7), scale=4, unicode=True, special=True)
+    text = synthetic_text(random.Random(7), 256 * 1024, special=True)
+"""
+
+import random
+
+WORDS = (
+    "built designed migrated scaled reduced latency throughput service pipeline cache "
+    "queue worker API schema index query shard replica deploy monitor alert dashboard "
+    "team customers revenue users requests per second database microservice cluster"
+).split()
+
+UNICODE_WORDS = ["café", "Zürich", "São Paulo", "Łódź", "naïve", "Ærøskøbing", "résumé", "–", "—", "“quoted”", "…"]
+
+# Every character LatexSanitizer.escape rewrites
+SPECIAL_WORDS = ["R&D", "99.9%", "$1.2M", "#1", "snake_case", "{json}", "~2x", "O(n^2)"]
+
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def _words(rng: random.Random, count: int, unicode: bool, special: bool) -> list[str]:
+    pool = list(WORDS)
+    if unicode:
+        pool += UNICODE_WORDS
+    if special:
+        pool += SPECIAL_WORDS
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def synthetic_sentence(rng: random.Random, words: int = 18, unicode: bool = False, special: bool = False) -> str:
+    """One highlight-style sentence, sometimes with **bold** and a [link](url)."""
+    parts = _words(rng, words, unicode, special)
+    if rng.random() < 0.5:
+        i = rng.randrange(len(parts))
+        parts[i] = f"**{parts[i]}**"
+    if rng.random() < 0.3:
+        i = rng.randrange(len(parts))
+        parts[i] = f"[{parts[i]}](https://example.com/{rng.randrange(10_000)})"
+    sentence = " ".join(parts)
+    return sentence[0].upper() + sentence[1:] + "."
+
+
+def synthetic_text(rng: random.Random, size: int, unicode: bool = False, special: bool = False) -> str:
+    """About `size` characters of sentences (for sanitizer throughput)."""
+    sentences, length = [], 0
+    while length < size:
+        sentence = synthetic_sentence(rng, unicode=unicode, special=special)
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def _date(rng: random.Random) -> str:
+    return f"{rng.choice(MONTHS)} {rng.randrange(2010, 2026)}"
+
+
+def synthetic_resume(rng: random.Random, scale: int = 1, unicode: bool = False, special: bool = False,
+                     code: str = "SYN") -> dict:
+    """A schema-valid resume; `scale` 1 is roughly one page, larger values add entries and bullets."""
+    def text(words: int = 18) -> str:
+        return synthetic_sentence(rng, words, unicode, special)
+
+    first, last = ("Zoë", "Ångström") if unicode else ("Jane", "Doe")
+    return {
+        "meta": {"code": code},
+        "basics": {
+            "name": {"full": f"{first} {last}", "first": first, "last": last},
+            "contact": {
+                "phone": {"display": "+1 555 0100", "prefix": "+1", "number": "5550100", "label": "P"},
+                "email": f"jane.doe{rng.randrange(1000)}@example.com",
+            },
+            "summary": text(24),
+            "profiles": {
+                "github": {"network": "GitHub", "text": "github.com/janedoe", "url": "https://github.com/janedoe"},
+            },
+        },
+        "work": [
+            {
+                "company": rng.choice(COMPANIES),
+                "location": "Zürich" if unicode else "Remote",
+                "position": "Software Engineer",
+                "startDate": _date(rng),
+                "endDate": "Present" if i == 0 else _date(rng),
+                "highlights": [text() for _ in range(3 + scale)],
+            }
+            for i in range(2 * scale)
+        ],
+        "skills": [
+            {"category": f"Category {i + 1}", "keywords": _words(rng, 5 + scale, unicode, special)}
+            for i in range(3 + scale)
+        ],
+        "projects": [
+            {"name": f"Project {i + 1}", "description": text(30)}
+            for i in range(2 * scale)
+        ],
+        "education": [
+            {
+                "institution": "Université de Montréal" if unicode else "State University",
+                "degree": "Bachelor of Science",
+                "completionDate": _date(rng),
+                "score": {"label": "GPA", "value": "3.8"},
+            }
+        ],
+    }
@@ -2,7 +2,8 @@
 """
 scripts/upload.py
 -----------------
-Batch upload resume PDFs from output/ to Google Drive.
+Batch upload resume PDFs to Google Drive, from local paths or from the
+configured artifact storage (ARTIFACT_STORAGE: output/, GridFS or S3).
 
 Reads meta.code from the filename pattern: Aryan_<CODE>_YYMM[_vN].pdf
 Uploads each file to: My Drive/Resume/<CODE>/
@@ -14,7 +15,7 @@ Usage (inside Docker):
     # Upload multiple files
     docker-compose run --rm builder python scripts/upload.py output/Aryan_PI_2602.pdf output/Aryan_BE_2602.pdf
 
-    # Upload ALL PDFs in output/
+    # Upload ALL PDFs in artifact storage (output/ by default)
     docker-compose run --rm builder python scripts/upload.py --all
 """
 
@@ -28,7 +29,9 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from src.auth import default_credentials
+from src.config import Config
 from src.drive import DriveUploader
+from src.storage import open_storage
 
 
 FILENAME_PATTERN = re.compile(r"^[A-Za-z]+_([A-Z]+)_\d{4}(?:_v\d+)?\.pdf$", re.IGNORECASE)
@@ -65,7 +68,7 @@ def upload_file(uploader: DriveUploader, pdf_path: Path) -> bool:
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Upload resume PDFs from output/ to Google Drive.",
+        description="Upload resume PDFs to Google Drive.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
@@ -82,7 +85,7 @@ Examples:
     parser.add_argument(
         "--all",
         action="store_true",
-        help="Upload all PDFs found in the output/ directory."
+        help="Upload all PDFs in artifact storage (output/ unless ARTIFACT_STORAGE says otherwise)."
     )
     args = parser.parse_args()
 
@@ -91,15 +94,16 @@ Examples:
         sys.exit(1)
 
     # Resolve files to upload
+    storage = None
     if args.all:
-        output_dir = PROJECT_ROOT / "output"
-        pdf_files = sorted(output_dir.glob("*.pdf"))
-        if not pdf_files:
-            print(f"No PDF files found in {output_dir}/")
+        storage = open_storage(Config.get_instance())
+        artifacts = [(ref, name) for ref, name in storage.iter_artifacts() if name.lower().endswith(".pdf")]
+        if not artifacts:
+            print(f"No PDF files found in {storage.name} storage.")
             sys.exit(0)
-        print(f"Found {len(pdf_files)} PDF(s) in output/:\n")
+        print(f"Found {len(artifacts)} PDF(s) in {storage.name} storage:\n")
     else:
-        pdf_files = [Path(f) for f in args.files]
+        artifacts = [(None, f) for f in args.files]
 
     # Get credentials
     print("Connecting to Google Drive...")
@@ -116,9 +120,15 @@ Examples:
 
     # Upload each file
     success, failed = 0, 0
-    for pdf_path in pdf_files:
-        pdf_path = PROJECT_ROOT / pdf_path if not pdf_path.is_absolute() else pdf_path
-        ok = upload_file(uploader, pdf_path)
+    for ref, name in artifacts:
+        if storage is not None:
+            # Streamed to a temp file unless the backend is output/ itself
+            with storage.open_local(ref, filename=name) as pdf_path:
+                ok = upload_file(uploader, pdf_path)
+        else:
+            pdf_path = Path(name)
+            pdf_path = PROJECT_ROOT / pdf_path if not pdf_path.is_absolute() else pdf_path
+            ok = upload_file(uploader, pdf_path)
         if ok:
             success += 1
         else:
@@ -18,34 +18,22 @@ import argparse
 from pathlib import Path
 
 try:
-    import jsonschema
     from jsonschema import Draft7Validator, FormatChecker
 except ImportError:
     print("ERROR: 'jsonschema' is not installed. Run: pip install jsonschema")
     sys.exit(1)
 
+# Resolve project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.validation import friendly_path
+
 
 # -----------------------------------------------------------------------
 # Helpers
 # -----------------------------------------------------------------------
 
-def _friendly_path(error: jsonschema.ValidationError) -> str:
-    """
-    Convert a jsonschema error's absolute path into a readable string.
-    e.g. deque(['work', 0, 'highlights']) -> "work[0].highlights"
-    """
-    parts = []
-    for part in error.absolute_path:
-        if isinstance(part, int):
-            parts.append(f"[{part}]")
-        else:
-            if parts:
-                parts.append(f".{part}")
-            else:
-                parts.append(str(part))
-    return "".join(parts) if parts else "(root)"
-
-
 def validate_resume(json_path: Path, schema_path: Path) -> list[str]:
     """
     Validate a resume JSON file against the schema.
@@ -76,7 +64,7 @@ def validate_resume(json_path: Path, schema_path: Path) -> list[str]:
 
     messages = []
     for error in errors:
-        path = _friendly_path(error)
+        path = friendly_path(error)
         messages.append(f"  ✗  {path}  →  {error.message}")
 
     return messages
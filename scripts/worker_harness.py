@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+scripts/worker_harness.py
+-------------------------
+Local multi-process harness for partitioned worker replicas.
+
+Spawns N `src.worker` processes (WORKER_INDEX=0..N-1, WORKER_COUNT=N),
+inserts a batch of PENDING jobs spread over many resume_ids, waits for
+them to finish and reports throughput plus how the jobs were split
+between replicas. Run it with N=1, 2, 4... to check scaling.
+
+Change streams need a replica set. Point MONGODB_URI at one, or pass
+--start-mongod to launch a throwaway single-node replica set
+(requires the `mongod` binary on PATH).
+
+Usage (inside Docker):
+    docker-compose run --rm builder python scripts/worker_harness.py --workers 4 --jobs 200
+    docker-compose run --rm builder python scripts/worker_harness.py --workers 2 --start-mongod
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+# Resolve project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from pymongo import MongoClient
+
+
+HARNESS_TAG = "worker_harness"
+
+
+def start_mongod(port: int) -> tuple[subprocess.Popen, str]:
+    """Start a single-node replica set in a temp dir. Returns (process, uri)."""
+    if shutil.which("mongod") is None:
+        print("ERROR: --start-mongod needs the 'mongod' binary on PATH.")
+        sys.exit(1)
+
+    dbpath = tempfile.mkdtemp(prefix="harness-mongod-")
+    proc = subprocess.Popen(
+        ["mongod", "--replSet", "rs0", "--port", str(port), "--dbpath", dbpath,
+         "--bind_ip", "127.0.0.1"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    client = MongoClient(f"mongodb://127.0.0.1:{port}/?directConnection=true",
+                         serverSelectionTimeoutMS=10000)
+    client.admin.command("replSetInitiate", {
+        "_id": "rs0",
+        "members": [{"_id": 0, "host": f"127.0.0.1:{port}"}],
+    })
+    # Wait for the node to become primary
+    for _ in range(100):
+        if client.admin.command("hello").get("isWritablePrimary"):
+            break
+        time.sleep(0.1)
+    client.close()
+    return proc, f"mongodb://127.0.0.1:{port}/resume_builder_harness?directConnection=true"
+
+
+def spawn_workers(count: int, uri: str) -> list[subprocess.Popen]:
+    procs = []
+    # One metrics port per replica (9108, 9109, ...) so they don't collide
+    metrics_port = int(os.environ.get("METRICS_PORT", "9108"))
+    for index in range(count):
+        env = {
+            **os.environ,
+            "MONGODB_URI": uri,
+            "WORKER_INDEX": str(index),
+            "WORKER_COUNT": str(count),
+            "METRICS_PORT": str(metrics_port + index if metrics_port else 0),
+        }
+        procs.append(subprocess.Popen(
+            [sys.executable, "-u", "-m", "src.worker"],
+            cwd=PROJECT_ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+        ))
+    return procs
+
+
+def insert_jobs(db, resume_data: dict, count: int, resumes: int) -> None:
+    now = datetime.utcnow()
+    db.generations.insert_many([
+        {
+            "resume_id": f"harness_resume_{i % resumes:04d}",
+            "version_number": 1,
+            "status": "PENDING",
+            "output_filename": f"Harness_{i:05d}",
+            "resume_data": resume_data,
+            "meta_code": "HARNESS",
+            "drive_link": None,
+            "pdf_path": None,
+            "error_log": None,
+            "harness": HARNESS_TAG,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        for i in range(count)
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run N partitioned workers against a local replica set.")
+    parser.add_argument("--workers", "-w", type=int, default=2, help="Number of worker replicas.")
+    parser.add_argument("--jobs", "-n", type=int, default=100, help="Jobs to insert.")
+    parser.add_argument("--resumes", type=int, default=50, help="Distinct resume_ids to spread jobs over.")
+    parser.add_argument("--input", "-i", default="data/fs_resume.json", help="Resume JSON used for every job.")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for completion.")
+    parser.add_argument("--start-mongod", action="store_true", help="Launch a throwaway single-node replica set.")
+    parser.add_argument("--port", type=int, default=27117, help="Port for --start-mongod.")
+    args = parser.parse_args()
+
+    mongod = None
+    if args.start_mongod:
+        mongod, uri = start_mongod(args.port)
+    else:
+        from src.config import Config
+        uri = Config.get_instance().DB_URI
+
+    with open(PROJECT_ROOT / args.input, "r", encoding="utf-8") as f:
+        resume_data = json.load(f)
+
+    client = MongoClient(uri)
+    db = client.get_default_database(default="resume_builder")
+    db.generations.delete_many({"harness": HARNESS_TAG})
+
+    print(f"Starting {args.workers} worker(s)...")
+    workers = spawn_workers(args.workers, uri)
+    time.sleep(3)  # let each worker open its change stream
+
+    try:
+        print(f"Inserting {args.jobs} jobs over {args.resumes} resume ids...")
+        start = time.monotonic()
+        insert_jobs(db, resume_data, args.jobs, args.resumes)
+
+        done = 0
+        while time.monotonic() - start < args.timeout:
+            done = db.generations.count_documents(
+                {"harness": HARNESS_TAG, "status": {"$in": ["COMPLETED", "FAILED"]}}
+            )
+            if done >= args.jobs:
+                break
+            time.sleep(0.5)
+        elapsed = time.monotonic() - start
+
+        jobs = list(db.generations.find(
+            {"harness": HARNESS_TAG}, {"status": 1, "worker_id": 1, "attempts": 1}
+        ))
+        statuses = Counter(job["status"] for job in jobs)
+        per_worker = Counter(job.get("worker_id", "-") for job in jobs)
+        retried = sum(1 for job in jobs if job.get("attempts"))
+
+        print()
+        print(f"Finished {done}/{args.jobs} jobs in {elapsed:.1f}s "
+              f"({done / elapsed:.2f} jobs/s with {args.workers} worker(s))")
+        print(f"Statuses: {dict(statuses)}")
+        print(f"Re-queued by reaper: {retried}")
+        print("Jobs per worker:")
+        for worker_id, count in sorted(per_worker.items()):
+            print(f"  {worker_id:<30} {count}")
+    finally:
+        for proc in workers:
+            proc.terminate()
+        for proc in workers:
+            proc.wait(timeout=10)
+        db.generations.delete_many({"harness": HARNESS_TAG})
+        client.close()
+        if mongod is not None:
+            mongod.terminate()
+            mongod.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
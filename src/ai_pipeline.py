@@ -1,76 +1,567 @@
+"""
+src/ai_pipeline.py
+------------------
+PDF resume -> schema-conformant JSON, using Gemini.
+
+Single PDF (sync):
+    pipeline = AIPipeline(schema_path)
+    data = pipeline.parse_pdf_to_json(Path("legacy/jane.pdf"))
+
+Bulk (async, bounded concurrency, shared rate limit):
+    results = asyncio.run(pipeline.parse_many(pdf_paths))
+    for pdf_path, data, error in results: ...
+
+Uploaded files are polled until the File API reports them ACTIVE instead of
+sleeping for a fixed time. All model calls made by one pipeline share a
+RateLimiter (PARSE_REQUESTS_PER_MINUTE) and at most PARSE_CONCURRENCY PDFs
+are in flight at once. PDFs in our own template's layout are parsed locally
+(src/pdf_extract.py) and never reach the model. With a ParseCache (src/parse_cache.py), a PDF already
+parsed against the same schema and model is returned without any API call.
+The schema is sent once per request as the SDK's structured
+`response_schema` (derived from resume.schema.json and cached per schema),
+and the prompt itself is a few lines of extraction rules.
+Output that isn't valid JSON is re-asked against the same uploaded file,
+and parts that fail validation are repaired subtree by subtree
+(src/parse_repair.py) rather than by re-parsing the whole PDF.
+
+With PARSE_STREAM on, the response is streamed and parsed incrementally
+(src/json_stream.py): each top-level section (`basics`, `work`, ...) is
+validated as soon as it is complete and reported through `on_section`,
+and malformed output aborts the generation as soon as it is seen.
+Any object with the google-genai client surface
+(`files`, `models`, `aio.files`, `aio.models`) can be injected as `client`,
+e.g. a local fake in tests.
+"""
+
+import asyncio
 import os
 import json
+import threading
 import time
 from pathlib import Path
+from typing import Callable
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
-from tenacity import retry, stop_after_attempt, wait_exponential
+from jsonschema import Draft7Validator, FormatChecker
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
+
+from src.config import Config
+from src.json_stream import SectionStream
+from src.parse_cache import ParseCache, parse_key
+from src.parse_repair import MISSING, RepairRequest, apply_repair, repair_prompt, repair_requests, section_errors
+from src.pdf_extract import extract_template_resume
+from src.snapshots import content_hash
 
 load_dotenv()
 
-class AIPipeline:
-    def __init__(self, schema_path: Path):
-        self.schema_path = schema_path
-        
-        # Ensure API key exists
-        self.api_key = os.environ.get("GEMINI_API_KEY")
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY is not set in the environment or .env file.")
-            
-        self.client = genai.Client(api_key=self.api_key)
-        
-        with open(self.schema_path, 'r', encoding='utf-8') as f:
-            self.schema = json.load(f)
+# on_section(name, value, errors): a top-level section is complete (errors = its schema errors)
+SectionCallback = Callable[[str, object, list[str]], None]
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    def parse_pdf_to_json(self, pdf_path: Path) -> dict:
-        """
-        Uploads a PDF to Gemini, extracts the resume, and guarantees a JSON 
-        response conforming to our internal resume schema. Retries on failure.
-        """
-        print(f"Uploading {pdf_path.name} to Gemini File API...")
-        uploaded_file = self.client.files.upload(file=str(pdf_path), config={'mime_type': 'application/pdf'})
-        
-        try:
-            print("Extracting document features...")
-            time.sleep(2)
-            
-            prompt = f"""
-            You are an expert ATS resume parser and data extraction AI. 
+
+# The schema itself travels as the structured response_schema, so the
+# prompt only carries what the schema can't express.
+PROMPT = """Extract this PDF resume into JSON matching the response schema.
+Rules:
+- Copy dates, companies and roles exactly. Never invent data; omit fields the resume doesn't have.
+- One work highlight per bullet point; keep any markdown formatting.
+- Group skills into categories (e.g. Languages, Frameworks, Tools).
+- meta.code: a 2-3 letter uppercase code for the candidate's main profession (e.g. SWE, FS, BE, ROB, DATA, PHY)."""
+
+# Previous prompt with the whole schema pretty-printed inline, for models
+# without structured output (inline_schema=True) and for benchmarking.
+LEGACY_PROMPT = """
+            You are an expert ATS resume parser and data extraction AI.
             I have provided a PDF resume. Please extract all the information from this resume and output it as a valid JSON object.
-            
+
             The JSON output MUST STRICTLY conform to the following JSON Schema:
-            
+
             ```json
-            {json.dumps(self.schema, indent=2)}
+            {schema}
             ```
-            
+
             Rules:
             1. Be extremely accurate with dates, companies, and roles.
             2. DO NOT make up any information. If something is missing (e.g., social links), omit the field or leave it empty as per the schema requirements.
             3. Break down work experience highlights into individual bullet points. Maintain any markdown formatting if present.
             4. Organize skills logically into categories (e.g. Languages, Frameworks, Tools).
             5. For `meta.code`, determine a short 2-3 letter uppercase code representing the main profession of the candidate (e.g., 'SWE', 'FS', 'BE', 'ROB', 'DATA', 'PHY').
-            
+
             Return ONLY valid JSON.
             """
-            
-            print("Generating structured JSON using Gemini 2.0 Flash...")
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=[uploaded_file, prompt],
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                )
-            )
-            
+
+# JSON Schema keyword -> types.Schema field. Everything else ($schema, title,
+# additionalProperties: true, format: email, ...) is either unsupported by
+# the response_schema subset or only enforced by our own Draft7 validation.
+_SCHEMA_FIELDS = {
+    "type": "type",
+    "description": "description",
+    "required": "required",
+    "enum": "enum",
+    "minItems": "min_items",
+    "maxItems": "max_items",
+    "minLength": "min_length",
+    "maxLength": "max_length",
+    "minimum": "minimum",
+    "maximum": "maximum",
+}
+
+_response_schemas: dict[str, types.Schema] = {}
+_response_schemas_lock = threading.Lock()
+
+
+def _to_response_schema(node: dict, root: bool = False) -> dict:
+    out = {field: node[key] for key, field in _SCHEMA_FIELDS.items() if key in node}
+    if root:
+        # The root description documents the file format, not the resume
+        out.pop("description", None)
+    if "properties" in node:
+        out["properties"] = {name: _to_response_schema(child) for name, child in node["properties"].items()}
+        # Keep the schema's key order in the output (the model otherwise sorts keys)
+        out["property_ordering"] = list(node["properties"])
+    if "items" in node:
+        out["items"] = _to_response_schema(node["items"])
+    if isinstance(node.get("additionalProperties"), dict):
+        # Map-typed objects (basics.profiles); the field is passed through in wire format
+        value = types.Schema.model_validate(_to_response_schema(node["additionalProperties"]))
+        out["additional_properties"] = value.model_dump(mode="json", by_alias=True, exclude_none=True)
+    return out
+
+
+def response_schema_for(schema: dict) -> types.Schema:
+    """Gemini response_schema for a JSON Schema, built once per schema content."""
+    key = content_hash(schema)
+    with _response_schemas_lock:
+        if key not in _response_schemas:
+            _response_schemas[key] = types.Schema.model_validate(_to_response_schema(schema, root=True))
+        return _response_schemas[key]
+
+
+class UploadProcessingError(RuntimeError):
+    pass
+
+
+class ParseAborted(RuntimeError):
+    """Raised from an on_section callback to stop a parse without retrying it."""
+
+
+class RateLimiter:
+    """
+    Spaces calls evenly to stay under `per_minute` (0 = unlimited). Shared
+    by all concurrent parses of one pipeline; safe from sync and async code.
+    """
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Claim the next slot; returns how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self) -> None:
+        if not self.interval:
+            return
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _state_name(file) -> str:
+    state = getattr(file, "state", None)
+    return getattr(state, "name", None) or str(state or "ACTIVE")
+
+
+class AIPipeline:
+    def __init__(
+        self,
+        schema_path: Path,
+        client=None,
+        model: str | None = None,
+        max_concurrency: int | None = None,
+        requests_per_minute: float | None = None,
+        upload_timeout: float | None = None,
+        poll_interval: float = 0.5,
+        cache: ParseCache | None = None,
+        local_first: bool = True,
+        inline_schema: bool = False,
+        repair_rounds: int | None = None,
+        stream: bool | None = None,
+    ):
+        config = Config.get_instance()
+        self.schema_path = schema_path
+
+        if client is None:
+            # Ensure API key exists
+            self.api_key = os.environ.get("GEMINI_API_KEY")
+            if not self.api_key:
+                raise ValueError("GEMINI_API_KEY is not set in the environment or .env file.")
+            client = genai.Client(api_key=self.api_key)
+        self.client = client
+
+        self.model = model or config.GEMINI_MODEL
+        self.max_concurrency = max_concurrency or config.PARSE_CONCURRENCY
+        self.rate_limiter = RateLimiter(
+            config.PARSE_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute
+        )
+        self.upload_timeout = upload_timeout or config.PARSE_UPLOAD_TIMEOUT_SECONDS
+        self.poll_interval = poll_interval
+        self.cache = cache
+        self.local_first = local_first
+        self.inline_schema = inline_schema
+        self.repair_rounds = config.PARSE_REPAIR_ROUNDS if repair_rounds is None else repair_rounds
+        self.stream = config.PARSE_STREAM if stream is None else stream
+
+        with open(self.schema_path, 'r', encoding='utf-8') as f:
+            self.schema = json.load(f)
+        self.validator = Draft7Validator(self.schema, format_checker=FormatChecker())
+        self.response_schema = response_schema_for(self.schema)
+
+    # ----------------------------------------------------------------
+    # Request building
+    # ----------------------------------------------------------------
+
+    def _prompt(self) -> str:
+        if self.inline_schema:
+            return LEGACY_PROMPT.format(schema=json.dumps(self.schema, indent=2))
+        return PROMPT
+
+    def _repair_prompt(self, request: RepairRequest) -> str:
+        prompt = repair_prompt(request)
+        if self.inline_schema:
+            prompt += f"\n\nJSON Schema for the value:\n{json.dumps(request.schema)}"
+        return prompt
+
+    def _generate_config(self, schema: dict | None = None) -> types.GenerateContentConfig:
+        """Structured output config; `schema` narrows the response to a sub-schema (repairs)."""
+        if self.inline_schema:
+            return types.GenerateContentConfig(response_mime_type="application/json")
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=self.response_schema if schema is None else response_schema_for(schema),
+        )
+
+    @staticmethod
+    def _decode(response) -> dict:
+        try:
             return json.loads(response.text)
-            
-        except json.JSONDecodeError as e:
+        except json.JSONDecodeError:
             print("Failed to decode JSON from Gemini. Raw response:")
             print(response.text)
-            raise e
+            raise
+
+    def _section_done(self, name: str, value, on_section: SectionCallback | None) -> None:
+        errors = section_errors(self.validator, self.schema, name, value)
+        if errors:
+            print(f"Section {name} has {len(errors)} schema error(s); it will be repaired.")
+        if on_section:
+            on_section(name, value, errors)
+
+    def _report_sections(self, data: dict, on_section: SectionCallback | None) -> None:
+        """Local and cached results are complete at once; report their sections in order."""
+        if on_section:
+            for name, value in data.items():
+                self._section_done(name, value, on_section)
+
+    @staticmethod
+    def _decode_repair(request: RepairRequest, response):
+        try:
+            return json.loads(response.text)
+        except (json.JSONDecodeError, TypeError):
+            print(f"Repair of {request.label} returned invalid JSON; keeping the original.")
+            return MISSING
+
+    # ----------------------------------------------------------------
+    # Sync API (single PDF)
+    # ----------------------------------------------------------------
+
+    def _parse_locally(self, pdf_path: Path) -> dict | None:
+        """Fast path: our own template's layout, parsed without the model (None = escalate)."""
+        if not self.local_first:
+            return None
+        data = extract_template_resume(pdf_path)
+        if data is None:
+            return None
+        errors = list(self.validator.iter_errors(data))
+        if errors:
+            print(f"Local parse of {pdf_path.name} incomplete ({len(errors)} schema error(s)); using the model.")
+            return None
+        return data
+
+    def _cached(self, pdf_path: Path) -> tuple[str | None, dict | None]:
+        """(cache key, cached result) — both None without a cache."""
+        if self.cache is None:
+            return None, None
+        key = parse_key(pdf_path, self.schema, self.model)
+        return key, self.cache.get(key)
+
+    def _store(self, key: str | None, pdf_path: Path, data: dict) -> None:
+        """Caches a schema-valid result; one that still has errors is parsed again next time."""
+        if key is None:
+            return
+        errors = list(self.validator.iter_errors(data))
+        if errors:
+            print(f"Not caching the parse of {pdf_path.name} ({len(errors)} schema error(s) left).")
+            return
+        self.cache.put(key, data)
+
+    def parse_pdf_to_json(self, pdf_path: Path, on_section: SectionCallback | None = None) -> dict:
+        """
+        Uploads a PDF to Gemini, extracts the resume, and guarantees a JSON
+        response conforming to our internal resume schema. Retries on failure.
+        Served locally for our own template's layout, or from the parse cache
+        when the same PDF was parsed before.
+
+        `on_section(name, value, errors)` is called as each top-level section
+        completes (while the response is still streaming). A section can be
+        reported again if the extraction is re-asked, and sections with errors
+        are repaired before the result is returned. Raising ParseAborted from
+        the callback stops the parse (and the generation) without a retry.
+        """
+        data = self._parse_locally(pdf_path)
+        if data is not None:
+            print(f"Parsed {pdf_path.name} locally (template layout).")
+            self._report_sections(data, on_section)
+            return data
+        key, cached = self._cached(pdf_path)
+        if cached is not None:
+            print(f"Using cached parse of {pdf_path.name}.")
+            self._report_sections(cached, on_section)
+            return cached
+        data = self._parse_remote(pdf_path, on_section)
+        self._store(key, pdf_path, data)
+        return data
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(ParseAborted),
+    )
+    def _parse_remote(self, pdf_path: Path, on_section: SectionCallback | None = None) -> dict:
+        print(f"Uploading {pdf_path.name} to Gemini File API...")
+        uploaded_file = self.client.files.upload(file=str(pdf_path), config={'mime_type': 'application/pdf'})
+
+        try:
+            print("Extracting document features...")
+            uploaded_file = self._wait_until_active(uploaded_file)
+
+            print(f"Generating structured JSON using {self.model}...")
+            data = self._extract(uploaded_file, on_section)
+            return self._repair(uploaded_file, data)
         finally:
             print("Cleaning up remote file...")
             self.client.files.delete(name=uploaded_file.name)
+
+    def _generate(self, uploaded_file, prompt: str, schema: dict | None = None):
+        self.rate_limiter.acquire_sync()
+        return self.client.models.generate_content(
+            model=self.model,
+            contents=[uploaded_file, prompt],
+            config=self._generate_config(schema),
+        )
+
+    def _stream_sections(self, uploaded_file, on_section: SectionCallback | None) -> dict:
+        self.rate_limiter.acquire_sync()
+        parser = SectionStream()
+        stream = self.client.models.generate_content_stream(
+            model=self.model,
+            contents=[uploaded_file, self._prompt()],
+            config=self._generate_config(),
+        )
+        try:
+            for chunk in stream:
+                for name, value in parser.feed(chunk.text or ""):
+                    self._section_done(name, value, on_section)
+        finally:
+            # Stops the generation early if we bailed out on malformed output
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+        return parser.close()
+
+    def _extract(self, uploaded_file, on_section: SectionCallback | None = None) -> dict:
+        """Full extraction. Unparseable output is re-asked against the same upload instead of re-uploading."""
+        for attempt in range(self.repair_rounds + 1):
+            try:
+                if self.stream:
+                    return self._stream_sections(uploaded_file, on_section)
+                data = self._decode(self._generate(uploaded_file, self._prompt()))
+                self._report_sections(data, on_section)
+                return data
+            except json.JSONDecodeError:
+                if attempt == self.repair_rounds:
+                    raise
+                print("Asking again against the uploaded file...")
+
+    def _repair(self, uploaded_file, data: dict) -> dict:
+        """Re-ask for just the subtrees that fail validation, up to `repair_rounds` times."""
+        for _ in range(self.repair_rounds):
+            requests = repair_requests(self.validator, self.schema, data)
+            if not requests:
+                break
+            print(f"Repairing {len(requests)} part(s): {', '.join(r.label for r in requests)}")
+            for request in requests:
+                response = self._generate(uploaded_file, self._repair_prompt(request), request.schema)
+                value = self._decode_repair(request, response)
+                if value is not MISSING:
+                    data = apply_repair(data, request.path, value)
+        return data
+
+    def _wait_until_active(self, uploaded_file):
+        deadline = time.monotonic() + self.upload_timeout
+        delay = self.poll_interval
+        while _state_name(uploaded_file) == "PROCESSING":
+            if time.monotonic() > deadline:
+                raise UploadProcessingError(f"{uploaded_file.name} still processing after {self.upload_timeout:g}s.")
+            time.sleep(delay)
+            delay = min(delay * 2, 5.0)
+            uploaded_file = self.client.files.get(name=uploaded_file.name)
+        if _state_name(uploaded_file) == "FAILED":
+            raise UploadProcessingError(f"File API could not process {uploaded_file.name}.")
+        return uploaded_file
+
+    # ----------------------------------------------------------------
+    # Async API (bulk)
+    # ----------------------------------------------------------------
+
+    async def parse_pdf_async(self, pdf_path: Path, on_section: SectionCallback | None = None) -> dict:
+        """Async parse_pdf_to_json, for use with parse_many or an existing event loop."""
+        data = await asyncio.to_thread(self._parse_locally, pdf_path)
+        if data is not None:
+            self._report_sections(data, on_section)
+            return data
+        key, cached = await asyncio.to_thread(self._cached, pdf_path)
+        if cached is not None:
+            self._report_sections(cached, on_section)
+            return cached
+        data = await self._parse_remote_async(pdf_path, on_section)
+        await asyncio.to_thread(self._store, key, pdf_path, data)
+        return data
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(ParseAborted),
+    )
+    async def _parse_remote_async(self, pdf_path: Path, on_section: SectionCallback | None = None) -> dict:
+        uploaded_file = await self.client.aio.files.upload(
+            file=str(pdf_path), config={'mime_type': 'application/pdf'}
+        )
+        try:
+            uploaded_file = await self._wait_until_active_async(uploaded_file)
+            data = await self._extract_async(uploaded_file, on_section)
+            return await self._repair_async(uploaded_file, data)
+        finally:
+            try:
+                await self.client.aio.files.delete(name=uploaded_file.name)
+            except Exception as e:
+                print(f"[WARN] Could not delete remote file {uploaded_file.name}: {e}")
+
+    async def _generate_async(self, uploaded_file, prompt: str, schema: dict | None = None):
+        await self.rate_limiter.acquire()
+        return await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=[uploaded_file, prompt],
+            config=self._generate_config(schema),
+        )
+
+    async def _stream_sections_async(self, uploaded_file, on_section: SectionCallback | None) -> dict:
+        await self.rate_limiter.acquire()
+        parser = SectionStream()
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=[uploaded_file, self._prompt()],
+            config=self._generate_config(),
+        )
+        try:
+            async for chunk in stream:
+                for name, value in parser.feed(chunk.text or ""):
+                    self._section_done(name, value, on_section)
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose:
+                await aclose()
+        return parser.close()
+
+    async def _extract_async(self, uploaded_file, on_section: SectionCallback | None = None) -> dict:
+        for attempt in range(self.repair_rounds + 1):
+            try:
+                if self.stream:
+                    return await self._stream_sections_async(uploaded_file, on_section)
+                data = self._decode(await self._generate_async(uploaded_file, self._prompt()))
+                self._report_sections(data, on_section)
+                return data
+            except json.JSONDecodeError:
+                if attempt == self.repair_rounds:
+                    raise
+
+    async def _repair_async(self, uploaded_file, data: dict) -> dict:
+        """_repair, with the subtrees of one round repaired concurrently."""
+        for _ in range(self.repair_rounds):
+            requests = repair_requests(self.validator, self.schema, data)
+            if not requests:
+                break
+            responses = await asyncio.gather(*(
+                self._generate_async(uploaded_file, self._repair_prompt(request), request.schema)
+                for request in requests
+            ))
+            for request, response in zip(requests, responses):
+                value = self._decode_repair(request, response)
+                if value is not MISSING:
+                    data = apply_repair(data, request.path, value)
+        return data
+
+    async def _wait_until_active_async(self, uploaded_file):
+        deadline = time.monotonic() + self.upload_timeout
+        delay = self.poll_interval
+        while _state_name(uploaded_file) == "PROCESSING":
+            if time.monotonic() > deadline:
+                raise UploadProcessingError(f"{uploaded_file.name} still processing after {self.upload_timeout:g}s.")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 5.0)
+            uploaded_file = await self.client.aio.files.get(name=uploaded_file.name)
+        if _state_name(uploaded_file) == "FAILED":
+            raise UploadProcessingError(f"File API could not process {uploaded_file.name}.")
+        return uploaded_file
+
+    async def parse_many(
+        self,
+        pdf_paths: list[Path],
+        on_result: Callable[[Path, dict | None, Exception | None], None] | None = None,
+        on_section: Callable[[Path, str, object, list[str]], None] | None = None,
+    ) -> list[tuple[Path, dict | None, Exception | None]]:
+        """
+        Parse many PDFs with at most `max_concurrency` in flight.
+        Returns (pdf_path, data, error) per input, in input order; exactly one
+        of data / error is set. `on_result` is called as each PDF finishes,
+        `on_section` (with the PDF path first) as each of its sections does.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def parse_one(pdf_path: Path):
+            async with semaphore:
+                try:
+                    sections = (lambda *args: on_section(pdf_path, *args)) if on_section else None
+                    result = (pdf_path, await self.parse_pdf_async(pdf_path, sections), None)
+                except Exception as e:
+                    # tenacity wraps the final failure; report the real cause
+                    cause = getattr(e, "last_attempt", None)
+                    error = cause.exception() if cause is not None else e
+                    result = (pdf_path, None, error)
+            if on_result:
+                on_result(*result)
+            return result
+
+        return list(await asyncio.gather(*(parse_one(Path(p)) for p in pdf_paths)))
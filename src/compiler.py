@@ -3,21 +3,24 @@ import subprocess
 import shutil
 from pathlib import Path
 from src.config import Config
+from src.tracing import span
 
 class PDFCompiler:
     def __init__(self):
         self.config = Config.get_instance()
 
-    def compile_tex(self, tex_file_path: Path) -> Path:
+    def compile_tex(self, tex_file_path: Path, output_dir: Path | None = None) -> Path:
         """
         Compiles a .tex file to PDF using pdflatex.
         Returns the path to the generated PDF.
+
+        `output_dir` defaults to the .tex file's directory; concurrent compiles
+        should each use their own directory so pdflatex's aux files don't collide.
         """
         if not tex_file_path.exists():
             raise FileNotFoundError(f"LaTeX file not found: {tex_file_path}")
 
-        # Ensure output directory exists
-        output_dir = self.config.OUTPUT_DIR
+        output_dir = output_dir or tex_file_path.parent
         
         # We need to run pdflatex from the directory where the .tex file is
         # or specify -output-directory. We'll use the latter.
@@ -35,15 +38,17 @@ class PDFCompiler:
         
         try:
             # 1st Pass
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            with span("pdflatex_pass1"):
+                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
             # 2nd Pass (often needed for layout/refs)
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            with span("pdflatex_pass2"):
+                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
             
             pdf_filename = tex_file_path.with_suffix('.pdf').name
             pdf_path = output_dir / pdf_filename
 
             print(f"Compilation successful: {pdf_path}")
-            self._cleanup(tex_file_path.stem)
+            self._cleanup(tex_file_path.stem, output_dir)
             
             return pdf_path
 
@@ -54,12 +59,24 @@ class PDFCompiler:
             print("STDERR:", e.stderr)
             raise e
 
-    def _cleanup(self, file_stem: str):
+    def compile_to_storage(self, tex_file_path: Path, storage, metadata: dict | None = None) -> tuple[str, Path]:
+        """
+        Compiles next to the .tex file (a scratch build directory) and streams
+        the PDF into `storage` (an ArtifactStorage).
+        Returns (storage ref, local PDF path). The local copy stays in the
+        build directory until the caller removes it.
+        """
+        pdf_path = self.compile_tex(tex_file_path)
+        with span("storage_save"):
+            ref = storage.save(pdf_path, metadata=metadata)
+        return ref, pdf_path
+
+    def _cleanup(self, file_stem: str, output_dir: Path):
         """
         Removes auxiliary files (.aux, .log, .out) generated by pdflatex.
         """
         exts = ['.aux', '.log', '.out']
         for ext in exts:
-            file_to_remove = self.config.OUTPUT_DIR / (file_stem + ext)
+            file_to_remove = output_dir / (file_stem + ext)
             if file_to_remove.exists():
                 file_to_remove.unlink()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 class Config:
@@ -23,8 +24,117 @@ class Config:
         self.ENV = os.getenv("ENV", "local")
         self.DB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/resume_builder")
 
+        # MongoClient tuning (pool per process; compressors need zstandard / python-snappy)
+        self.MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+        self.MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+        self.MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "0"))
+        self.MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "2000"))
+        self.MONGO_COMPRESSORS = [
+            c.strip() for c in os.getenv("MONGO_COMPRESSORS", "").split(",") if c.strip()
+        ]
+        # Write concern for job status updates ("1", "majority", ...) and journaling
+        self.STATUS_WRITE_CONCERN = os.getenv("STATUS_WRITE_CONCERN", "majority")
+        self.STATUS_WRITE_JOURNAL = os.getenv("STATUS_WRITE_JOURNAL", "true").lower() == "true"
+
+        # Change-stream reconnect backoff cap (the resume token is kept per partition)
+        self.STREAM_RECONNECT_MAX_SECONDS = float(os.getenv("STREAM_RECONNECT_MAX_SECONDS", "5"))
+
+        # Horizontal scaling: replica WORKER_INDEX of WORKER_COUNT claims the jobs
+        # whose hashed owner (user_id or resume_id) falls in its partition (plus
+        # any job waiting longer than WORKER_STEAL_AFTER_SECONDS)
+        self.WORKER_INDEX = int(os.getenv("WORKER_INDEX", "0"))
+        self.WORKER_COUNT = int(os.getenv("WORKER_COUNT", "1"))
+        self.WORKER_STEAL_AFTER_SECONDS = float(os.getenv("WORKER_STEAL_AFTER_SECONDS", "30"))
+
+        # Job claiming: up to WORKER_BATCH_SIZE jobs per cycle, coalescing
+        # change-stream events for WORKER_BATCH_WINDOW_MS after the first one
+        self.WORKER_BATCH_SIZE = int(os.getenv("WORKER_BATCH_SIZE", "10"))
+        self.WORKER_BATCH_WINDOW_MS = int(os.getenv("WORKER_BATCH_WINDOW_MS", "200"))
+
+        # Backpressure / admission control:
+        #   WORKER_MAX_IN_FLIGHT   jobs processed concurrently by one worker
+        #   MAX_PENDING_PER_OWNER  PENDING jobs per owner before the rest are THROTTLED (0 = off)
+        #   OUTPUT_MIN_FREE_MB     stop claiming when output/ has less free space than this
+        self.WORKER_MAX_IN_FLIGHT = int(os.getenv("WORKER_MAX_IN_FLIGHT", "2"))
+        self.MAX_PENDING_PER_OWNER = int(os.getenv("MAX_PENDING_PER_OWNER", "50"))
+        self.OUTPUT_MIN_FREE_MB = int(os.getenv("OUTPUT_MIN_FREE_MB", "200"))
+        self.ADMISSION_INTERVAL_SECONDS = float(os.getenv("ADMISSION_INTERVAL_SECONDS", "15"))
+
+        # Terminal status updates are batched into one bulk_write per
+        # STATUS_BATCH_SIZE updates or STATUS_FLUSH_MS milliseconds
+        self.STATUS_BATCH_SIZE = int(os.getenv("STATUS_BATCH_SIZE", "50"))
+        self.STATUS_FLUSH_MS = int(os.getenv("STATUS_FLUSH_MS", "500"))
+
+        # Fair-share scheduling: "owner:weight,..." (owner = user_id or resume_id)
+        self.FAIR_SHARE_WEIGHTS = os.getenv("FAIR_SHARE_WEIGHTS", "")
+
+        # Job leases: claims expire unless the holder heartbeats; the reaper
+        # re-queues expired jobs until JOB_MAX_ATTEMPTS is reached
+        self.JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+        self.JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+        self.JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.REAPER_INTERVAL_SECONDS = float(os.getenv("REAPER_INTERVAL_SECONDS", "60"))
+
+        # Prometheus metrics (src/metrics.py) served on http://<host>:METRICS_PORT/metrics (0 = off)
+        self.METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+        # Opt-in profiling (src/profiling.py): jobs flagged `profile: true` plus a
+        # PROFILE_SAMPLE_RATE fraction of all jobs (0 = flagged jobs only).
+        # PROFILE_MODE "sampling" (folded stacks every PROFILE_INTERVAL_MS) or "cprofile"
+        # (one job at a time; others are sampled)
+        self.PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        self.PROFILE_MODE = os.getenv("PROFILE_MODE", "sampling").lower()
+        self.PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+        # Resume payloads resolved from snapshots, cached per worker process
+        self.SNAPSHOT_CACHE_SIZE = int(os.getenv("SNAPSHOT_CACHE_SIZE", "256"))
+
+        # Per-user Drive uploaders kept warm by the worker
+        self.DRIVE_UPLOADER_CACHE_SIZE = int(os.getenv("DRIVE_UPLOADER_CACHE_SIZE", "32"))
+        self.DRIVE_UPLOADER_IDLE_SECONDS = float(os.getenv("DRIVE_UPLOADER_IDLE_SECONDS", "900"))
+
         self.TEMPLATE_DIR = self.BASE_DIR / 'templates'
         self.OUTPUT_DIR = self.BASE_DIR / 'output'
+        self.ARCHIVE_DIR = Path(os.getenv("ARCHIVE_DIR", str(self.BASE_DIR / 'archive')))
+
+        # Retention (all off by default; 0 disables a rule): terminal jobs expire via
+        # TTL after GENERATIONS_TTL_DAYS; scripts/retention.py, run from a single
+        # cron job, keeps PDFs for OUTPUT_RETENTION_DAYS and at most OUTPUT_MAX_FILES
+        self.GENERATIONS_TTL_DAYS = float(os.getenv("GENERATIONS_TTL_DAYS", "0"))
+        self.OUTPUT_RETENTION_DAYS = float(os.getenv("OUTPUT_RETENTION_DAYS", "0"))
+        self.OUTPUT_MAX_FILES = int(os.getenv("OUTPUT_MAX_FILES", "0"))
+
+        # Where compiled PDFs live (see src/storage.py): "local" (output/),
+        # "gridfs" (GRIDFS_BUCKET) or "s3" (S3_BUCKET; S3_ENDPOINT_URL points at
+        # MinIO or another S3-compatible stand-in, credentials via AWS_* env vars)
+        self.ARTIFACT_STORAGE = os.getenv("ARTIFACT_STORAGE", "local").lower()
+        self.GRIDFS_BUCKET = os.getenv("GRIDFS_BUCKET", "pdfs")
+        self.GRIDFS_CHUNK_KB = int(os.getenv("GRIDFS_CHUNK_KB", "255"))
+        self.S3_BUCKET = os.getenv("S3_BUCKET", "")
+        self.S3_PREFIX = os.getenv("S3_PREFIX", "pdfs")
+        self.S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+        self.S3_REGION = os.getenv("S3_REGION")
+
+        # PDF -> JSON parsing (src/ai_pipeline.py): model, parallel parses for
+        # bulk runs, and the request budget shared by all of them
+        self.GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+        self.PARSE_CONCURRENCY = int(os.getenv("PARSE_CONCURRENCY", "8"))
+        self.PARSE_REQUESTS_PER_MINUTE = float(os.getenv("PARSE_REQUESTS_PER_MINUTE", "60"))
+        self.PARSE_UPLOAD_TIMEOUT_SECONDS = float(os.getenv("PARSE_UPLOAD_TIMEOUT_SECONDS", "120"))
+        # Targeted re-asks for unparseable JSON / failing subtrees before giving up
+        self.PARSE_REPAIR_ROUNDS = int(os.getenv("PARSE_REPAIR_ROUNDS", "2"))
+        # Stream responses and validate each section as soon as it is complete
+        self.PARSE_STREAM = os.getenv("PARSE_STREAM", "true").lower() == "true"
+        # PDF -> PDF imports (src/import_pipeline.py): pdflatex builds run at
+        # once while other PDFs are still being parsed
+        self.IMPORT_COMPILE_CONCURRENCY = int(os.getenv("IMPORT_COMPILE_CONCURRENCY", str(os.cpu_count() or 2)))
+        # Parse results cached by PDF hash + schema hash + model (0 = no size limit)
+        self.PARSE_CACHE_DIR = Path(os.getenv("PARSE_CACHE_DIR", str(self.BASE_DIR / '.cache' / 'parse')))
+        self.PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "1000"))
+
+        # Scratch space for pdflatex (one subdirectory per build). Keep it on
+        # fast local disk, not a bind mount; finished PDFs go to storage
+        self.BUILD_DIR = Path(os.getenv("BUILD_DIR", str(Path(tempfile.gettempdir()) / "resume-builder")))
 
         # Ensure output directory exists
         if not self.OUTPUT_DIR.exists():
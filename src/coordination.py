@@ -0,0 +1,65 @@
+"""
+src/coordination.py
+-------------------
+Work partitioning between worker replicas.
+
+Each replica is started with WORKER_INDEX (0-based) and WORKER_COUNT.
+A job belongs to the replica whose index matches a stable hash of its
+owner (the fair-share key, scheduler.owner_of), so N replicas claim
+disjoint slices of the queue instead of racing on every insert, and each
+owner's jobs are scheduled fairly by a single replica. Jobs that have
+waited longer than WORKER_STEAL_AFTER_SECONDS may be claimed by any
+replica, so a dead or missing replica never strands its partition.
+
+With WORKER_COUNT=1 (the default) every job is owned locally.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+
+from src.scheduler import owner_of
+
+
+def partition_of(key, count: int) -> int:
+    """Stable (process-independent) partition for `key`; Python's hash() is salted per process."""
+    digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+class Partitioner:
+    def __init__(self, index: int = 0, count: int = 1, steal_after_seconds: float = 30):
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Invalid worker partition {index}/{count}")
+        self.index = index
+        self.count = count
+        self.steal_after_seconds = steal_after_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self.count > 1
+
+    @staticmethod
+    def key_of(job: dict):
+        return owner_of(job)
+
+    def owns_key(self, key) -> bool:
+        return not self.enabled or partition_of(key, self.count) == self.index
+
+    def owns(self, job: dict) -> bool:
+        return self.owns_key(self.key_of(job))
+
+    def may_claim(self, job: dict, now: datetime | None = None) -> bool:
+        """Own partition, or another replica's job that has waited too long."""
+        return self.may_claim_key(self.key_of(job), job.get("createdAt"), now)
+
+    def may_claim_key(self, key, created: datetime | None, now: datetime | None = None) -> bool:
+        """may_claim() for an owner key whose oldest job was created at `created`."""
+        if self.owns_key(key):
+            return True
+        if created is None:
+            return False
+        now = now or datetime.utcnow()
+        return now - created > timedelta(seconds=self.steal_after_seconds)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
@@ -2,53 +2,121 @@
 src/db.py
 ---------
 MongoDB Connection Manager.
-Implements the Singleton pattern to ensure we only create one connection pool.
+Implements the Singleton pattern to ensure we only create one connection pool
+per process.
+
+Pool sizing, compression and the status write concern come from Config
+(MONGO_* / STATUS_WRITE_* env vars). The client is fork-safe: a child
+process (e.g. a multiprocess worker) never reuses the parent's sockets but
+transparently opens its own pool on first use.
 """
 
-from pymongo import MongoClient
+import importlib.util
+import os
+
+from pymongo import MongoClient, WriteConcern
 from pymongo.database import Database as MongoDatabase
 from src.config import Config
 
 
+DEFAULT_DB_NAME = "resume-builder"
+
+# Wire compressor -> Python module PyMongo needs for it
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def default_database(client: MongoClient) -> MongoDatabase:
+    """
+    The database named in the client's URI path, defaulting to 'resume-builder'.
+    Read from the client's already-parsed URI: parsing it again would repeat
+    the SRV/TXT DNS lookups of a mongodb+srv:// URI.
+    """
+    return client.get_default_database(DEFAULT_DB_NAME)
+
+
+def available_compressors(requested: list[str]) -> list[str]:
+    """Keep the requested compressors whose Python module is installed, in order."""
+    available = []
+    for name in requested:
+        module = _COMPRESSOR_MODULES.get(name)
+        if module is None:
+            print(f"[WARN] Unknown MongoDB compressor '{name}', ignoring.")
+        elif importlib.util.find_spec(module) is None:
+            print(f"[WARN] MongoDB compressor '{name}' needs `pip install {module}`, ignoring.")
+        else:
+            available.append(name)
+    return available
+
+
 class Database:
     _client: MongoClient | None = None
     _db: MongoDatabase | None = None
+    _pid: int | None = None
 
     @classmethod
     def connect(cls) -> None:
-        if cls._client is not None:
+        if cls._client is not None and cls._pid == os.getpid():
             return
+        # Inherited from a parent process: drop it without closing (its
+        # sockets belong to the parent) and build a fresh pool below.
+        cls._client = None
+        cls._db = None
 
         config = Config.get_instance()
         uri = config.DB_URI
         print(f"Connecting to MongoDB at {uri}...")
-        
-        # Connect with serverSelectionTimeoutMS so it fails fast if local DB isn't running
-        cls._client = MongoClient(uri, serverSelectionTimeoutMS=2000)
-        
-        # Extract database name from URI, defaulting to 'resume-builder'
-        db_name = uri.split("/")[-1].split("?")[0]
-        if not db_name:
-            db_name = "resume-builder"
-            
-        cls._db = cls._client[db_name]
-        
+
+        options = {
+            # Fail fast if the local DB isn't running
+            "serverSelectionTimeoutMS": config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "maxPoolSize": config.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": config.MONGO_MIN_POOL_SIZE,
+        }
+        if config.MONGO_MAX_IDLE_TIME_MS:
+            options["maxIdleTimeMS"] = config.MONGO_MAX_IDLE_TIME_MS
+        compressors = available_compressors(config.MONGO_COMPRESSORS)
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+
+        cls._client = MongoClient(uri, **options)
+        cls._db = default_database(cls._client)
+        cls._pid = os.getpid()
+
         # Ping to verify connection
         cls._client.admin.command('ping')
         print("Successfully connected to MongoDB.")
 
     @classmethod
     def get_db(cls) -> MongoDatabase:
-        """Returns the active database instance. Creates connection if it doesn't exist."""
-        if cls._db is None:
+        """Returns the active database instance. Creates connection if it doesn't exist (or after a fork)."""
+        if cls._db is None or cls._pid != os.getpid():
             cls.connect()
         return cls._db
 
+    @classmethod
+    def status_write_concern(cls) -> WriteConcern:
+        """Write concern for job status updates (STATUS_WRITE_CONCERN / STATUS_WRITE_JOURNAL)."""
+        config = Config.get_instance()
+        w = config.STATUS_WRITE_CONCERN
+        return WriteConcern(w=int(w) if w.isdigit() else w, j=config.STATUS_WRITE_JOURNAL)
+
     @classmethod
     def close(cls) -> None:
         """Closes the MongoDB connection."""
         if cls._client is not None:
-            cls._client.close()
+            if cls._pid == os.getpid():
+                cls._client.close()
             cls._client = None
             cls._db = None
+            cls._pid = None
             print("MongoDB connection closed.")
+
+    @classmethod
+    def _reset_after_fork(cls) -> None:
+        cls._client = None
+        cls._db = None
+        cls._pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=Database._reset_after_fork)
@@ -12,9 +12,19 @@ Usage:
     uploader = DriveUploader(creds)
     link = uploader.upload_pdf(Path("output/Aryan_PI_2602.pdf"), meta_code="PI")
     print(link)
+
+Multi-user (worker):
+    cache = DriveUploaderCache(max_size=32, idle_seconds=900)
+    uploader = cache.get(user_id, user["drive_token"])
 """
 
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Callable, Hashable
+
+from src.tracing import span, traced
 
 
 RESUME_ROOT_FOLDER = "Resume"
@@ -34,8 +44,11 @@ class DriveUploader:
                 "Google API client not installed. Run: "
                 "pip install google-api-python-client google-auth-oauthlib"
             )
+        self.creds = creds
         self.service = build("drive", "v3", credentials=creds, cache_discovery=False)
         self._folder_cache: dict[str, str] = {}   # name -> folder_id
+        # The underlying httplib2 transport is not thread-safe
+        self._lock = threading.Lock()
 
     # ----------------------------------------------------------------
     # Folder helpers
@@ -81,6 +94,7 @@ class DriveUploader:
         self._folder_cache[cache_key] = folder_id
         return folder_id
 
+    @traced("drive_folders")
     def ensure_structure(self, meta_code: str) -> str:
         """
         Ensure  My Drive → Resume/ → Resume/<meta_code>/  exists.
@@ -94,6 +108,7 @@ class DriveUploader:
     # Upload
     # ----------------------------------------------------------------
 
+    @traced("drive_lookup")
     def _find_existing_file(self, filename: str, parent_id: str) -> str | None:
         """Return file ID if a file with `filename` already exists in `parent_id`."""
         query = (
@@ -115,6 +130,14 @@ class DriveUploader:
         Returns:
             A shareable Google Drive view link for the uploaded file.
         """
+        with span("drive_wait"):
+            self._lock.acquire()
+        try:
+            return self._upload_pdf(pdf_path, meta_code)
+        finally:
+            self._lock.release()
+
+    def _upload_pdf(self, pdf_path: Path, meta_code: str) -> str:
         try:
             from googleapiclient.http import MediaFileUpload
         except ImportError:
@@ -129,40 +152,176 @@ class DriveUploader:
 
         existing_id = self._find_existing_file(filename, folder_id)
 
-        if existing_id:
-            # Update existing file (keeps same ID / share link)
-            file = (
-                self.service.files()
-                .update(
-                    fileId=existing_id,
-                    media_body=media,
-                    fields="id, webViewLink",
+        with span("drive_upload"):
+            if existing_id:
+                # Update existing file (keeps same ID / share link)
+                file = (
+                    self.service.files()
+                    .update(
+                        fileId=existing_id,
+                        media_body=media,
+                        fields="id, webViewLink",
+                    )
+                    .execute()
                 )
-                .execute()
-            )
-            file_id = existing_id
-        else:
-            # Create new file
-            meta = {"name": filename, "parents": [folder_id]}
-            file = (
-                self.service.files()
-                .create(
-                    body=meta,
-                    media_body=media,
-                    fields="id, webViewLink",
+                file_id = existing_id
+            else:
+                # Create new file
+                meta = {"name": filename, "parents": [folder_id]}
+                file = (
+                    self.service.files()
+                    .create(
+                        body=meta,
+                        media_body=media,
+                        fields="id, webViewLink",
+                    )
+                    .execute()
                 )
-                .execute()
-            )
-            file_id = file["id"]
+                file_id = file["id"]
 
         # Make the file viewable by anyone with the link
         try:
-            self.service.permissions().create(
-                fileId=file_id,
-                body={"type": "anyone", "role": "reader"},
-                fields="id"
-            ).execute()
+            with span("drive_permissions"):
+                self.service.permissions().create(
+                    fileId=file_id,
+                    body={"type": "anyone", "role": "reader"},
+                    fields="id"
+                ).execute()
         except Exception as e:
             print(f"  [Warning] Could not set public permissions: {e}")
 
         return file.get("webViewLink", f"https://drive.google.com/file/d/{file_id}/view")
+
+
+# ----------------------------------------------------------------
+# Per-user uploader cache (multi-tenant worker)
+# ----------------------------------------------------------------
+
+def _uploader_from_token(token_dict: dict) -> DriveUploader:
+    from src.auth import get_credentials
+    return DriveUploader(get_credentials(token_dict=token_dict))
+
+
+def _token_fingerprint(token_dict: dict) -> str:
+    """Identifies a stored grant, so a re-authenticated user gets a fresh uploader."""
+    return str(token_dict.get("refresh_token") or token_dict.get("token") or "")
+
+
+class DriveUploaderCache:
+    """
+    Bounded LRU cache of per-user DriveUploader instances.
+
+    Building a Drive service (plus its folder-ID cache) per job is wasteful,
+    so the worker keeps one uploader per user and reuses it across jobs.
+
+    - At most `max_size` uploaders are kept; the least recently used is evicted.
+    - Entries unused for `idle_seconds` are dropped on the next lookup.
+    - Expired credentials are refreshed once when handed out; if that
+      refresh fails the entry is evicted and rebuilt from the stored token.
+      `on_refresh(user_key, creds)` lets the caller persist the new token,
+      including one refreshed while building a new uploader.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 32,
+        idle_seconds: float = 900,
+        factory: Callable[[dict], DriveUploader] = _uploader_from_token,
+        on_refresh: Callable[[Hashable, object], None] | None = None,
+    ):
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._factory = factory
+        self._on_refresh = on_refresh
+        self._entries: OrderedDict[Hashable, tuple[DriveUploader, str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        # One refresh at a time per user; held without self._lock
+        self._refresh_locks: dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_key: Hashable, token_dict: dict) -> DriveUploader:
+        """Return a ready-to-use uploader for `user_key`, building one if needed."""
+        fingerprint = _token_fingerprint(token_dict)
+        now = time.monotonic()
+
+        cached = None
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(user_key)
+            if entry is not None and entry[1] == fingerprint:
+                cached = entry[0]
+                self._entries[user_key] = (cached, fingerprint, now)
+                self._entries.move_to_end(user_key)
+            else:
+                self._entries.pop(user_key, None)
+
+        # Refresh and build outside the lock: token refresh and discovery are
+        # network calls, and other users' lookups must not wait on them.
+        if cached is not None:
+            with self._refresh_lock(user_key):
+                fresh = self._ensure_fresh(user_key, cached)
+            if fresh:
+                with self._lock:
+                    self.hits += 1
+                return cached
+            with self._lock:
+                if self._entries.get(user_key, (None,))[0] is cached:
+                    del self._entries[user_key]
+
+        with self._lock:
+            self.misses += 1
+        uploader = self._factory(token_dict)
+        creds = getattr(uploader, "creds", None)
+        if self._on_refresh and creds is not None and getattr(creds, "token", None) != token_dict.get("token"):
+            # Building refreshed an expired stored token
+            self._on_refresh(user_key, creds)
+
+        with self._lock:
+            self._entries[user_key] = (uploader, fingerprint, time.monotonic())
+            self._entries.move_to_end(user_key)
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+        return uploader
+
+    def invalidate(self, user_key: Hashable) -> None:
+        """Drop a user's uploader (e.g. after a 401 or a revoked grant)."""
+        with self._lock:
+            self._drop(user_key)
+
+    def _drop(self, user_key: Hashable) -> None:
+        """Remove a user's entry and refresh lock. Caller holds self._lock."""
+        self._entries.pop(user_key, None)
+        self._refresh_locks.pop(user_key, None)
+
+    def _refresh_lock(self, user_key: Hashable) -> threading.Lock:
+        with self._lock:
+            return self._refresh_locks.setdefault(user_key, threading.Lock())
+
+    def _evict_idle(self, now: float) -> None:
+        stale = [
+            key for key, (_, _, last_used) in self._entries.items()
+            if now - last_used > self.idle_seconds
+        ]
+        for key in stale:
+            self._drop(key)
+
+    def _ensure_fresh(self, user_key: Hashable, uploader: DriveUploader) -> bool:
+        """Refresh expired credentials once. Returns False if the entry is unusable."""
+        creds = getattr(uploader, "creds", None)
+        if creds is None or not getattr(creds, "expired", False):
+            return True
+        if not getattr(creds, "refresh_token", None):
+            return False
+        try:
+            from google.auth.transport.requests import Request
+            creds.refresh(Request())
+        except Exception as e:
+            print(f"  [Warning] Drive token refresh failed for {user_key}: {e}")
+            return False
+        if self._on_refresh:
+            self._on_refresh(user_key, creds)
+        return True
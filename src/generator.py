@@ -3,6 +3,7 @@ import os
 from jinja2 import Environment, FileSystemLoader
 from src.config import Config
 from src.utils import LatexSanitizer
+from src.tracing import span
 
 class ResumeGenerator:
     def __init__(self):
@@ -32,8 +33,10 @@ class ResumeGenerator:
     def generate_tex_from_data(self, data: dict, template_name: str = "base_resume.tex") -> str:
         """Render LaTeX from an in-memory resume_data dict."""
         # 1. Sanitize JSON
-        sanitized_data = LatexSanitizer.sanitize_payload(data)
+        with span("sanitize"):
+            sanitized_data = LatexSanitizer.sanitize_payload(data)
 
         # 2. Render Template
-        template = self.env.get_template(template_name)
-        return template.render(**sanitized_data)
+        with span("render"):
+            template = self.env.get_template(template_name)
+            return template.render(**sanitized_data)
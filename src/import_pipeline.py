@@ -0,0 +1,157 @@
+"""
+src/import_pipeline.py
+----------------------
+PDF resume -> our PDF in one pass: AIPipeline parse, in-memory validation,
+ResumeGenerator render and PDFCompiler build, with nothing written to
+data/ and nothing re-read from disk.
+
+Each input flows through its own chain of stages, so while one PDF is in
+pdflatex others are still being parsed. Parsing is bounded by the
+AIPipeline (PARSE_CONCURRENCY and its request budget), builds by
+IMPORT_COMPILE_CONCURRENCY. The only files touched are the .tex/.pdf in
+a per-build scratch directory under BUILD_DIR, which pdflatex needs;
+finished PDFs go straight to artifact storage.
+
+Usage:
+    importer = ImportPipeline(AIPipeline(schema_path), open_storage(config))
+    results = asyncio.run(importer.run(pdf_paths))
+    for result in results: ...  # ImportResult(source, data, ref, errors, error)
+
+The worker uses `parse()` for `generations` jobs that carry a `source_pdf`.
+"""
+
+import asyncio
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from src.ai_pipeline import AIPipeline
+from src.compiler import PDFCompiler
+from src.config import Config
+from src.generator import ResumeGenerator
+from src.validation import friendly_path
+
+
+class InvalidResumeError(ValueError):
+    """A parsed resume still fails schema validation after the repair rounds."""
+
+    def __init__(self, source: str, errors: list[str]):
+        self.errors = errors
+        shown = "; ".join(errors[:5]) + (f" (+{len(errors) - 5} more)" if len(errors) > 5 else "")
+        super().__init__(f"{source}: {len(errors)} schema error(s): {shown}")
+
+
+@dataclass
+class ImportResult:
+    source: Path
+    data: dict | None = None
+    ref: str | None = None                  # storage ref of the built PDF
+    errors: list[str] = field(default_factory=list)
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.ref is not None
+
+
+def output_name(source: Path, data: dict) -> str:
+    """<source stem>_<CODE>.pdf; re-importing the same file replaces its output."""
+    stem = re.sub(r"[^\w.-]+", "_", Path(source).stem).strip("_") or "resume"
+    code = re.sub(r"\W+", "", str(data.get("meta", {}).get("code", ""))).upper() or "NEW"
+    return f"{stem}_{code}.pdf"
+
+
+class ImportPipeline:
+    def __init__(
+        self,
+        ai: AIPipeline,
+        storage,
+        generator: ResumeGenerator | None = None,
+        compiler: PDFCompiler | None = None,
+        compile_concurrency: int | None = None,
+        template: str = "base_resume.tex",
+    ):
+        config = Config.get_instance()
+        self.ai = ai
+        self.storage = storage
+        self.generator = generator or ResumeGenerator()
+        self.compiler = compiler or PDFCompiler()
+        self.compile_concurrency = compile_concurrency or config.IMPORT_COMPILE_CONCURRENCY
+        self.template = template
+        self.build_dir = config.BUILD_DIR
+
+    # ----------------------------------------------------------------
+    # Stages
+    # ----------------------------------------------------------------
+
+    def validation_errors(self, data) -> list[str]:
+        errors = sorted(self.ai.validator.iter_errors(data), key=lambda e: list(e.absolute_path))
+        return [f"{friendly_path(e)}: {e.message}" for e in errors]
+
+    def _checked(self, pdf_path: Path, data) -> dict:
+        errors = self.validation_errors(data)
+        if errors:
+            raise InvalidResumeError(Path(pdf_path).name, errors)
+        return data
+
+    def parse(self, pdf_path: Path) -> dict:
+        """Parse and validate in memory; raises InvalidResumeError if the result doesn't conform."""
+        return self._checked(pdf_path, self.ai.parse_pdf_to_json(Path(pdf_path)))
+
+    async def parse_async(self, pdf_path: Path) -> dict:
+        return self._checked(pdf_path, await self.ai.parse_pdf_async(Path(pdf_path)))
+
+    def build(self, data: dict, name: str, metadata: dict | None = None) -> str:
+        """Render + compile in a scratch directory and store the PDF as `name`. Returns the storage ref."""
+        tex_content = self.generator.generate_tex_from_data(data, self.template)
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        scratch = Path(tempfile.mkdtemp(prefix="import-", dir=self.build_dir))
+        try:
+            tex_path = scratch / Path(name).with_suffix(".tex").name
+            tex_path.write_text(tex_content, encoding="utf-8")
+            ref, _ = self.compiler.compile_to_storage(tex_path, self.storage, metadata=metadata)
+            return ref
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    # ----------------------------------------------------------------
+    # Pipelined run
+    # ----------------------------------------------------------------
+
+    async def run(
+        self,
+        pdf_paths: list[Path],
+        on_result: Callable[[ImportResult], None] | None = None,
+    ) -> list[ImportResult]:
+        """
+        Import many PDFs with parsing and building overlapped across inputs.
+        Returns one ImportResult per input, in input order; `on_result` is
+        called as each one finishes.
+        """
+        parse_slots = asyncio.Semaphore(self.ai.max_concurrency)
+        build_slots = asyncio.Semaphore(self.compile_concurrency)
+
+        async def import_one(pdf_path: Path) -> ImportResult:
+            result = ImportResult(source=pdf_path)
+            try:
+                async with parse_slots:
+                    result.data = await self.ai.parse_pdf_async(pdf_path)
+                result.errors = self.validation_errors(result.data)
+                if not result.errors:
+                    # The parse slot is already free for the next PDF
+                    async with build_slots:
+                        result.ref = await asyncio.to_thread(
+                            self.build, result.data, output_name(pdf_path, result.data), {"source": pdf_path.name}
+                        )
+            except Exception as e:
+                # tenacity wraps the final parse failure; report the real cause
+                cause = getattr(e, "last_attempt", None)
+                result.error = cause.exception() if cause is not None else e
+            if on_result:
+                on_result(result)
+            return result
+
+        return list(await asyncio.gather(*(import_one(Path(p)) for p in pdf_paths)))
@@ -0,0 +1,371 @@
+"""
+src/job_queue.py
+----------------
+Batched claiming for the `generations` job queue.
+
+Instead of one find_one_and_update per job, a batch is claimed with:
+  1. update_many  — flip up to K PENDING ids to PROCESSING, stamped with
+                    a fresh claim token (atomic per document, so two
+                    workers can never claim the same job)
+  2. find         — fetch exactly the documents carrying that token
+
+The sweep path first reads candidates: one aggregation ranks the
+(owner, priority) groups of PENDING jobs by their oldest job, then one small
+indexed query per selected group fetches at most K of its jobs, so an owner
+with a huge backlog costs no more than one with a single job. Which K to
+claim is delegated to FairScheduler (priority tiers + per-owner fairness),
+restricted to this replica's partition when several workers run.
+
+Claims are leases: each claimed job carries `worker_id`, `leased_until` and
+`claimedAt` (time of the latest claim, for queue-latency measurements).
+A live worker keeps extending the lease via heartbeat(); if it dies, the
+reaper returns the job to PENDING (bumping `attempts`), or marks it FAILED
+once JOB_MAX_ATTEMPTS is reached.
+
+Admission control: an owner may have at most MAX_PENDING_PER_OWNER jobs
+PENDING; newer overflow is parked as THROTTLED and released back to
+PENDING as that owner's queue drains.
+"""
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable
+
+import pymongo
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+
+from src.coordination import Partitioner
+from src.scheduler import FairScheduler
+
+
+# Fair-share / admission key: the job's user, falling back to its resume,
+# then to the job itself (the server-side form of scheduler.owner_of)
+OWNER_KEY = {"$ifNull": ["$user_id", {"$ifNull": ["$resume_id", "$_id"]}]}
+
+# What the scheduler and partitioner read from a candidate
+CANDIDATE_FIELDS = {"priority": 1, "createdAt": 1, "user_id": 1, "resume_id": 1}
+
+QUEUED_STATUSES = ["PENDING", "THROTTLED", "PROCESSING"]
+
+# Fields the worker needs from a claimed job. Jobs may still embed
+# resume_data (legacy) but new ones reference a snapshot instead; import
+# jobs carry an uploaded PDF (`source_pdf`, a storage ref, and its upload
+# name in `source_filename`) to parse first;
+# `profile: true` asks for a profile of the run (src/profiling.py);
+# `claim_token` identifies this claim when the result is written back.
+JOB_FIELDS = {
+    "claim_token": 1,
+    "output_filename": 1,
+    "meta_code": 1,
+    "resume_id": 1,
+    "version_number": 1,
+    "content_hash": 1,
+    "resume_data": 1,
+    "source_pdf": 1,
+    "source_filename": 1,
+    "user_id": 1,
+    "priority": 1,
+    "attempts": 1,
+    "profile": 1,
+}
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    def __init__(
+        self,
+        collection: Collection,
+        batch_size: int = 10,
+        lease_seconds: float = 120,
+        max_attempts: int = 3,
+        worker_id: str | None = None,
+        scheduler: FairScheduler | None = None,
+        partitioner: Partitioner | None = None,
+        ttl_days: float = 0,
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.scheduler = scheduler or FairScheduler()
+        self.partitioner = partitioner or Partitioner()
+        # Terminal jobs get expireAt = finish time + ttl_days (0 = keep forever)
+        self.ttl_days = ttl_days
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or default_worker_id()
+
+    def _lease_deadline(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    def _expiry_fields(self, now: datetime) -> dict:
+        if self.ttl_days <= 0:
+            return {}
+        return {"expireAt": now + timedelta(days=self.ttl_days)}
+
+    def claim_ids(self, ids: Iterable) -> list[dict]:
+        """
+        Claim the given job ids (those still PENDING) in one round-trip.
+        Returns the claimed documents in the order the ids were given.
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+
+        token = uuid.uuid4().hex
+        now = datetime.utcnow()
+        result = self.collection.update_many(
+            {"_id": {"$in": ids}, "status": "PENDING"},
+            {"$set": {
+                "status": "PROCESSING",
+                "claim_token": token,
+                "worker_id": self.worker_id,
+                "leased_until": self._lease_deadline(),
+                "claimedAt": now,
+                "updatedAt": now,
+            }}
+        )
+        if result.modified_count == 0:
+            return []
+
+        rank = {job_id: i for i, job_id in enumerate(ids)}
+        claimed = self.collection.find({"claim_token": token}, JOB_FIELDS)
+        return sorted(claimed, key=lambda job: rank[job["_id"]])
+
+    def claim_pending(self, limit: int | None = None) -> list[dict]:
+        """Claim up to `limit` PENDING jobs, chosen by the fair-share scheduler."""
+        limit = limit or self.batch_size
+        now = datetime.utcnow()
+        candidates = [
+            job for job in self._candidates(limit)
+            if self.partitioner.may_claim(job, now)
+        ]
+        picked = self.scheduler.order(candidates, limit)
+        return self.claim_ids(job["_id"] for job in picked)
+
+    def _candidates(self, limit: int) -> list[dict]:
+        """
+        The first `limit` PENDING jobs of each (owner, priority) group, for the
+        `limit` groups with the highest priority / longest-waiting head that
+        this replica may claim. Groups are filtered by partition before the
+        limit, so a replica never comes up empty while it owns deeper jobs.
+        Only the fields the scheduler needs are returned.
+        """
+        now = datetime.utcnow()
+        candidates = []
+        taken = 0
+        with self.collection.aggregate([
+            {"$match": {"status": "PENDING"}},
+            {"$project": {
+                "owner": OWNER_KEY,
+                "priority": {"$ifNull": ["$priority", 0]},
+                "createdAt": 1,
+            }},
+            {"$group": {
+                "_id": {"owner": "$owner", "priority": "$priority"},
+                "head": {"$min": "$createdAt"},
+            }},
+            {"$sort": {"_id.priority": pymongo.DESCENDING, "head": pymongo.ASCENDING}},
+        ], allowDiskUse=True) as groups:
+            for group in groups:
+                owner, priority = group["_id"]["owner"], group["_id"]["priority"]
+                # Another replica's owner, unless its oldest job is stealable
+                if not self.partitioner.may_claim_key(owner, group["head"], now):
+                    continue
+                candidates.extend(self._group_jobs(owner, priority, limit))
+                taken += 1
+                if taken == limit:
+                    break
+        return candidates
+
+    def _group_jobs(self, owner, priority: int, limit: int) -> list[dict]:
+        """Oldest `limit` PENDING jobs of one (owner, priority) group; see migration 007."""
+        query = {
+            "status": "PENDING",
+            # Same precedence as OWNER_KEY: user_id, else resume_id, else _id
+            "$or": [
+                {"user_id": owner},
+                {"user_id": None, "resume_id": owner},
+                {"user_id": None, "resume_id": None, "_id": owner},
+            ],
+            "priority": {"$in": [0, None]} if priority == 0 else priority,
+        }
+        return list(
+            self.collection.find(query, CANDIDATE_FIELDS)
+            .sort("createdAt", pymongo.ASCENDING)
+            .limit(limit)
+        )
+
+    # ----------------------------------------------------------------
+    # Leases
+    # ----------------------------------------------------------------
+
+    def heartbeat(self, ids: Iterable) -> int:
+        """Extend the lease on jobs this worker still holds. Returns how many were renewed."""
+        ids = list(ids)
+        if not ids:
+            return 0
+        result = self.collection.update_many(
+            {"_id": {"$in": ids}, "status": "PROCESSING", "worker_id": self.worker_id},
+            {"$set": {"leased_until": self._lease_deadline()}}
+        )
+        return result.modified_count
+
+    def complete(self, job: dict, fields: dict) -> bool:
+        """
+        Write a terminal status for a claimed job (as returned by claim_ids)
+        and release its lease. Returns False if the lease was lost: the job
+        was reaped, and possibly re-claimed or already finished elsewhere.
+        """
+        result = self.collection.update_one(*self._completion(job, fields))
+        return result.modified_count == 1
+
+    def completion_op(self, job: dict, fields: dict) -> UpdateOne:
+        """The same write as complete(), as a bulk_write operation."""
+        return UpdateOne(*self._completion(job, fields))
+
+    @staticmethod
+    def completed_filter(job: dict) -> dict:
+        """Matches the job once this claim's completion has been applied."""
+        return {"_id": job["_id"], "finished_claim": job["claim_token"]}
+
+    def _completion(self, job: dict, fields: dict) -> tuple[dict, dict]:
+        now = datetime.utcnow()
+        # Only the claim that is still current may finish the job; it leaves
+        # its token in `finished_claim` so the write can be confirmed later.
+        # The op may sit in the StatusWriter buffer for a while, so updatedAt
+        # is stamped by the server when the write is applied
+        return (
+            {
+                "_id": job["_id"],
+                "status": "PROCESSING",
+                "worker_id": self.worker_id,
+                "claim_token": job["claim_token"],
+            },
+            {
+                "$set": {**fields, **self._expiry_fields(now), "finished_claim": job["claim_token"]},
+                "$currentDate": {"updatedAt": True},
+                "$unset": {"leased_until": "", "claim_token": ""},
+            },
+        )
+
+    def reap_expired(self) -> tuple[int, int]:
+        """
+        Recover jobs whose lease ran out (crashed or killed worker).
+
+        Jobs below the attempt limit go back to PENDING with `attempts`
+        incremented; the rest are marked FAILED.
+        Returns (requeued, failed).
+        """
+        now = datetime.utcnow()
+        expired = {
+            "status": "PROCESSING",
+            "$or": [
+                {"leased_until": {"$lt": now}},
+                # Claimed before leases existed
+                {
+                    "leased_until": {"$exists": False},
+                    "updatedAt": {"$lt": now - timedelta(seconds=self.lease_seconds)},
+                },
+            ],
+        }
+        release = {"worker_id": "", "leased_until": "", "claim_token": ""}
+
+        failed = self.collection.update_many(
+            {**expired, "attempts": {"$gte": self.max_attempts - 1}},
+            {
+                "$set": {
+                    "status": "FAILED",
+                    "error_log": f"Lease expired {self.max_attempts} times; giving up.",
+                    **self._expiry_fields(now),
+                    "updatedAt": now,
+                },
+                "$inc": {"attempts": 1},
+                "$unset": release,
+            }
+        )
+        requeued = self.collection.update_many(
+            expired,
+            {
+                "$set": {"status": "PENDING", "updatedAt": now},
+                "$inc": {"attempts": 1},
+                "$unset": release,
+            }
+        )
+        return requeued.modified_count, failed.modified_count
+
+    # ----------------------------------------------------------------
+    # Admission control
+    # ----------------------------------------------------------------
+
+    def depth(self) -> dict[str, int]:
+        """Number of jobs per non-terminal status, e.g. {"PENDING": 12, "PROCESSING": 2}."""
+        counts = {status: 0 for status in QUEUED_STATUSES}
+        for row in self.collection.aggregate([
+            {"$match": {"status": {"$in": QUEUED_STATUSES}}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+        ]):
+            counts[row["_id"]] = row["count"]
+        return counts
+
+    def throttle_overflow(self, max_pending_per_owner: int) -> int:
+        """
+        Park each owner's PENDING jobs beyond the limit as THROTTLED
+        (lowest priority / newest first). Returns how many were parked.
+        """
+        if max_pending_per_owner <= 0:
+            return 0
+
+        limit = max_pending_per_owner
+        overflow = []
+        for group in self.collection.aggregate([
+            {"$match": {"status": "PENDING"}},
+            {"$sort": {"priority": pymongo.DESCENDING, "createdAt": pymongo.ASCENDING}},
+            {"$group": {"_id": OWNER_KEY, "count": {"$sum": 1}, "ids": {"$push": "$_id"}}},
+            {"$match": {"count": {"$gt": limit}}},
+        ], allowDiskUse=True):
+            overflow.extend(group["ids"][limit:])
+
+        if not overflow:
+            return 0
+        now = datetime.utcnow()
+        result = self.collection.update_many(
+            {"_id": {"$in": overflow}, "status": "PENDING"},
+            {"$set": {"status": "THROTTLED", "throttledAt": now, "updatedAt": now}}
+        )
+        return result.modified_count
+
+    def release_throttled(self, max_pending_per_owner: int) -> int:
+        """
+        Move THROTTLED jobs back to PENDING while their owner is under the
+        limit (all of them if the limit is disabled). Returns how many were released.
+        """
+        query = {"status": "THROTTLED"}
+        if max_pending_per_owner > 0:
+            limit = max_pending_per_owner
+            release = []
+            for group in self.collection.aggregate([
+                {"$match": {"status": {"$in": ["PENDING", "THROTTLED"]}}},
+                {"$sort": {"priority": pymongo.DESCENDING, "createdAt": pymongo.ASCENDING}},
+                {"$group": {
+                    "_id": OWNER_KEY,
+                    "pending": {"$sum": {"$cond": [{"$eq": ["$status", "PENDING"]}, 1, 0]}},
+                    "throttled": {"$push": {"$cond": [{"$eq": ["$status", "THROTTLED"]}, "$_id", None]}},
+                }},
+                {"$match": {"pending": {"$lt": limit}}},
+            ], allowDiskUse=True):
+                throttled = [job_id for job_id in group["throttled"] if job_id is not None]
+                release.extend(throttled[:limit - group["pending"]])
+            if not release:
+                return 0
+            query["_id"] = {"$in": release}
+
+        result = self.collection.update_many(
+            query,
+            {"$set": {"status": "PENDING", "updatedAt": datetime.utcnow()}, "$unset": {"throttledAt": ""}}
+        )
+        return result.modified_count
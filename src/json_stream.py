@@ -0,0 +1,126 @@
+"""
+src/json_stream.py
+------------------
+Incremental parser for a streamed top-level JSON object.
+
+Model responses arrive as text chunks. SectionStream scans each chunk once
+(tracking strings, escapes and open brackets) and hands back every
+top-level member as soon as its value is complete, so `basics` can be
+validated while `work` is still being generated. Malformed output raises
+StreamDecodeError as soon as it is seen, which lets the caller abort the
+generation instead of waiting for the rest of it.
+
+Usage:
+    parser = SectionStream()
+    for chunk in stream:
+        for name, value in parser.feed(chunk.text):
+            ...  # e.g. validate the section
+    data = parser.close()
+"""
+
+import json
+
+
+class StreamDecodeError(json.JSONDecodeError):
+    """Streamed text can't be (the start of) a JSON object."""
+
+
+class SectionStream:
+    def __init__(self):
+        self.text = ""
+        self.data: dict = {}
+        self._pos = 0
+        self._phase = "start"
+        self._nesting: list[str] = []   # open brackets inside the current value
+        self._in_string = False
+        self._escape = False
+        self._key_start = 0
+        self._key = None
+        self._value_start = 0
+
+    @property
+    def done(self) -> bool:
+        return self._phase == "done"
+
+    def _fail(self, message: str, pos: int):
+        raise StreamDecodeError(message, self.text, pos)
+
+    def _finish_member(self, end: int) -> tuple[str, object]:
+        raw = self.text[self._value_start:end]
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self._fail(f"Invalid value for {self._key!r}: {e.msg}", self._value_start + e.pos)
+        self.data[self._key] = value
+        return self._key, value
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        """Consume the next chunk; returns the (name, value) members completed by it."""
+        self.text += chunk
+        completed = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._phase == "key_string":
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._phase = "colon"
+                continue
+            if ch.isspace() and self._phase != "value":
+                continue
+
+            if self._phase == "start":
+                if ch != "{":
+                    self._fail("Expected a JSON object", i)
+                self._phase = "first_key"
+            elif self._phase in ("first_key", "key"):
+                if ch == '"':
+                    self._in_string = True
+                    self._key_start = i
+                    self._phase = "key_string"
+                elif ch == "}" and self._phase == "first_key":
+                    self._phase = "done"
+                else:
+                    self._fail("Expected a property name", i)
+            elif self._phase == "colon":
+                if ch != ":":
+                    self._fail("Expected ':'", i)
+                self._phase = "value_start"
+            elif self._phase == "value_start":
+                self._value_start = i
+                self._phase = "value"
+            elif self._phase == "done":
+                self._fail("Extra data after the object", i)
+
+            if self._phase != "value":
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._nesting.append("}" if ch == "{" else "]")
+            elif ch in "}]":
+                if self._nesting:
+                    if self._nesting.pop() != ch:
+                        self._fail(f"Unexpected {ch!r}", i)
+                elif ch == "}":
+                    completed.append(self._finish_member(i))
+                    self._phase = "done"
+                else:
+                    self._fail("Unexpected ']'", i)
+            elif ch == "," and not self._nesting:
+                completed.append(self._finish_member(i))
+                self._phase = "key"
+        self._pos = len(text)
+        return completed
+
+    def close(self) -> dict:
+        """The parsed object; raises StreamDecodeError if the stream ended early."""
+        if not self.done:
+            self._fail("Stream ended before the object was complete", len(self.text))
+        return self.data
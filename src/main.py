@@ -1,6 +1,7 @@
 import sys
 import os
 import json
+import tempfile
 from pathlib import Path
 
 # Add the project root to sys.path to allow imports from src
@@ -10,17 +11,16 @@ from src.config import Config
 from src.generator import ResumeGenerator
 
 
-def get_unique_output_path(output_dir, base_name, ext):
+def get_unique_output_name(storage, base_name, ext):
     """
-    Generates a unique filename: base_name.ext, base_name_v1.ext, base_name_v2.ext...
+    Generates a filename not yet in `storage`: base_name.ext, base_name_v1.ext, base_name_v2.ext...
     """
     counter = 0
     while True:
         suffix = f"_v{counter}" if counter > 0 else ""
         filename = f"{base_name}{suffix}{ext}"
-        path = output_dir / filename
-        if not path.exists():
-            return path
+        if not storage.exists_name(filename):
+            return filename
         counter += 1
 
 
@@ -107,7 +107,9 @@ def main():
         # ----------------------------------------------------------------
         # Build mode: validate first, then generate PDF
         # ----------------------------------------------------------------
-        print(f"Configuration loaded. Output directory: {config.OUTPUT_DIR}")
+        from src.storage import open_storage
+        storage = open_storage(config)
+        print(f"Configuration loaded. Artifact storage: {storage.name}")
         print("Validating JSON...")
 
         if schema_path.exists():
@@ -131,31 +133,36 @@ def main():
         date_str = datetime.now().strftime("%y%m")
         base_name = f"Aryan_{code}_{date_str}"
 
-        # Get unique output path
-        output_file = get_unique_output_path(config.OUTPUT_DIR, base_name, ".tex")
-        pdf_file = output_file.with_suffix(".pdf")
+        # Get unique output name
+        pdf_name = get_unique_output_name(storage, base_name, ".pdf")
 
-        print(f"Target Output: {pdf_file.name}")
+        print(f"Target Output: {pdf_name}")
 
         # 4. Generate LaTeX
         print("Generating LaTeX content...")
         tex_content = generator.generate_tex(json_path.name, "base_resume.tex")
 
-        # 5. Write to Output
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(tex_content)
+        # 5. Write to a scratch build directory (pdflatex I/O stays off output/)
+        config.BUILD_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=config.BUILD_DIR) as build_dir:
+            output_file = Path(build_dir) / Path(pdf_name).with_suffix(".tex")
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write(tex_content)
 
-        print(f"Success: LaTeX file generated at {output_file}")
+            print(f"Success: LaTeX file generated at {output_file}")
 
-        # 6. Compile to PDF
-        from src.compiler import PDFCompiler
-        compiler = PDFCompiler()
-        pdf_path = compiler.compile_tex(output_file)
+            # 6. Compile to PDF and store it
+            from src.compiler import PDFCompiler
+            compiler = PDFCompiler()
+            ref, pdf_path = compiler.compile_to_storage(output_file, storage)
+            if storage.name == "local":
+                # Keep the .tex next to the PDF in output/, as before
+                storage.save(output_file)
 
-        print(f"🎉 Success: PDF generated at {pdf_path}")
+            print(f"🎉 Success: PDF stored in {storage.name} storage as {ref}")
 
-        # 7. Optionally upload to Google Drive
-        _maybe_upload_to_drive(pdf_path, code)
+            # 7. Optionally upload to Google Drive
+            _maybe_upload_to_drive(pdf_path, code)
 
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,290 @@
+"""
+src/metrics.py
+--------------
+Prometheus metrics for the worker, served as text exposition format
+(version 0.0.4) on http://<host>:METRICS_PORT/metrics.
+
+The handful of primitives here (Counter, Gauge, Histogram) cover what the
+worker needs without adding prometheus_client to the image. Metrics can
+also be backed by a function evaluated at scrape time, which is how
+in-flight jobs and cache hit/miss counts are exposed without touching the
+hot path.
+
+Worker metrics (all prefixed resume_worker_):
+    queue_depth{status}              non-terminal jobs per status (as of the admission cycle)
+    jobs_in_flight                   jobs held by this worker right now
+    jobs_total{status}               finished jobs; rate() gives jobs/sec
+    job_duration_seconds             histogram of whole-job time
+    stage_duration_seconds{stage}    histogram per traced stage (src/tracing.py)
+    drive_call_duration_seconds{call}  Drive API requests: lookup / upload / permissions (count = _count)
+    compile_failures_total{cause}    pdflatex failures by cause
+    cache_requests_total{cache,result}  snapshot / drive_uploader / parse cache hits and misses
+
+Usage:
+    metrics = WorkerMetrics()
+    metrics.serve(9108)
+    metrics.observe_job("completed", job_trace)
+"""
+
+import re
+import subprocess
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterable
+
+from src.tracing import Trace
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(name: str, labels: Labels, value: float) -> str:
+    if labels:
+        inner = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+        name = f"{name}{{{inner}}}"
+    if value == float("inf"):
+        return f"{name} +Inf"
+    return f"{name} {value:g}" if isinstance(value, float) else f"{name} {value}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, function: Callable[[], Iterable[tuple[dict, float]] | float] | None = None):
+        self.name = name
+        self.help = help_text
+        self.function = function
+        self._values: dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def _function_samples(self) -> list[str]:
+        result = self.function()
+        if isinstance(result, (int, float)):
+            result = [({}, result)]
+        return [_format(self.name, _labels(labels), value) for labels, value in result]
+
+    def samples(self) -> list[str]:
+        if self.function is not None:
+            return self._function_samples()
+        with self._lock:
+            return [_format(self.name, labels, value) for labels, value in sorted(self._values.items())]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_labels(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_labels(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts incl. +Inf, sum, count)
+        self._series: dict[Labels, tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            counts, total, count = self._series.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts[bisect_left(self.buckets, value)] += 1
+            self._series[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(_labels(labels))
+            return series[2] if series else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(_format(f"{self.name}_bucket", labels + (("le", le),), cumulative))
+            lines.append(_format(f"{self.name}_sum", labels, total))
+            lines.append(_format(f"{self.name}_count", labels, count))
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        blocks = []
+        for metric in self._metrics:
+            try:
+                blocks.append(metric.render())
+            except Exception as e:
+                # A failing scrape-time function must not break the whole scrape
+                print(f"[WARN] Metric {metric.name} unavailable: {e}")
+        return "\n".join(blocks) + "\n"
+
+
+def serve(registry: Registry, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve GET /metrics from a daemon thread. Returns the server (call shutdown() to stop)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # scrapes every few seconds would drown the job log
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+# -----------------------------------------------------------------------
+# Compile failure classification
+# -----------------------------------------------------------------------
+
+# First "! ..." line of the pdflatex log -> cause label (kept to a small, fixed set)
+LATEX_ERRORS = [
+    (re.compile(r"Undefined control sequence"), "undefined_control_sequence"),
+    (re.compile(r"LaTeX Error: File .* not found"), "missing_package"),
+    (re.compile(r"Missing \$ inserted"), "missing_dollar"),
+    (re.compile(r"Missing [{}] inserted|Extra [{}]|Too many }'s|Argument of .* has an extra"), "unbalanced_braces"),
+    (re.compile(r"Font .* not loadable|Font .* not found"), "font"),
+    (re.compile(r"Unicode character|Package inputenc Error"), "unicode"),
+    (re.compile(r"Emergency stop"), "emergency_stop"),
+]
+
+
+def compile_failure_cause(error: BaseException) -> str:
+    if isinstance(error, subprocess.TimeoutExpired):
+        return "timeout"
+    if isinstance(error, FileNotFoundError):
+        return "pdflatex_missing" if getattr(error, "filename", None) == "pdflatex" else "file_missing"
+    if isinstance(error, subprocess.CalledProcessError):
+        log = error.stdout or ""
+        first_error = next((line for line in log.splitlines() if line.startswith("! ")), "")
+        for pattern, cause in LATEX_ERRORS:
+            if pattern.search(first_error):
+                return cause
+        return "latex_error"
+    return "other"
+
+
+# -----------------------------------------------------------------------
+# Worker metrics
+# -----------------------------------------------------------------------
+
+# Spans that are one Drive API request each; drive_wait (waiting for the
+# per-folder uploader lock) and drive_folders (cached folder resolution)
+# are reported as stages
+DRIVE_CALLS = ("drive_lookup", "drive_upload", "drive_permissions")
+
+
+class WorkerMetrics:
+    def __init__(self, registry: Registry | None = None):
+        self.registry = registry or Registry()
+        self._cache_sources: dict[str, object] = {}
+        register = self.registry.register
+
+        self.queue_depth = register(Gauge(
+            "resume_worker_queue_depth", "Non-terminal jobs per status, as of the last admission cycle."
+        ))
+        self.in_flight = register(Gauge("resume_worker_jobs_in_flight", "Jobs currently held by this worker."))
+        self.jobs = register(Counter("resume_worker_jobs_total", "Finished jobs by terminal status."))
+        self.job_duration = register(Histogram(
+            "resume_worker_job_duration_seconds", "Wall time of a whole job, claim to terminal status."
+        ))
+        self.stage_duration = register(Histogram(
+            "resume_worker_stage_duration_seconds", "Time per traced job stage (sanitize, render, pdflatex passes, ...)."
+        ))
+        self.drive_calls = register(Histogram(
+            "resume_worker_drive_call_duration_seconds", "Google Drive API calls by kind; _count is the call count."
+        ))
+        self.compile_failures = register(Counter(
+            "resume_worker_compile_failures_total", "pdflatex failures by cause."
+        ))
+        self.cache_requests = register(Counter(
+            "resume_worker_cache_requests_total", "Cache lookups by cache and result (hit / miss).",
+            function=self._cache_samples,
+        ))
+
+    def track_in_flight(self, function: Callable[[], int]) -> None:
+        self.in_flight.function = function
+
+    def track_cache(self, name: str, source) -> None:
+        """`source` is anything with integer `hits` / `misses` attributes, read at scrape time."""
+        self._cache_sources[name] = source
+
+    def _cache_samples(self) -> list[tuple[dict, float]]:
+        samples = []
+        for name, source in self._cache_sources.items():
+            if source is None:
+                continue
+            samples.append(({"cache": name, "result": "hit"}, getattr(source, "hits", 0)))
+            samples.append(({"cache": name, "result": "miss"}, getattr(source, "misses", 0)))
+        return samples
+
+    def observe_job(self, status: str, job_trace: Trace) -> None:
+        self.jobs.inc(status=status)
+        self.job_duration.observe(job_trace.total_ms() / 1000)
+        for name, _, duration in job_trace.spans:
+            if name in DRIVE_CALLS:
+                self.drive_calls.observe(duration, call=name[len("drive_"):])
+            else:
+                self.stage_duration.observe(duration, stage=name)
+
+    def compile_failed(self, error: BaseException) -> None:
+        self.compile_failures.inc(cause=compile_failure_cause(error))
+
+    def serve(self, port: int) -> ThreadingHTTPServer:
+        return serve(self.registry, port)
@@ -0,0 +1,102 @@
+"""
+src/parse_cache.py
+------------------
+On-disk cache of PDF -> JSON parse results.
+
+A result is keyed by the SHA-256 of the PDF bytes, the content hash of
+resume.schema.json and the model name, so re-parsing the same PDF is
+instant while a schema change or a model switch still triggers a fresh
+parse. Entries are JSON files in PARSE_CACHE_DIR; a hit refreshes the
+entry's mtime and the least recently used entries beyond
+PARSE_CACHE_MAX_ENTRIES are evicted on write.
+
+Usage:
+    cache = ParseCache(config.PARSE_CACHE_DIR, max_entries=1000)
+    pipeline = AIPipeline(schema_path, cache=cache)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+
+from src.snapshots import content_hash
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_key(pdf_path: Path, schema: dict, model: str) -> str:
+    """Cache key for parsing `pdf_path` against `schema` with `model`."""
+    parts = f"{file_sha256(pdf_path)}:{content_hash(schema)}:{model}"
+    return hashlib.sha256(parts.encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    def __init__(self, directory: Path, max_entries: int = 1000):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Mark as recently used for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: dict) -> None:
+        path = self._path(key)
+        partial = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(partial, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            entries = []
+            for path in self.directory.glob("*.json"):
+                try:
+                    entries.append((path.stat().st_mtime, path))
+                except FileNotFoundError:
+                    continue
+            if len(entries) <= self.max_entries:
+                return
+            entries.sort()
+            for _, path in entries[: len(entries) - self.max_entries]:
+                path.unlink(missing_ok=True)
+
+    def clear(self) -> int:
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.directory.glob("*.json"))
@@ -0,0 +1,157 @@
+"""
+src/parse_repair.py
+-------------------
+Targeted repair of a parsed resume that fails schema validation.
+
+Instead of re-parsing the whole PDF, the failing parts are narrowed down
+to small subtrees (one work entry, `basics`, a missing section, ...) and
+only those are sent back to the model, together with the errors, the
+current value and the matching sub-schema. AIPipeline sends them against
+the PDF that is still uploaded, so a repair costs a short generation, not
+another upload + full extraction.
+
+Usage:
+    for request in repair_requests(validator, schema, data):
+        fixed = ...  # model reply to repair_prompt(request), shaped by request.schema
+        data = apply_repair(data, request.path, fixed)
+"""
+
+import copy
+import json
+from dataclasses import dataclass, field
+
+from jsonschema import Draft7Validator
+
+from src.validation import friendly_path
+
+MISSING = object()
+
+REPAIR_PROMPT = """Part of the JSON extracted from this PDF resume failed schema validation.
+Path: {path}
+Current value: {value}
+Errors:
+{errors}
+Re-read the resume and return the corrected JSON value for `{path}` only, matching the response schema."""
+
+
+@dataclass
+class RepairRequest:
+    path: tuple                 # e.g. ("work", 1)
+    label: str                  # e.g. "work[1]"
+    schema: dict                # sub-schema the replacement must satisfy
+    value: object = MISSING     # current value (MISSING if the key is absent)
+    errors: list[str] = field(default_factory=list)
+
+
+def _label(path: tuple) -> str:
+    parts = []
+    for part in path:
+        parts.append(f"[{part}]" if isinstance(part, int) else (f".{part}" if parts else str(part)))
+    return "".join(parts) or "(root)"
+
+
+def _anchor(path: tuple) -> tuple:
+    """Smallest subtree worth re-asking for: a section entry (work[1]) or a top-level object (basics)."""
+    for index, part in enumerate(path):
+        if isinstance(part, int):
+            return path[: index + 1]
+    return path[:1]
+
+
+def subschema(schema: dict, path: tuple) -> dict | None:
+    node = schema
+    for part in path:
+        if isinstance(part, int):
+            node = node.get("items")
+        elif part in node.get("properties", {}):
+            node = node["properties"][part]
+        else:
+            extra = node.get("additionalProperties")
+            node = extra if isinstance(extra, dict) else None
+        if not isinstance(node, dict):
+            return None
+    return node
+
+
+def get_at(data, path: tuple):
+    node = data
+    for part in path:
+        try:
+            node = node[part]
+        except (KeyError, IndexError, TypeError):
+            return MISSING
+    return node
+
+
+def apply_repair(data: dict, path: tuple, value) -> dict:
+    """Copy of `data` with the subtree at `path` replaced by `value`."""
+    repaired = copy.deepcopy(data)
+    node = repaired
+    for part in path[:-1]:
+        node = node[part]
+    node[path[-1]] = value
+    return repaired
+
+
+def section_errors(validator: Draft7Validator, schema: dict, name: str, value) -> list[str]:
+    """Schema errors of one top-level section, checked on its own (e.g. as it streams in)."""
+    sub = subschema(schema, (name,))
+    if sub is None:
+        return []
+    return [
+        f"{_label((name, *error.absolute_path))}: {error.message}"
+        for error in validator.evolve(schema=sub).iter_errors(value)
+    ]
+
+
+def repair_requests(validator: Draft7Validator, schema: dict, data) -> list[RepairRequest] | None:
+    """
+    One RepairRequest per failing subtree, [] if `data` is valid, or None if
+    the damage can't be narrowed down (wrong root type) and only a full
+    re-parse helps.
+    """
+    if not isinstance(data, dict):
+        return None
+
+    requests: dict[tuple, RepairRequest] = {}
+    for error in validator.iter_errors(data):
+        path = tuple(error.absolute_path)
+        if error.validator == "required" and not path:
+            # Whole section missing: ask for just that section
+            instance = error.instance if isinstance(error.instance, dict) else {}
+            anchors = [(key,) for key in error.validator_value if key not in instance]
+        elif not path:
+            return None
+        else:
+            anchors = [_anchor(path)]
+
+        for anchor in anchors:
+            sub = subschema(schema, anchor)
+            if sub is None:
+                return None
+            request = requests.get(anchor)
+            if request is None:
+                request = requests[anchor] = RepairRequest(
+                    path=anchor, label=_label(anchor), schema=sub, value=get_at(data, anchor)
+                )
+            location = friendly_path(error) if path else _label(anchor)
+            message = f"{location}: {error.message}" if path else f"{location}: missing"
+            if message not in request.errors:
+                request.errors.append(message)
+
+    # A subtree inside another failing subtree is covered by the outer request
+    paths = sorted(requests, key=len)
+    kept = []
+    for path in paths:
+        if not any(path[: len(outer)] == outer for outer in kept):
+            kept.append(path)
+    return [requests[path] for path in kept]
+
+
+def repair_prompt(request: RepairRequest) -> str:
+    value = "(missing)" if request.value is MISSING else json.dumps(request.value, ensure_ascii=False)
+    return REPAIR_PROMPT.format(
+        path=request.label,
+        value=value,
+        errors="\n".join(f"- {message}" for message in request.errors),
+    )
@@ -0,0 +1,334 @@
+"""
+src/pdf_extract.py
+------------------
+Local, deterministic PDF -> resume JSON for PDFs in our own layout
+(templates/base_resume.tex): a centered header, then the WORK EXPERIENCE,
+SKILLS, PERSONAL PROJECTS and EDUCATION sections, with \\resumeSubheading
+rows rendered as "bold left column ... right column" line pairs.
+
+Text is extracted with pypdf in layout mode (columns survive as runs of
+spaces); a second pass records which runs are set in a bold font, which is
+how headings (company, institution, project name) are told apart from
+wrapped body text, and how inline **bold** in highlights and project
+descriptions is restored. Link targets come from the page's URI annotations.
+
+Anything that doesn't look like our layout returns None, and the caller
+(AIPipeline) escalates to the model. So does anything the layout can't
+give back exactly: a filename that doesn't carry the meta code (our
+naming scheme, see FILENAME_PATTERN) or links outside the header, whose
+anchor text can't be placed. pypdf is optional; without it every PDF goes
+to the model.
+
+Usage:
+    data = extract_template_resume(Path("output/Aryan_BE_2602.pdf"))
+    if data is None: ...  # not our layout, or not recoverable from it
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+
+
+SECTIONS = {
+    "WORK EXPERIENCE": "work",
+    "SKILLS": "skills",
+    "PERSONAL PROJECTS": "projects",
+    "EDUCATION": "education",
+}
+
+BULLETS = "●•∙◦▪"
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+COLUMN_GAP = re.compile(r"\s{3,}")
+# Commas outside parentheses: "LLM Fine-Tuning (LLaMA, OpenAI), OCR" is two keywords
+KEYWORD_SPLIT = re.compile(r",\s*(?![^()]*\))")
+DATE_RANGE = re.compile(r"\s*(?:--|–|—|-)\s*")
+YEAR = re.compile(r"\b(19|20)\d{2}\b")
+# Same naming scheme as scripts/upload.py: Aryan_<CODE>_YYMM[_vN].pdf
+FILENAME_PATTERN = re.compile(r"^[A-Za-z]+_([A-Z]+)_\d{4}(?:_v\d+)?\.pdf$", re.IGNORECASE)
+
+
+def _clean(text: str) -> str:
+    # NFKC folds ligatures (ﬁ -> fi) that pdflatex fonts emit; LaTeX sets
+    # the source's ' as a right quote
+    return unicodedata.normalize("NFKC", text).replace(" ", " ").replace("’", "'")
+
+
+def _key(text: str) -> str:
+    """Whitespace/bullet-insensitive form used to match lines against bold runs."""
+    return re.sub(rf"[\s{BULLETS}]", "", _clean(text))
+
+
+def _strip_bullet(text: str) -> tuple[bool, str]:
+    stripped = text.strip()
+    if stripped and stripped[0] in BULLETS:
+        return True, stripped[1:].strip()
+    return False, stripped
+
+
+def _columns(text: str) -> tuple[str, str]:
+    parts = COLUMN_GAP.split(text.strip(), maxsplit=1)
+    return parts[0].strip(), (parts[1].strip() if len(parts) > 1 else "")
+
+
+def _join(parts: list[str]) -> str:
+    return re.sub(r"\s+", " ", " ".join(parts)).strip()
+
+
+# -----------------------------------------------------------------------
+# PDF reading
+# -----------------------------------------------------------------------
+
+def read_layout(pdf_path: Path) -> tuple[list[str], set[str], list[str], list[str]] | None:
+    """
+    (layout lines, keys of bold lines, link URIs in page order, bold runs in
+    page order), or None if pypdf isn't installed or the PDF can't be read.
+    A bold run is consecutive bold text, which may wrap onto the next line.
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    try:
+        reader = PdfReader(str(pdf_path))
+        if reader.is_encrypted:
+            return None
+
+        lines: list[str] = []
+        bold: set[str] = set()
+        links: list[str] = []
+        emphasis: list[str] = []
+        for page in reader.pages:
+            lines.extend(_clean(page.extract_text(extraction_mode="layout")).splitlines())
+
+            runs: dict[int, list[str]] = defaultdict(list)
+            current: list[str] = []
+
+            def visit(text, cm, tm, font_dict, font_size):
+                if not text.strip():
+                    return
+                font = str((font_dict or {}).get("/BaseFont", ""))
+                if "Bold" in font or "CMBX" in font.upper():
+                    runs[round(tm[5] * (cm[3] if cm else 1) + (cm[5] if cm else 0))].append(text)
+                    current.append(text)
+                elif current:
+                    emphasis.append(_join([_clean("".join(current))]))
+                    current.clear()
+
+            page.extract_text(visitor_text=visit)
+            if current:
+                emphasis.append(_join([_clean("".join(current))]))
+            bold.update(_key("".join(parts)) for parts in runs.values())
+
+            for annot in page.get("/Annots") or []:
+                uri = (annot.get_object().get("/A") or {}).get("/URI")
+                if uri:
+                    links.append(str(uri))
+        return lines, bold, links, emphasis
+    except Exception:
+        return None
+
+
+# -----------------------------------------------------------------------
+# Layout -> JSON
+# -----------------------------------------------------------------------
+
+def parse_layout(lines: list[str], bold: set[str], links: list[str], filename: str = "",
+                 emphasis: list[str] = ()) -> dict | None:
+    """
+    Map extracted lines onto the resume schema; None if the layout isn't
+    ours or the result would lose data (see the module docstring).
+    `emphasis` are the bold runs to mark up as **bold** in body text.
+    """
+    match = FILENAME_PATTERN.match(Path(filename).name) if filename else None
+    if match is None:
+        return None
+    lines = [line.rstrip() for line in lines if line.strip()]
+
+    # Split into header + the four sections, which must all appear, in order
+    starts = []
+    for index, line in enumerate(lines):
+        title = re.sub(r"\s+", " ", line.strip()).upper()
+        if title in SECTIONS:
+            starts.append((index, SECTIONS[title]))
+    if [name for _, name in starts] != list(SECTIONS.values()):
+        return None
+
+    header = lines[: starts[0][0]]
+    bodies = {
+        name: lines[index + 1 : (starts[pos + 1][0] if pos + 1 < len(starts) else len(lines))]
+        for pos, (index, name) in enumerate(starts)
+    }
+    basics = _parse_header(header, links)
+    if basics is None:
+        return None
+    # Header links are the email and one per profile; any other link sits on
+    # body text, which would come back without its target
+    header_links = sum(uri.startswith("mailto:") for uri in links) + len(basics.get("profiles", {}))
+    if len(links) > header_links:
+        return None
+
+    emphasize = _emphasizer(emphasis)
+    return {
+        "meta": {"code": match.group(1).upper()},
+        "basics": basics,
+        "work": _parse_work(bodies["work"], bold, emphasize),
+        "skills": _parse_skills(bodies["skills"]),
+        "projects": _parse_projects(bodies["projects"], bold, emphasize),
+        "education": _parse_education(bodies["education"], bold),
+    }
+
+
+def _emphasizer(emphasis: list[str]):
+    """Returns text -> text with every bold run wrapped in ** (longest runs first)."""
+    runs = sorted({run for run in emphasis if run}, key=len, reverse=True)
+    if not runs:
+        return lambda text: text
+    # Whitespace in extracted text differs from the runs' (kerning, wraps)
+    pattern = re.compile("|".join(
+        r"(?<!\w)" + r"\s*".join(re.escape(ch) for ch in run if not ch.isspace()) + r"(?!\w)"
+        for run in runs
+    ))
+    return lambda text: pattern.sub(lambda m: f"**{m.group(0)}**", text)
+
+
+def _parse_header(header: list[str], links: list[str]) -> dict | None:
+    contact_index = next((i for i, line in enumerate(header) if EMAIL_PATTERN.search(line)), None)
+    if not header or contact_index is None or contact_index == 0:
+        return None
+
+    basics = {"name": {"full": _join(header[:contact_index])}, "contact": {}}
+    networks = []
+    for segment in header[contact_index].split("|"):
+        segment = _join([segment])
+        if not segment:
+            continue
+        email = EMAIL_PATTERN.search(segment)
+        if email and "email" not in basics["contact"]:
+            basics["contact"]["email"] = email.group(0)
+        elif sum(ch.isdigit() for ch in segment) >= 7 and "phone" not in basics["contact"]:
+            basics["contact"]["phone"] = {"display": segment}
+        else:
+            networks.append(segment)
+
+    # Profile links appear in the same order as their labels in the header
+    urls = [uri for uri in links if not uri.startswith("mailto:")]
+    profiles = {}
+    for network, url in zip(networks, urls):
+        profiles[re.sub(r"\W+", "", network.lower()) or network] = {"network": network, "url": url}
+    if profiles:
+        basics["profiles"] = profiles
+
+    summary = _join(header[contact_index + 1 :])
+    if summary:
+        basics["summary"] = summary
+    return basics
+
+
+def _split_dates(text: str) -> tuple[str, str]:
+    parts = DATE_RANGE.split(text, maxsplit=1)
+    if len(parts) == 2:
+        return parts[0].strip(), parts[1].strip()
+    return text.strip(), text.strip()
+
+
+def _parse_work(body: list[str], bold: set[str], emphasize=lambda text: text) -> list[dict]:
+    jobs: list[dict] = []
+    job = None
+    expect_position = False
+    for line in body:
+        is_bullet, text = _strip_bullet(line)
+        left, right = _columns(text)
+        if not is_bullet and _key(left) in bold:
+            job = {"company": left, "location": right, "position": "", "startDate": "", "endDate": "", "highlights": []}
+            jobs.append(job)
+            expect_position = True
+        elif job is None:
+            continue
+        elif expect_position and not is_bullet:
+            job["position"] = left
+            job["startDate"], job["endDate"] = _split_dates(right)
+            expect_position = False
+        elif is_bullet:
+            job["highlights"].append(text)
+            expect_position = False
+        elif job["highlights"]:
+            # Wrapped bullet text
+            job["highlights"][-1] = _join([job["highlights"][-1], text])
+    for job in jobs:
+        job["highlights"] = [emphasize(text) for text in job["highlights"]]
+        if not job["location"]:
+            del job["location"]
+    return jobs
+
+
+def _parse_skills(body: list[str]) -> list[dict]:
+    skills: list[dict] = []
+    for line in body:
+        _, text = _strip_bullet(line)
+        category, sep, rest = text.partition(":")
+        if sep and category.strip() and "," not in category:
+            skills.append({"category": category.strip(), "keywords": []})
+        elif not skills:
+            continue
+        else:
+            rest = text
+        skills[-1]["keywords"].extend(k.strip() for k in KEYWORD_SPLIT.split(_join([rest])) if k.strip())
+    return skills
+
+
+def _parse_projects(body: list[str], bold: set[str], emphasize=lambda text: text) -> list[dict]:
+    projects: list[dict] = []
+    description: list[str] = []
+    # When names are bulleted, a fully bold wrapped description line isn't a name
+    bulleted = any(_strip_bullet(line)[0] for line in body)
+    for line in body:
+        is_bullet, text = _strip_bullet(line)
+        if _key(text) in bold and (is_bullet or not bulleted):
+            if projects:
+                projects[-1]["description"] = _join(description)
+            projects.append({"name": _join([text]), "description": ""})
+            description = []
+        elif projects:
+            description.append(text)
+    if projects:
+        projects[-1]["description"] = _join(description)
+    for project in projects:
+        project["description"] = emphasize(project["description"])
+    return projects
+
+
+def _parse_education(body: list[str], bold: set[str]) -> list[dict]:
+    entries: list[dict] = []
+    entry = None
+    for line in body:
+        _, text = _strip_bullet(line)
+        left, right = _columns(text)
+        if _key(left) in bold:
+            entry = {"institution": left, "degree": "", "completionDate": ""}
+            if YEAR.search(right):
+                entry["completionDate"] = right
+            entries.append(entry)
+            continue
+        if entry is None:
+            continue
+        for part in (left, right):
+            if not part:
+                continue
+            label, sep, value = part.partition(":")
+            if not entry["completionDate"] and YEAR.search(part) and not sep:
+                entry["completionDate"] = part
+            elif sep and value.strip() and "score" not in entry and entry["degree"]:
+                entry["score"] = {"label": label.strip(), "value": value.strip()}
+            elif not entry["degree"]:
+                entry["degree"] = part
+    return entries
+
+
+def extract_template_resume(pdf_path: Path) -> dict | None:
+    """Parse a PDF in our template's layout without calling the model; None if it isn't one."""
+    layout = read_layout(pdf_path)
+    if layout is None:
+        return None
+    lines, bold, links, emphasis = layout
+    return parse_layout(lines, bold, links, filename=Path(pdf_path).name, emphasis=emphasis)
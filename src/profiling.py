@@ -0,0 +1,154 @@
+"""
+src/profiling.py
+----------------
+Opt-in per-job profiling for the worker.
+
+A job is profiled when its `generations` document has `profile: true`, or
+at random for a PROFILE_SAMPLE_RATE fraction of jobs. Two modes:
+
+    sampling  (default) a background thread samples the job thread's stack
+              every PROFILE_INTERVAL_MS and counts identical stacks. The
+              artifact is folded stacks ("frame;frame;frame count" per
+              line), ready for flamegraph.pl or speedscope. Time spent
+              waiting on pdflatex shows up as subprocess frames.
+    cprofile  cProfile; the artifact is a pstats dump (python -m pstats
+              <file>, snakeviz, ...). On Python 3.12+ cProfile hooks
+              sys.monitoring, which is process-wide: it records every
+              thread, and only one such profiler may be active at a time.
+              So at most one job is profiled with cProfile at once; jobs
+              that start while it is busy are sampled instead.
+
+Jobs that are not profiled pay for one random() call.
+
+Usage:
+    if should_profile(job, sample_rate=0.01):
+        profiler = start_profiler("sampling", interval=0.005)
+        ...
+        artifact = profiler.stop()
+        storage.save_stream(io.BytesIO(artifact.data), f"profile_{job_id}.{artifact.extension}",
+                            content_type=artifact.content_type)
+"""
+
+import cProfile
+import marshal
+import random
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+PROFILE_MODES = ("sampling", "cprofile")
+
+
+@dataclass
+class ProfileArtifact:
+    data: bytes
+    format: str      # "folded" or "pstats"
+    extension: str
+    samples: int = 0
+    content_type: str = "application/octet-stream"
+
+
+def should_profile(job: dict, sample_rate: float, rand=random.random) -> bool:
+    """Profile jobs flagged `profile: true`, plus a `sample_rate` fraction of the rest."""
+    if job.get("profile") is True:
+        return True
+    return sample_rate > 0 and rand() < sample_rate
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples one thread's stack (the caller's, by default) from a daemon thread."""
+
+    def __init__(self, interval: float = 0.005, thread_id: int | None = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: dict[str, int] = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            stack = ";".join(reversed(labels))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def stop(self) -> ProfileArtifact:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        lines = [f"{stack} {count}" for stack, count in sorted(self.stacks.items())]
+        data = ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+        return ProfileArtifact(data, "folded", "folded", self.samples, "text/plain; charset=utf-8")
+
+
+# Held by the active CProfileProfiler (see the module docstring)
+_cprofile_active = threading.Lock()
+
+
+class CProfileProfiler:
+    """
+    cProfile from start() to stop(). Per-thread before Python 3.12,
+    process-wide from 3.12 on; either way at most one runs at a time.
+    """
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self._artifact: ProfileArtifact | None = None
+
+    def start(self) -> "CProfileProfiler":
+        """Raises ValueError if another cProfile (ours or not) is active."""
+        if not _cprofile_active.acquire(blocking=False):
+            raise ValueError("A cProfile profiler is already active.")
+        try:
+            self.profile.enable()
+        except BaseException:
+            _cprofile_active.release()
+            raise
+        return self
+
+    def stop(self) -> ProfileArtifact:
+        if self._artifact is None:
+            try:
+                self.profile.disable()
+            finally:
+                _cprofile_active.release()
+            self.profile.create_stats()
+            # Same bytes pstats.Stats.dump_stats() writes
+            data = marshal.dumps(self.profile.stats)
+            self._artifact = ProfileArtifact(data, "pstats", "prof", len(self.profile.stats))
+        return self._artifact
+
+
+def start_profiler(mode: str = "sampling", interval: float = 0.005):
+    """
+    Start profiling the calling thread (all threads, for cProfile on 3.12+).
+    Returns an object with stop() -> ProfileArtifact; "cprofile" falls back
+    to sampling while another cProfile is active.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}' (choose from {', '.join(PROFILE_MODES)}).")
+    if mode == "cprofile":
+        try:
+            return CProfileProfiler().start()
+        except ValueError:
+            # Another job holds cProfile (or some other tool holds
+            # sys.monitoring's profiler slot): sample this one instead
+            pass
+    return SamplingProfiler(interval).start()
@@ -0,0 +1,238 @@
+"""
+src/retention.py
+----------------
+Retention for generation jobs and their artifacts (compiled PDFs, profiles).
+
+Three layers keep the hot collection and the output/ directory small:
+
+1. TTL      — terminal jobs get `expireAt` (GENERATIONS_TTL_DAYS after they
+              finish) and MongoDB's TTL monitor deletes them (migration 006).
+2. Archive  — archive_generations() exports old terminal jobs to gzipped
+              JSON Lines in ARCHIVE_DIR (cold storage) and removes them from
+              the collection, ahead of the TTL horizon.
+3. Output   — sweep_output() removes artifacts (PDFs and job profiles)
+              older than OUTPUT_RETENTION_DAYS or beyond the newest
+              OUTPUT_MAX_FILES, optionally compacting them into monthly zip
+              archives first, and clears stale build dirs. With GridFS or S3
+              storage, sweep_stored() applies the age rule to the bucket
+              instead.
+
+Archive and output sweeps run from scripts/retention.py on a schedule (one
+cron job for the whole deployment), never from each worker replica.
+
+Usage:
+    sweeper = RetentionSweeper(Config.get_instance(), db)
+    sweeper.archive_generations(older_than_days=30)
+    sweeper.sweep_output(compact=True)
+"""
+
+import gzip
+import os
+import shutil
+import time
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from bson import json_util
+from pymongo.database import Database as MongoDatabase
+
+from src.storage import ARTIFACT_SUFFIXES
+
+
+TERMINAL_STATUSES = ["COMPLETED", "FAILED"]
+
+# Stale per-job build directories (crashed compiles) are removed after this
+BUILD_DIR_MAX_AGE = timedelta(hours=6)
+
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persist a new directory entry (the archive file itself), where the OS allows it."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class RetentionSweeper:
+    def __init__(self, config, db: MongoDatabase | None = None, dry_run: bool = False, storage=None):
+        self.config = config
+        self.db = db
+        self.dry_run = dry_run
+        # ArtifactStorage for non-local backends (GridFS / S3)
+        self.storage = storage
+
+    # ----------------------------------------------------------------
+    # generations → cold storage
+    # ----------------------------------------------------------------
+
+    def archive_generations(self, older_than_days: float) -> int:
+        """
+        Export terminal jobs last updated more than `older_than_days` ago to
+        ARCHIVE_DIR/generations/*.jsonl.gz, then delete them.
+        The (possibly large) resume_data payload is not archived.
+        Returns the number of archived jobs.
+        """
+        if self.db is None:
+            raise ValueError("archive_generations() needs a database handle.")
+
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        query = {"status": {"$in": TERMINAL_STATUSES}, "updatedAt": {"$lt": cutoff}}
+        if self.dry_run:
+            return self.db.generations.count_documents(query)
+
+        archive_dir = self.config.ARCHIVE_DIR / "generations"
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        archive_path = archive_dir / f"generations-{stamp}.jsonl.gz"
+
+        total = 0
+        cursor = self.db.generations.find(query, {"resume_data": 0}).batch_size(ARCHIVE_BATCH_SIZE)
+        with open(archive_path, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as out:
+            _fsync_dir(archive_dir)
+            batch = []
+            for job in cursor:
+                out.write(json_util.dumps(job) + "\n")
+                batch.append(job["_id"])
+                if len(batch) >= ARCHIVE_BATCH_SIZE:
+                    total += self._delete_archived(out, raw, batch)
+                    batch = []
+            if batch:
+                total += self._delete_archived(out, raw, batch)
+
+        if total == 0:
+            archive_path.unlink()
+        else:
+            print(f"[RETENTION] Archived {total} job(s) to {archive_path}")
+        return total
+
+    def _delete_archived(self, out, raw, ids: list) -> int:
+        # Make sure the exported lines are on disk before removing the
+        # originals: flush() only reaches the OS page cache, fsync() the disk
+        out.flush()
+        os.fsync(raw.fileno())
+        self.db.generations.delete_many({"_id": {"$in": ids}})
+        return len(ids)
+
+    # ----------------------------------------------------------------
+    # output/ artifacts
+    # ----------------------------------------------------------------
+
+    def sweep_output(
+        self,
+        max_age_days: float | None = None,
+        max_files: int | None = None,
+        compact: bool = False,
+    ) -> list[Path]:
+        """
+        Remove artifacts (PDFs and job profiles) from output/ that are older
+        than `max_age_days` or beyond the newest `max_files`, counted across
+        all kinds (defaults from Config; 0 disables either rule). With
+        `compact`, each file is first stored in ARCHIVE_DIR/pdfs/pdfs-YYYYMM.zip
+        or ARCHIVE_DIR/profiles/profiles-YYYYMM.zip (by modification month).
+        Returns the swept paths.
+        """
+        output_dir = self.config.OUTPUT_DIR
+        max_age_days = self.config.OUTPUT_RETENTION_DAYS if max_age_days is None else max_age_days
+        max_files = self.config.OUTPUT_MAX_FILES if max_files is None else max_files
+
+        # Partial writes (".<name>.<hex>.part") never match a suffix
+        artifacts = sorted(
+            ((p, p.stat().st_mtime) for p in output_dir.iterdir()
+             if p.is_file() and p.suffix in ARTIFACT_SUFFIXES and not p.name.startswith(".")),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        now = time.time()
+        expired = []
+        for rank, (path, mtime) in enumerate(artifacts):
+            too_old = max_age_days > 0 and now - mtime > max_age_days * 86400
+            over_count = max_files > 0 and rank >= max_files
+            if too_old or over_count:
+                expired.append((path, mtime))
+
+        swept = []
+        for path, mtime in expired:
+            if self.dry_run:
+                swept.append(path)
+                continue
+            archive = self._compact(path, mtime) if compact else None
+            path.unlink(missing_ok=True)
+            self._record_swept(path, archive)
+            swept.append(path)
+
+        self._remove_stale_build_dirs()
+        if swept:
+            verb = "Would sweep" if self.dry_run else "Swept"
+            print(f"[RETENTION] {verb} {len(swept)} artifact(s) from {output_dir}")
+        return swept
+
+    def sweep_stored(self, max_age_days: float | None = None) -> int:
+        """
+        Remove artifacts older than `max_age_days` (default OUTPUT_RETENTION_DAYS)
+        from GridFS / S3 storage and clear the PDF or profile reference on their
+        jobs. Returns how many were removed.
+        """
+        if self.storage is None or self.storage.name == "local":
+            return 0
+        max_age_days = self.config.OUTPUT_RETENTION_DAYS if max_age_days is None else max_age_days
+        if max_age_days <= 0 or self.dry_run:
+            return 0
+        removed = self.storage.delete_older_than(max_age_days)
+        if removed and self.db is not None:
+            self.db.generations.update_many(
+                {self.storage.ref_field: {"$in": [self.storage.job_value(ref) for ref in removed]}},
+                {"$set": {self.storage.ref_field: None}},
+            )
+            self.db.generations.update_many(
+                {"profile_artifact.storage": self.storage.name, "profile_artifact.ref": {"$in": removed}},
+                {"$set": {"profile_artifact.ref": None}},
+            )
+        if removed:
+            print(f"[RETENTION] Swept {len(removed)} artifact(s) from {self.storage.name} storage")
+        return len(removed)
+
+    def _compact(self, path: Path, mtime: float) -> Path:
+        kind = "pdfs" if path.suffix == ".pdf" else "profiles"
+        archive_dir = self.config.ARCHIVE_DIR / kind
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        archive = archive_dir / f"{kind}-{datetime.utcfromtimestamp(mtime):%Y%m}.zip"
+        with zipfile.ZipFile(archive, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+            if path.name not in zf.namelist():
+                zf.write(path, arcname=path.name)
+        return archive
+
+    def _record_swept(self, path: Path, archive: Path | None) -> None:
+        """Point jobs at the archive (or nowhere) once their local PDF or profile is gone."""
+        if self.db is None:
+            return
+        archived = f"{archive.relative_to(self.config.ARCHIVE_DIR)}:{path.name}" if archive else None
+        if path.suffix != ".pdf":
+            update = {"profile_artifact.ref": None}
+            if archived:
+                update["profile_artifact.archive"] = archived
+            self.db.generations.update_many(
+                {"profile_artifact.storage": "local", "profile_artifact.ref": path.name}, {"$set": update}
+            )
+            return
+        update = {"pdf_path": None}
+        if archived:
+            update["pdf_archive"] = archived
+        self.db.generations.update_many({"pdf_path": f"/output/{path.name}"}, {"$set": update})
+
+    def _remove_stale_build_dirs(self) -> None:
+        build_root = self.config.BUILD_DIR
+        if not build_root.exists():
+            return
+        cutoff = time.time() - BUILD_DIR_MAX_AGE.total_seconds()
+        for build_dir in build_root.iterdir():
+            if build_dir.is_dir() and build_dir.stat().st_mtime < cutoff and not self.dry_run:
+                shutil.rmtree(build_dir, ignore_errors=True)
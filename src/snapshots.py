@@ -0,0 +1,164 @@
+"""
+src/snapshots.py
+----------------
+Resume snapshot storage, deduplicated by content hash.
+
+Generation jobs no longer need to embed the full `resume_data`: a job may
+instead reference `(resume_id, version_number)` (or carry a
+`content_hash`), and the worker resolves the payload here.
+
+Storage layout:
+    resume_snapshots   { _id: <sha256 of canonical JSON>, data, createdAt }
+    resumeversions     { resume_id, version_number, content_hash, [data] }
+
+Identical payloads (re-saving without edits, regenerating an old version,
+bulk jobs for the same resume) are stored once. Resolved payloads are kept
+in a small in-process LRU keyed by hash, so repeated builds of the same
+version don't go back to MongoDB at all. Versions that still carry only
+their `data` are read from `resumeversions` on every lookup.
+
+Versions are written by the app layer (the Next.js API), not by the worker;
+see put() for what it must store. The worker only writes snapshots for
+imported PDFs (store()).
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from pymongo.database import Database as MongoDatabase
+
+
+def content_hash(data: dict) -> str:
+    """SHA-256 of the canonical JSON form (sorted keys, no whitespace)."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SnapshotNotFoundError(LookupError):
+    pass
+
+
+class SnapshotStore:
+    def __init__(self, db: MongoDatabase, cache_size: int = 256):
+        self.db = db
+        self.cache_size = cache_size
+        self._by_hash: OrderedDict[str, dict] = OrderedDict()
+        self._hash_of_version: dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        # Payload cache lookups, exported by the worker's metrics endpoint
+        self.hits = 0
+        self.misses = 0
+
+    # ----------------------------------------------------------------
+    # Write
+    # ----------------------------------------------------------------
+
+    def put(self, resume_id, version_number: int, data: dict) -> str:
+        """
+        Store a version's payload once per distinct content and point the
+        version at it. Returns the content hash.
+
+        This is the producer side of the layout above, for Python callers.
+        The app layer owns `resumeversions`, so when it saves a version it
+        must do the same, in either of two ways:
+          - keep writing the version's `data` (resolved as-is, with no
+            deduplication and one `resumeversions` read per build), or
+          - upsert `resume_snapshots` {_id: hash, data} and set the version's
+            `content_hash`, hashing with content_hash()'s canonical form
+            (sorted keys, "," and ":" separators, UTF-8, SHA-256 hex).
+        A hash computed differently still resolves, but stores a duplicate.
+        """
+        digest = self.store(data)
+        now = datetime.utcnow()
+        self.db.resumeversions.update_one(
+            {"resume_id": resume_id, "version_number": version_number},
+            {
+                "$set": {"content_hash": digest},
+                "$setOnInsert": {"createdAt": now},
+            },
+            upsert=True,
+        )
+        return digest
+
+    def store(self, data: dict) -> str:
+        """Store a payload once per distinct content, without a version. Returns the content hash."""
+        digest = content_hash(data)
+        self.db.resume_snapshots.update_one(
+            {"_id": digest},
+            {"$setOnInsert": {"data": data, "createdAt": datetime.utcnow()}},
+            upsert=True,
+        )
+        self._remember(digest, data)
+        return digest
+
+    # ----------------------------------------------------------------
+    # Read
+    # ----------------------------------------------------------------
+
+    def resolve(self, job: dict) -> dict:
+        """Return the resume payload for a generation job (embedded or by reference)."""
+        if job.get("resume_data") is not None:
+            return job["resume_data"]
+        if job.get("content_hash"):
+            return self.get_by_hash(job["content_hash"])
+        if job.get("resume_id") is not None and job.get("version_number") is not None:
+            return self.get(job["resume_id"], job["version_number"])
+        raise SnapshotNotFoundError(
+            "Job has neither resume_data nor a (resume_id, version_number) reference."
+        )
+
+    def get(self, resume_id, version_number: int) -> dict:
+        key = (resume_id, version_number)
+        with self._lock:
+            digest = self._hash_of_version.get(key)
+        if digest:
+            return self.get_by_hash(digest)
+
+        version = self.db.resumeversions.find_one(
+            {"resume_id": resume_id, "version_number": version_number},
+            {"content_hash": 1, "data": 1},
+        )
+        if version is None:
+            raise SnapshotNotFoundError(f"No version {version_number} for resume {resume_id}.")
+
+        if version.get("data") is not None:
+            # No snapshot document backs this version, so it isn't mapped to
+            # a digest: once the LRU drops the payload, get_by_hash() would
+            # have nothing to fall back on. It is read from the version again.
+            with self._lock:
+                self.misses += 1
+            return version["data"]
+        if not version.get("content_hash"):
+            raise SnapshotNotFoundError(f"Version {version_number} of resume {resume_id} has no data.")
+        digest = version["content_hash"]
+        data = self.get_by_hash(digest)
+
+        with self._lock:
+            self._hash_of_version[key] = digest
+            if len(self._hash_of_version) > self.cache_size * 4:
+                self._hash_of_version.clear()
+        return data
+
+    def get_by_hash(self, digest: str) -> dict:
+        with self._lock:
+            if digest in self._by_hash:
+                self.hits += 1
+                self._by_hash.move_to_end(digest)
+                return self._by_hash[digest]
+            self.misses += 1
+
+        snapshot = self.db.resume_snapshots.find_one({"_id": digest}, {"data": 1})
+        if snapshot is None:
+            raise SnapshotNotFoundError(f"No snapshot with content hash {digest}.")
+        self._remember(digest, snapshot["data"])
+        return snapshot["data"]
+
+    def _remember(self, digest: str, data: dict) -> None:
+        with self._lock:
+            self._by_hash[digest] = data
+            self._by_hash.move_to_end(digest)
+            while len(self._by_hash) > self.cache_size:
+                self._by_hash.popitem(last=False)
@@ -0,0 +1,165 @@
+"""
+src/status_writer.py
+--------------------
+Buffered write-back of terminal job statuses (COMPLETED / FAILED).
+
+With several jobs in flight, one update_one per finished job becomes the
+dominant MongoDB traffic. The worker instead hands each terminal update to
+a StatusWriter, which sends them as a single unordered bulk_write when
+either `max_batch` updates are queued or `max_delay` seconds have passed
+since the oldest one, and on shutdown.
+
+Durability ordering: callers submit a COMPLETED update only after the PDF
+has been fsynced to its final location, so a job can never be observed as
+COMPLETED while its PDF is missing. Until its update is flushed the job
+stays leased (the `on_flushed` callback tells the worker when to stop
+heartbeating it), so a crash before the flush re-queues it rather than
+losing it.
+
+Each flush reports `on_flushed(applied, lost)`: the ids whose update was
+written, and those whose update didn't match (the lease was lost) or was
+rejected by the server. A rejected update is logged and dropped, so one
+bad write doesn't hold back the rest of its batch; only connection and
+other transient errors put the batch back for the next flush.
+"""
+
+import threading
+import time
+from typing import Callable
+
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, ConnectionFailure, PyMongoError
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, (ConnectionFailure, ConnectionError, TimeoutError)):
+        return True
+    return isinstance(error, PyMongoError) and error.has_error_label("RetryableWriteError")
+
+
+class StatusWriter:
+    def __init__(
+        self,
+        collection: Collection,
+        max_batch: int = 50,
+        max_delay: float = 0.5,
+        on_flushed: Callable[[list, list], None] | None = None,
+    ):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._on_flushed = on_flushed
+
+        self._pending: list[tuple[object, UpdateOne, dict | None]] = []
+        self._oldest: float | None = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="status-writer", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the background flusher and write out everything still buffered."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def submit(self, job_id, op: UpdateOne, applied: dict | None = None) -> None:
+        """
+        Queue a terminal update for `job_id`; it is written within max_delay
+        seconds. `applied` is a filter that matches the job once `op` has
+        been applied; without one, the update counts as applied only when
+        every update in its batch matched.
+        """
+        with self._lock:
+            self._pending.append((job_id, op, applied))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Write all buffered updates in one bulk_write. Returns how many were
+        applied. On a transient error the updates are put back and retried
+        next flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._oldest = None
+            if not batch:
+                return 0
+
+            rejected: set[int] = set()
+            try:
+                matched = self.collection.bulk_write([op for _, op, _ in batch], ordered=False).matched_count
+            except BulkWriteError as e:
+                # Unordered: everything but the rejected updates was attempted
+                for error in e.details.get("writeErrors", []):
+                    rejected.add(error["index"])
+                    print(f"[ERROR] Status update for job {batch[error['index']][0]} rejected: {error.get('errmsg')}")
+                matched = e.details.get("nMatched", 0)
+            except Exception as e:
+                if _is_transient(e):
+                    with self._lock:
+                        self._pending = batch + self._pending
+                        self._oldest = time.monotonic()
+                    raise
+                print(f"[ERROR] Dropping {len(batch)} status update(s): {e}")
+                rejected = set(range(len(batch)))
+                matched = 0
+
+            written = [entry for index, entry in enumerate(batch) if index not in rejected]
+            applied = self._applied(written, matched)
+            lost = [job_id for job_id, _, _ in batch if job_id not in applied]
+            if len(lost) > len(rejected):
+                # The others were reaped and re-queued while we held them
+                print(f"[WARN] {len(lost) - len(rejected)} status update(s) lost their lease.")
+            if self._on_flushed:
+                self._on_flushed([job_id for job_id, _, _ in written if job_id in applied], lost)
+            return len(applied)
+
+    def _applied(self, written: list, matched: int) -> set:
+        """Ids among `written` whose update was applied, given the batch's matched count."""
+        if matched >= len(written):
+            return {job_id for job_id, _, _ in written}
+        if matched == 0:
+            return set()
+        checks = [applied for _, _, applied in written if applied is not None]
+        if not checks:
+            return set()
+        try:
+            found = {doc["_id"] for doc in self.collection.find({"$or": checks}, {"_id": 1})}
+        except Exception as e:
+            print(f"[WARN] Could not check which status updates were applied: {e}")
+            return set()
+        return {job_id for job_id, _, applied in written if applied is not None and job_id in found}
+
+    def _due(self) -> bool:
+        with self._lock:
+            if not self._pending:
+                return False
+            return (
+                len(self._pending) >= self.max_batch
+                or time.monotonic() - self._oldest >= self.max_delay
+            )
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.max_delay / 2)
+            self._wake.clear()
+            if not self._due():
+                continue
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[WARN] Status flush failed (will retry): {e}")
@@ -0,0 +1,445 @@
+"""
+src/storage.py
+--------------
+Artifact storage for compiled PDFs (and other build outputs).
+
+Backends, selected with ARTIFACT_STORAGE:
+    local   files in output/ (OUTPUT_DIR); jobs record `pdf_path`
+    gridfs  the GRIDFS_BUCKET GridFS bucket; jobs record `pdf_file_id`
+    s3      an S3-compatible bucket (S3_BUCKET, optional S3_ENDPOINT_URL for
+            MinIO or another local stand-in); jobs record `pdf_key`
+
+PDFs are compiled in a scratch directory on fast local disk (BUILD_DIR) and
+then streamed into storage; reads are streamed back out chunk by chunk. A
+stored artifact is identified by a string ref (a filename, GridFS id or
+object key) that only its own backend interprets.
+
+Usage:
+    storage = open_storage(Config.get_instance())
+    ref = storage.save(Path("/tmp/build/Aryan_BE_2602.pdf"), metadata={"job_id": job_id})
+    with open("copy.pdf", "wb") as f:
+        storage.download_to(ref, f)
+    with storage.open_local(ref) as path:    # a local file, for e.g. Drive uploads
+        uploader.upload_pdf(path, meta_code="BE")
+"""
+
+import os
+import shutil
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+
+CHUNK_SIZE = 256 * 1024
+
+# Kinds of artifact the worker writes: compiled PDFs and job profiles
+# (src/profiling.py). Local sweeps and listings cover all of them.
+ARTIFACT_SUFFIXES = (".pdf", ".folded", ".prof")
+
+
+class ArtifactNotFoundError(FileNotFoundError):
+    pass
+
+
+def fsync_path(path: Path) -> None:
+    """fsync a file or directory (directory fsync persists a rename on POSIX)."""
+    flags = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) if path.is_dir() else os.O_RDONLY
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return  # e.g. directories can't be opened on Windows
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ArtifactStorage(ABC):
+    """Interface shared by the storage backends."""
+
+    name = ""
+    # Field on a generation job that points at the stored PDF
+    ref_field = "pdf_path"
+
+    # ----------------------------------------------------------------
+    # Write
+    # ----------------------------------------------------------------
+
+    def save(self, path: Path, name: str | None = None, metadata: dict | None = None,
+             content_type: str = "application/pdf") -> str:
+        """Stream a local file into storage under `name` (default: its filename). Returns its ref."""
+        with open(path, "rb") as source:
+            return self.save_stream(source, name or path.name, metadata, content_type)
+
+    @abstractmethod
+    def save_stream(self, source: BinaryIO, name: str, metadata: dict | None = None,
+                    content_type: str = "application/pdf") -> str:
+        """Stream an open binary file object into storage under `name`. Returns its ref."""
+
+    @abstractmethod
+    def delete(self, ref: str) -> None:
+        """Remove a stored artifact (no error if it is already gone)."""
+
+    def delete_older_than(self, days: float) -> list[str]:
+        """Remove artifacts stored more than `days` ago. Returns the removed refs."""
+        return []
+
+    # ----------------------------------------------------------------
+    # Read
+    # ----------------------------------------------------------------
+
+    @abstractmethod
+    def exists(self, ref: str) -> bool:
+        """Whether the artifact `ref` is stored."""
+
+    @abstractmethod
+    def exists_name(self, name: str) -> bool:
+        """Whether an artifact was saved under filename `name` (refs may be ids or keys)."""
+
+    @abstractmethod
+    def iter_artifacts(self) -> Iterator[tuple[str, str]]:
+        """Yield (ref, filename) for every stored artifact."""
+
+    def download_to(self, ref: str, destination: BinaryIO) -> None:
+        """Stream a stored artifact into an open binary file object."""
+        for chunk in self.iter_chunks(ref):
+            destination.write(chunk)
+
+    @abstractmethod
+    def iter_chunks(self, ref: str) -> Iterator[bytes]:
+        """Yield the stored artifact chunk by chunk (e.g. for an HTTP response body)."""
+
+    def local_path(self, ref: str) -> Path | None:
+        """Path of the artifact on local disk, if the backend keeps one."""
+        return None
+
+    @contextmanager
+    def open_local(self, ref: str, filename: str | None = None) -> Iterator[Path]:
+        """
+        Yield a local file with the artifact's content, named `filename`
+        (default: the ref's basename): the stored file itself for the local
+        backend (through a temporary link if the names differ), otherwise a
+        temporary download.
+        """
+        path = self.local_path(ref)
+        if path is not None:
+            if not path.exists():
+                raise ArtifactNotFoundError(f"No artifact '{ref}' in {self.name} storage.")
+            if not filename or filename == path.name:
+                yield path
+                return
+        with tempfile.TemporaryDirectory(prefix="artifact-") as tmp:
+            local = Path(tmp) / (filename or Path(ref).name)
+            if path is not None:
+                local.symlink_to(path.resolve())
+            else:
+                with open(local, "wb") as f:
+                    self.download_to(ref, f)
+            yield local
+
+    # ----------------------------------------------------------------
+    # Job document fields
+    # ----------------------------------------------------------------
+
+    def job_value(self, ref: str):
+        """Value stored in the job's `ref_field` for `ref`."""
+        return ref
+
+    def job_fields(self, ref: str) -> dict:
+        """Fields to set on a COMPLETED generation job."""
+        fields = {"pdf_path": None}
+        fields[self.ref_field] = self.job_value(ref)
+        return fields
+
+    def ref_from_job(self, job: dict) -> str | None:
+        value = job.get(self.ref_field)
+        return None if value is None else str(value)
+
+
+# -----------------------------------------------------------------------
+# Local filesystem
+# -----------------------------------------------------------------------
+
+class LocalStorage(ArtifactStorage):
+    name = "local"
+    ref_field = "pdf_path"
+
+    def __init__(self, root: Path, url_prefix: str = "/output"):
+        self.root = Path(root)
+        self.url_prefix = url_prefix
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, ref: str) -> Path:
+        # Refs are bare filenames; never let one escape the root
+        return self.root / Path(ref).name
+
+    def save(self, path: Path, name: str | None = None, metadata: dict | None = None,
+             content_type: str = "application/pdf") -> str:
+        target = self._path(name or path.name)
+        if Path(path).resolve() == target.resolve():
+            fsync_path(target)
+            fsync_path(self.root)
+            return target.name
+        return super().save(path, name, metadata, content_type)
+
+    def save_stream(self, source: BinaryIO, name: str, metadata: dict | None = None,
+                    content_type: str = "application/pdf") -> str:
+        # Write to a temp file in the same directory, then rename: readers
+        # never see a partial PDF, and the file is durable before we return
+        target = self._path(name)
+        partial = self.root / f".{target.name}.{uuid.uuid4().hex}.part"
+        try:
+            with open(partial, "wb") as out:
+                shutil.copyfileobj(source, out, CHUNK_SIZE)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(partial, target)
+        finally:
+            partial.unlink(missing_ok=True)
+        fsync_path(self.root)
+        return target.name
+
+    def delete(self, ref: str) -> None:
+        self._path(ref).unlink(missing_ok=True)
+
+    def exists(self, ref: str) -> bool:
+        return self._path(ref).exists()
+
+    def exists_name(self, name: str) -> bool:
+        return self.exists(name)
+
+    def iter_artifacts(self) -> Iterator[tuple[str, str]]:
+        # Partial writes (".<name>.<hex>.part") never match a suffix
+        for path in sorted(self.root.iterdir()):
+            if path.is_file() and path.suffix in ARTIFACT_SUFFIXES:
+                yield path.name, path.name
+
+    def iter_chunks(self, ref: str) -> Iterator[bytes]:
+        try:
+            source = open(self._path(ref), "rb")
+        except FileNotFoundError:
+            raise ArtifactNotFoundError(f"No artifact '{ref}' in {self.root}.")
+        with source:
+            while chunk := source.read(CHUNK_SIZE):
+                yield chunk
+
+    def local_path(self, ref: str) -> Path:
+        return self._path(ref)
+
+    def job_value(self, ref: str) -> str:
+        return f"{self.url_prefix}/{Path(ref).name}"
+
+    def job_fields(self, ref: str) -> dict:
+        return {"pdf_path": self.job_value(ref)}
+
+    def ref_from_job(self, job: dict) -> str | None:
+        value = job.get("pdf_path")
+        return Path(value).name if value else None
+
+
+# -----------------------------------------------------------------------
+# GridFS
+# -----------------------------------------------------------------------
+
+class GridFSStorage(ArtifactStorage):
+    name = "gridfs"
+    ref_field = "pdf_file_id"
+
+    def __init__(self, db, bucket_name: str = "pdfs", chunk_size_kb: int = 255):
+        from gridfs import GridFSBucket
+
+        self.chunk_size_bytes = chunk_size_kb * 1024
+        self.bucket = GridFSBucket(db, bucket_name=bucket_name, chunk_size_bytes=self.chunk_size_bytes)
+
+    @staticmethod
+    def _id(ref):
+        from bson import ObjectId
+        return ObjectId(ref)
+
+    def save_stream(self, source: BinaryIO, name: str, metadata: dict | None = None,
+                    content_type: str = "application/pdf") -> str:
+        file_id = self.bucket.upload_from_stream(
+            name,
+            source,
+            metadata={"contentType": content_type, **(metadata or {})},
+        )
+        return str(file_id)
+
+    def download_to(self, ref: str, destination: BinaryIO) -> None:
+        from gridfs import NoFile
+        try:
+            self.bucket.download_to_stream(self._id(ref), destination)
+        except NoFile:
+            raise ArtifactNotFoundError(f"No PDF with id {ref} in GridFS.")
+
+    def iter_chunks(self, ref: str) -> Iterator[bytes]:
+        from gridfs import NoFile
+        try:
+            stream = self.bucket.open_download_stream(self._id(ref))
+        except NoFile:
+            raise ArtifactNotFoundError(f"No PDF with id {ref} in GridFS.")
+        with stream:
+            while chunk := stream.readchunk():
+                yield chunk
+
+    def delete(self, ref: str) -> None:
+        from gridfs import NoFile
+        try:
+            self.bucket.delete(self._id(ref))
+        except NoFile:
+            pass
+
+    def exists(self, ref: str) -> bool:
+        return any(True for _ in self.bucket.find({"_id": self._id(ref)}, limit=1))
+
+    def exists_name(self, name: str) -> bool:
+        return any(True for _ in self.bucket.find({"filename": name}, limit=1))
+
+    def iter_artifacts(self) -> Iterator[tuple[str, str]]:
+        for grid_out in self.bucket.find({}):
+            yield str(grid_out._id), grid_out.filename
+
+    def delete_older_than(self, days: float) -> list[str]:
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        removed = []
+        for grid_out in self.bucket.find({"uploadDate": {"$lt": cutoff}}):
+            self.delete(grid_out._id)
+            removed.append(str(grid_out._id))
+        return removed
+
+    def job_value(self, ref: str):
+        return self._id(ref)
+
+
+# -----------------------------------------------------------------------
+# S3-compatible object storage
+# -----------------------------------------------------------------------
+
+class S3Storage(ArtifactStorage):
+    name = "s3"
+    ref_field = "pdf_key"
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: str | None = None,
+        region: str | None = None,
+        client=None,
+    ):
+        if not bucket:
+            raise ValueError("S3 storage needs a bucket (set S3_BUCKET).")
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise ImportError("boto3 not installed. Run: pip install boto3")
+            client = boto3.client("s3", endpoint_url=endpoint_url or None, region_name=region or None)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}{Path(name).name}"
+
+    def save_stream(self, source: BinaryIO, name: str, metadata: dict | None = None,
+                    content_type: str = "application/pdf") -> str:
+        key = self._key(name)
+        # upload_fileobj reads the stream in parts (multipart for large files)
+        self.client.upload_fileobj(
+            source,
+            self.bucket,
+            key,
+            ExtraArgs={
+                "ContentType": content_type,
+                "Metadata": {k: str(v) for k, v in (metadata or {}).items()},
+            },
+        )
+        return key
+
+    def download_to(self, ref: str, destination: BinaryIO) -> None:
+        try:
+            self.client.download_fileobj(self.bucket, ref, destination)
+        except Exception as e:
+            if _is_missing(e):
+                raise ArtifactNotFoundError(f"No object '{ref}' in s3://{self.bucket}.")
+            raise
+
+    def iter_chunks(self, ref: str) -> Iterator[bytes]:
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=ref)["Body"]
+        except Exception as e:
+            if _is_missing(e):
+                raise ArtifactNotFoundError(f"No object '{ref}' in s3://{self.bucket}.")
+            raise
+        try:
+            yield from body.iter_chunks(CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def delete(self, ref: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=ref)
+
+    def exists(self, ref: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=ref)
+        except Exception as e:
+            if _is_missing(e):
+                return False
+            raise
+        return True
+
+    def exists_name(self, name: str) -> bool:
+        return self.exists(self._key(name))
+
+    def _objects(self) -> Iterator[dict]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            yield from page.get("Contents", [])
+
+    def iter_artifacts(self) -> Iterator[tuple[str, str]]:
+        for obj in self._objects():
+            yield obj["Key"], obj["Key"][len(self.prefix):]
+
+    def delete_older_than(self, days: float) -> list[str]:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        removed = []
+        for obj in list(self._objects()):
+            if obj["LastModified"] < cutoff:
+                self.delete(obj["Key"])
+                removed.append(obj["Key"])
+        return removed
+
+
+def _is_missing(error: Exception) -> bool:
+    """True for botocore's 404 / NoSuchKey ClientErrors."""
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+# -----------------------------------------------------------------------
+# Factory
+# -----------------------------------------------------------------------
+
+def open_storage(config, db=None) -> ArtifactStorage:
+    """Build the backend named by config.ARTIFACT_STORAGE."""
+    backend = config.ARTIFACT_STORAGE
+    if backend == "local":
+        return LocalStorage(config.OUTPUT_DIR)
+    if backend == "gridfs":
+        if db is None:
+            from src.db import Database
+            db = Database.get_db()
+        return GridFSStorage(db, bucket_name=config.GRIDFS_BUCKET, chunk_size_kb=config.GRIDFS_CHUNK_KB)
+    if backend == "s3":
+        return S3Storage(
+            bucket=config.S3_BUCKET,
+            prefix=config.S3_PREFIX,
+            endpoint_url=config.S3_ENDPOINT_URL,
+            region=config.S3_REGION,
+        )
+    raise ValueError(f"Unknown ARTIFACT_STORAGE '{backend}' (expected local, gridfs or s3).")
@@ -0,0 +1,108 @@
+"""
+src/tracing.py
+--------------
+Lightweight per-job tracing: named spans timed with time.monotonic().
+
+A trace is bound to the current context (contextvars), so code deep in the
+call stack (sanitizer, pdflatex passes, Drive calls) records spans without
+any trace object being passed around. Outside a trace, `span()` does nothing
+but one ContextVar lookup.
+
+The worker persists each job's trace as the `timings` subdocument of its
+`generations` record: milliseconds per stage (repeated spans are summed)
+plus the job total, e.g.
+
+    {"total_ms": 2310.4, "db_resolve_ms": 3.1, "sanitize_ms": 0.8,
+     "render_ms": 4.2, "pdflatex_pass1_ms": 1104.9, "pdflatex_pass2_ms": 1090.2,
+     "storage_save_ms": 6.5, "drive_folders_ms": 0.0, "drive_upload_ms": 88.1, ...}
+
+Usage:
+    with trace() as job_trace:
+        with span("render"):
+            ...
+    job_trace.as_document()
+
+    @traced("drive_lookup")
+    def _find_existing_file(...): ...
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+_current: ContextVar["Trace | None"] = ContextVar("trace", default=None)
+
+
+class Trace:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.finished: float | None = None
+        # (name, offset from start, duration), in seconds
+        self.spans: list[tuple[str, float, float]] = []
+
+    def add(self, name: str, start: float, duration: float) -> None:
+        self.spans.append((name, start - self.started, duration))
+
+    def stages(self) -> dict[str, float]:
+        """Milliseconds per span name, summed over repeats, in first-seen order."""
+        totals: dict[str, float] = {}
+        for name, _, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration * 1000
+        return totals
+
+    def total_ms(self) -> float:
+        end = self.finished if self.finished is not None else time.monotonic()
+        return (end - self.started) * 1000
+
+    def as_document(self) -> dict:
+        document = {"total_ms": round(self.total_ms(), 1)}
+        for name, ms in self.stages().items():
+            document[f"{name}_ms"] = round(ms, 1)
+        return document
+
+    def summary(self) -> str:
+        stages = ", ".join(f"{name} {ms:.0f}" for name, ms in self.stages().items())
+        return f"total {self.total_ms():.0f} ms ({stages})"
+
+
+def current_trace() -> Trace | None:
+    return _current.get()
+
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """Start a trace for the current context (one job)."""
+    job_trace = Trace()
+    token = _current.set(job_trace)
+    try:
+        yield job_trace
+    finally:
+        job_trace.finished = time.monotonic()
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the block as `name` in the current trace, if there is one."""
+    job_trace = _current.get()
+    if job_trace is None:
+        yield
+        return
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        job_trace.add(name, start, time.monotonic() - start)
+
+
+def traced(name: str):
+    """Decorator form of span()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,29 @@
+"""
+src/validation.py
+-----------------
+Schema validation helpers shared by the parse pipeline, the importer and
+scripts/validate.py.
+
+Usage:
+    for error in validator.iter_errors(data):
+        print(f"{friendly_path(error)}: {error.message}")
+"""
+
+from jsonschema import ValidationError
+
+
+def friendly_path(error: ValidationError) -> str:
+    """
+    Convert a jsonschema error's absolute path into a readable string.
+    e.g. deque(['work', 0, 'highlights']) -> "work[0].highlights"
+    """
+    parts = []
+    for part in error.absolute_path:
+        if isinstance(part, int):
+            parts.append(f"[{part}]")
+        else:
+            if parts:
+                parts.append(f".{part}")
+            else:
+                parts.append(str(part))
+    return "".join(parts) if parts else "(root)"
@@ -1,9 +1,17 @@
 import time
 import sys
 import os
+import io
+import shutil
+import signal
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+from pymongo.errors import OperationFailure
+
 # Add the project root to sys.path to allow imports from src
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -12,155 +20,627 @@ from src.config import Config
 from src.generator import ResumeGenerator
 from src.compiler import PDFCompiler
 from src.auth import default_credentials
-from src.drive import DriveUploader
+from src.drive import DriveUploader, DriveUploaderCache
+from src.job_queue import JobQueue
+from src.scheduler import FairScheduler, parse_weights
+from src.coordination import Partitioner
+from src.snapshots import SnapshotStore
+from src.status_writer import StatusWriter
+from src.storage import LocalStorage, open_storage
+from src.ai_pipeline import AIPipeline
+from src.import_pipeline import ImportPipeline
+from src.parse_cache import ParseCache
+from src.tracing import span, trace
+from src.metrics import WorkerMetrics
+from src.profiling import should_profile, start_profiler
 
 class ResumeWorker:
     def __init__(self):
         self.config = Config.get_instance()
         Database.connect()
         self.db = Database.get_db()
+        # Status transitions use the configured write concern
+        self.jobs = self.db.generations.with_options(write_concern=Database.status_write_concern())
+        self.queue = JobQueue(
+            self.jobs,
+            batch_size=self.config.WORKER_BATCH_SIZE,
+            lease_seconds=self.config.JOB_LEASE_SECONDS,
+            max_attempts=self.config.JOB_MAX_ATTEMPTS,
+            scheduler=FairScheduler(weights=parse_weights(self.config.FAIR_SHARE_WEIGHTS)),
+            partitioner=Partitioner(
+                index=self.config.WORKER_INDEX,
+                count=self.config.WORKER_COUNT,
+                steal_after_seconds=self.config.WORKER_STEAL_AFTER_SECONDS,
+            ),
+            ttl_days=self.config.GENERATIONS_TTL_DAYS,
+        )
+        # PDF storage (ARTIFACT_STORAGE). GridFS writes use the status write
+        # concern so a PDF is as durable as the COMPLETED status pointing at it
+        self.storage = open_storage(
+            self.config, self.db.with_options(write_concern=Database.status_write_concern())
+        )
+        self.config.BUILD_DIR.mkdir(parents=True, exist_ok=True)
+        self.snapshots = SnapshotStore(self.db, cache_size=self.config.SNAPSHOT_CACHE_SIZE)
         self.generator = ResumeGenerator()
         self.compiler = PDFCompiler()
+        # Import jobs (`source_pdf`) need the AI pipeline; built on first use
+        self._importer = None
+        self._importer_lock = threading.Lock()
         
-        # Init Drive Uploader if credentials exist
+        # Per-user uploaders (job owner's Drive), with the project token as fallback
+        self.uploaders = DriveUploaderCache(
+            max_size=self.config.DRIVE_UPLOADER_CACHE_SIZE,
+            idle_seconds=self.config.DRIVE_UPLOADER_IDLE_SECONDS,
+            on_refresh=self._persist_refreshed_token,
+        )
         creds = default_credentials()
         self.uploader = DriveUploader(creds) if creds else None
         if not self.uploader:
-            print("[WARN] Google Drive credentials not found. Uploads will be skipped.")
+            print("[WARN] Default Google Drive credentials not found. Jobs without an owner token will skip upload.")
+
+        # Jobs currently held by this worker (lease renewed by the maintenance thread)
+        self._in_flight: set = set()
+        self._in_flight_lock = threading.Lock()
+        # Completed jobs whose status is still buffered: job id -> (filename, timing summary)
+        self._completed: dict = {}
+        # Set when jobs may be claimable without an insert event (reaped jobs,
+        # or other partitions' jobs becoming stealable), so the main loop sweeps
+        self._sweep_requested = threading.Event()
+        self._stop = threading.Event()
+
+        # Backpressure: a slot must be free before a job is claimed
+        self._slots = threading.BoundedSemaphore(self.config.WORKER_MAX_IN_FLIGHT)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.WORKER_MAX_IN_FLIGHT, thread_name_prefix="job"
+        )
+        self._admission_paused = False
+
+        # Terminal statuses are written in batches; a job stays leased (and
+        # heartbeated) until its status has actually been flushed
+        self.status_writer = StatusWriter(
+            self.jobs,
+            max_batch=self.config.STATUS_BATCH_SIZE,
+            max_delay=self.config.STATUS_FLUSH_MS / 1000,
+            on_flushed=self._release_jobs,
+        )
+
+        # Prometheus metrics; in-flight jobs and cache hit rates are read at scrape time
+        self.metrics = WorkerMetrics()
+        self.metrics.track_in_flight(lambda: len(self._in_flight))
+        self.metrics.track_cache("snapshot", self.snapshots)
+        self.metrics.track_cache("drive_uploader", self.uploaders)
 
     def run(self):
         """Starts the worker loop."""
         print("\n[START] Resume Engine Worker Started")
+        print(f"[START] Worker ID: {self.queue.worker_id} (partition {self.queue.partitioner})")
+        print(f"[START] Max in-flight jobs: {self.config.WORKER_MAX_IN_FLIGHT}")
+        if self.config.METRICS_PORT:
+            try:
+                self.metrics.serve(self.config.METRICS_PORT)
+                print(f"[START] Metrics: http://0.0.0.0:{self.config.METRICS_PORT}/metrics")
+            except OSError as e:
+                print(f"[WARN] Metrics endpoint not started on port {self.config.METRICS_PORT}: {e}")
         print("===============================\n")
 
+        threading.Thread(target=self._maintenance_loop, name="maintenance", daemon=True).start()
+        self.status_writer.start()
+
         # 1. Sweep backlog (jobs missed while worker was down)
         self._sweep_backlog()
 
-        # 2. Start watching Change Streams for live inserts
+        # 2. Start watching Change Streams for live inserts (resuming from the
+        #    stored token, so inserts made during the sweep aren't missed)
         self._watch_live_jobs()
 
+    def shutdown(self):
+        """Stop background work and let in-flight jobs finish."""
+        self._stop.set()
+        self._executor.shutdown(wait=True)
+        self.status_writer.close()
+
     def _sweep_backlog(self):
-        """Finds any existing PENDING jobs and processes them."""
+        """Finds any existing PENDING jobs and dispatches them."""
         print("[SWEEP] Sweeping for backlog PENDING jobs...")
+        count = self._drain_pending("BACKLOG")
+        print(f"[DONE] Dispatched {count} backlog jobs.\n")
+
+    def _drain_pending(self, source: str) -> int:
+        """
+        Claim and dispatch PENDING jobs until none are left.
+
+        Claims never exceed the free in-flight slots: when every slot is busy
+        this blocks until a job finishes, leaving the rest of the queue
+        unclaimed (and available to other replicas). Each batch is picked by
+        the fair-share scheduler, so a bulk insert from one owner is
+        interleaved with everyone else's jobs.
+        """
         count = 0
         while True:
-            # Atomic find and claim
-            job = self.db.generations.find_one_and_update(
-                {"status": "PENDING"},
-                {"$set": {"status": "PROCESSING", "updatedAt": datetime.utcnow()}},
-                sort=[("createdAt", 1)]
-            )
-            if not job:
-                break
-                
-            count += 1
-            print(f"\n[BACKLOG] Found matching job: {job['output_filename']}")
+            free = self._acquire_slots(self.config.WORKER_BATCH_SIZE)
+
+            if not self._has_disk_headroom():
+                self._release_slots(free)
+                return count
+
+            jobs = self.queue.claim_pending(limit=free)
+            self._release_slots(free - len(jobs))
+            if not jobs:
+                return count
+            # Heartbeat the whole batch from the moment it is claimed, not
+            # only once each job gets a thread
+            with self._in_flight_lock:
+                self._in_flight.update(job["_id"] for job in jobs)
+
+            for job in jobs:
+                count += 1
+                print(f"\n[{source}] Found matching job: {job.get('output_filename', 'Unknown')}")
+                self._executor.submit(self._run_job, job)
+
+    def _acquire_slots(self, wanted: int) -> int:
+        """Block for one free slot, then take up to `wanted` without blocking."""
+        self._slots.acquire()
+        taken = 1
+        while taken < wanted and self._slots.acquire(blocking=False):
+            taken += 1
+        return taken
+
+    def _release_slots(self, count: int) -> None:
+        for _ in range(count):
+            self._slots.release()
+
+    def _run_job(self, job: dict) -> None:
+        try:
             self._process_job(job)
-            
-        print(f"[DONE] Swept {count} backlog jobs.\n")
+        except Exception:
+            # The executor's future is never read, so log here. Stop
+            # heartbeating so the reaper re-queues the job, unless its
+            # COMPLETED status is already buffered
+            print(f"[ERROR] Job thread crashed: {job['_id']}")
+            traceback.print_exc()
+            with self._in_flight_lock:
+                if job["_id"] not in self._completed:
+                    self._in_flight.discard(job["_id"])
+        finally:
+            self._slots.release()
+
+    def _release_jobs(self, applied: list, lost: list) -> None:
+        """
+        Called once a status flush is done: stop heartbeating those jobs, and
+        report the completed ones whose status was actually written as done.
+        A lost job was re-queued by the reaper (or its update was rejected)
+        and is left to whoever claims it next.
+        """
+        with self._in_flight_lock:
+            self._in_flight.difference_update(applied)
+            self._in_flight.difference_update(lost)
+            completed = [self._completed.pop(job_id) for job_id in applied if job_id in self._completed]
+            dropped = [self._completed.pop(job_id) for job_id in lost if job_id in self._completed]
+        for filename, timing in completed:
+            print(f"[SUCCESS] Job COMPLETED: {filename}")
+            print(f"   [TIMING] {timing}")
+        for filename, _ in dropped:
+            print(f"[WARN] Job {filename} built, but its COMPLETED status was not written (lease lost).")
+
+    def _has_disk_headroom(self) -> bool:
+        """Admission check: don't claim new work while the build dir (or local output/) is nearly full."""
+        dirs = [self.config.BUILD_DIR]
+        if isinstance(self.storage, LocalStorage):
+            dirs.append(self.storage.root)
+        free_mb, path = min((shutil.disk_usage(d).free // (1024 * 1024), d) for d in dirs)
+        if free_mb >= self.config.OUTPUT_MIN_FREE_MB:
+            if self._admission_paused:
+                print("[ADMISSION] Disk space recovered; resuming claims.")
+            self._admission_paused = False
+            return True
+        if not self._admission_paused:
+            print(f"[ADMISSION] Only {free_mb} MB free in {path}; pausing claims.")
+        self._admission_paused = True
+        return False
 
     def _watch_live_jobs(self):
-        """Uses Change Streams to instantly react to new PENDING jobs."""
+        """Uses Change Streams to react to new PENDING jobs, claiming them in scheduled batches."""
         print("[WATCH] Watching for live inserts via Change Stream...\n")
-        
+
         pipeline = [
-            {"$match": {"operationType": "insert", "fullDocument.status": "PENDING"}}
+            {"$match": {"operationType": "insert", "fullDocument.status": "PENDING"}},
+            # Only the job id and owner fields (the partition key) are
+            # needed; don't ship resume_data with every event
+            {"$project": {"documentKey": 1, "fullDocument.user_id": 1, "fullDocument.resume_id": 1}},
         ]
-        
+
+        backoff = 0.0
         while True:
+            resume_token = self._load_resume_token()
             try:
-                # This blocks until a new document is inserted
-                with self.db.generations.watch(pipeline) as stream:
-                    for change in stream:
-                        job_id = change["documentKey"]["_id"]
-                        
-                        # Atomically claim it (in case multiple workers received the event)
-                        job = self.db.generations.find_one_and_update(
-                            {"_id": job_id, "status": "PENDING"},
-                            {"$set": {"status": "PROCESSING", "updatedAt": datetime.utcnow()}}
-                        )
-                        
-                        if job:
-                            print(f"\n[LIVE] New job arrived: {job.get('output_filename', 'Unknown')}")
-                            self._process_job(job)
-                            print("\n[WATCH] Resuming watch...")
-                            
+                with self.db.generations.watch(
+                    pipeline,
+                    max_await_time_ms=self.config.WORKER_BATCH_WINDOW_MS,
+                    resume_after=resume_token,
+                ) as stream:
+                    # Only a stream that delivers an event, or stays up for
+                    # STREAM_RECONNECT_MAX_SECONDS, resets the backoff; one
+                    # that opens and then fails right away keeps backing off
+                    healthy_at = time.monotonic() + self.config.STREAM_RECONNECT_MAX_SECONDS
+                    while stream.alive:
+                        if self._sweep_requested.is_set():
+                            self._sweep_requested.clear()
+                            self._sweep_backlog()
+
+                        job_ids = self._next_event_batch(stream)
+                        if job_ids or time.monotonic() >= healthy_at:
+                            backoff = 0.0
+                        if not job_ids:
+                            continue
+
+                        # Inserts are only a wake-up signal: what gets claimed is
+                        # decided by priority and fair share, not arrival order
+                        self._drain_pending("LIVE")
+
+                        # Checkpoint only after the batch is handled (at-least-once)
+                        self._save_resume_token(stream.resume_token)
+                        print("\n[WATCH] Resuming watch...")
+
+            except OperationFailure as e:
+                # 286 ChangeStreamHistoryLost / 280 ChangeStreamFatalError:
+                # the stored token is unusable, so restart from "now" after a sweep
+                if e.code in (280, 286) and resume_token is not None:
+                    print(f"[WARN] Resume token no longer valid, starting fresh: {e}")
+                    self._save_resume_token(None)
+                else:
+                    print(f"[WARN] Change stream error: {e}")
+                    backoff = self._reconnect_backoff(backoff)
+                self._sweep_gap()
+
             except Exception as e:
-                # If connection drops, wait and reconnect
-                print(f"[WARN] Change stream error (sleeping 5s): {e}")
-                time.sleep(5)
+                # Connection dropped: reopen from the stored token; the sweep
+                # picks up anything the stream can't replay
+                print(f"[WARN] Change stream error: {e}")
+                backoff = self._reconnect_backoff(backoff)
+                self._sweep_gap()
+
+    def _reconnect_backoff(self, previous: float) -> float:
+        """Sleep before reconnecting: immediate first retry, then doubling up to the cap."""
+        delay = min(previous * 2 or 0.1, self.config.STREAM_RECONNECT_MAX_SECONDS)
+        if previous:
+            print(f"[WATCH] Reconnecting in {delay:.1f}s...")
+            time.sleep(delay)
+        return delay
+
+    def _sweep_gap(self):
+        try:
+            self._sweep_backlog()
+        except Exception as e:
+            print(f"[WARN] Gap sweep failed: {e}")
+
+    def _stream_state_id(self) -> str:
+        """
+        worker_state key for the change-stream checkpoint: one per partition,
+        so replicas watching different slices never resume from each other's
+        token. Replicas sharing a partition share its work, and its checkpoint.
+        """
+        partitioner = self.queue.partitioner
+        return f"stream:{partitioner.index}-of-{partitioner.count}"
+
+    def _load_resume_token(self) -> dict | None:
+        state = self.db.worker_state.find_one({"_id": self._stream_state_id()}, {"resume_token": 1})
+        return state.get("resume_token") if state else None
+
+    def _save_resume_token(self, token: dict | None) -> None:
+        self.db.worker_state.update_one(
+            {"_id": self._stream_state_id()},
+            {"$set": {"resume_token": token, "updatedAt": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    def _next_event_batch(self, stream) -> list:
+        """
+        Block until an insert event arrives, then keep collecting ids for up to
+        WORKER_BATCH_WINDOW_MS (or until WORKER_BATCH_SIZE ids) so a burst of
+        inserts triggers a single claim cycle.
+        """
+        window = self.config.WORKER_BATCH_WINDOW_MS / 1000
+        job_ids = []
+        deadline = None
+
+        while stream.alive and len(job_ids) < self.config.WORKER_BATCH_SIZE:
+            change = stream.try_next()
+            if change is not None and not self._owns_event(change):
+                # Another replica's partition; it will be stolen later if stranded
+                change = None
+            if change is not None:
+                job_ids.append(change["documentKey"]["_id"])
+                if deadline is None:
+                    deadline = time.monotonic() + window
+            elif deadline is None and self._sweep_requested.is_set():
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+        return job_ids
+
+    def _owns_event(self, change: dict) -> bool:
+        job = {**change.get("fullDocument", {}), "_id": change["documentKey"]["_id"]}
+        return self.queue.partitioner.owns(job)
+
+    def _maintenance_loop(self):
+        """
+        Background thread: heartbeat held leases, reap expired ones, apply
+        per-owner admission limits, publish queue depth and trigger sweeps
+        when jobs become claimable without an insert event. (Retention runs
+        from scripts/retention.py, not from every replica.)
+        """
+        partitioner = self.queue.partitioner
+        tick = min(self.config.JOB_HEARTBEAT_SECONDS, self.config.ADMISSION_INTERVAL_SECONDS)
+        next_heartbeat = 0.0
+        next_reap = 0.0
+        next_admission = 0.0
+        next_steal = time.monotonic() + partitioner.steal_after_seconds
+
+        while not self._stop.wait(tick):
+            try:
+                now = time.monotonic()
+
+                if now >= next_heartbeat:
+                    next_heartbeat = now + self.config.JOB_HEARTBEAT_SECONDS
+                    with self._in_flight_lock:
+                        held = list(self._in_flight)
+                    self.queue.heartbeat(held)
+
+                if now >= next_reap:
+                    next_reap = now + self.config.REAPER_INTERVAL_SECONDS
+                    requeued, failed = self.queue.reap_expired()
+                    if requeued or failed:
+                        print(f"[REAPER] Expired leases: {requeued} re-queued, {failed} failed.")
+                    if requeued:
+                        self._sweep_requested.set()
+
+                if now >= next_admission:
+                    next_admission = now + self.config.ADMISSION_INTERVAL_SECONDS
+                    self._admission_cycle()
+
+                # Other replicas' jobs only become claimable here after waiting
+                # steal_after_seconds, and no insert event will announce that
+                if partitioner.enabled and now >= next_steal:
+                    next_steal = now + partitioner.steal_after_seconds
+                    self._sweep_requested.set()
+            except Exception as e:
+                print(f"[WARN] Maintenance cycle failed: {e}")
+
+    def _admission_cycle(self) -> None:
+        """Throttle/release per-owner overflow and publish this worker's view of the queue."""
+        limit = self.config.MAX_PENDING_PER_OWNER
+        throttled = self.queue.throttle_overflow(limit)
+        released = self.queue.release_throttled(limit)
+        if throttled or released:
+            print(f"[ADMISSION] {throttled} job(s) throttled, {released} released.")
+        if released or self._admission_paused:
+            self._sweep_requested.set()
+
+        depth = self.queue.depth()
+        for status, count in depth.items():
+            self.metrics.queue_depth.set(count, status=status)
+        with self._in_flight_lock:
+            in_flight = len(self._in_flight)
+        self.db.worker_state.update_one(
+            {"_id": f"worker:{self.queue.worker_id}"},
+            {"$set": {
+                "queue_depth": depth,
+                "in_flight": in_flight,
+                "max_in_flight": self.config.WORKER_MAX_IN_FLIGHT,
+                "admission_paused": self._admission_paused,
+                "updatedAt": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+
+    def _job_owner(self, job: dict):
+        """Resolve the owning user id, falling back to the parent resume document."""
+        if job.get("user_id"):
+            return job["user_id"]
+        if job.get("resume_id") is None:
+            return None
+        resume = self.db.resumes.find_one({"_id": job["resume_id"]}, {"user_id": 1})
+        return resume.get("user_id") if resume else None
+
+    def _uploader_for(self, job: dict) -> DriveUploader | None:
+        """Return the job owner's uploader, or the default one if they have no Drive token."""
+        user_id = self._job_owner(job)
+        if user_id is None:
+            return self.uploader
+
+        user = self.db.users.find_one({"_id": user_id}, {"drive_token": 1})
+        token = user.get("drive_token") if user else None
+        if not token:
+            return self.uploader
+
+        try:
+            return self.uploaders.get(user_id, token)
+        except Exception as e:
+            print(f"   [WARN] Could not load Drive credentials for user {user_id}: {e}")
+            return self.uploader
+
+    def _persist_refreshed_token(self, user_id, creds) -> None:
+        """Write a refreshed per-user token back so the next cold start doesn't refresh again."""
+        import json
+
+        self.db.users.update_one(
+            {"_id": user_id},
+            {"$set": {"drive_token": json.loads(creds.to_json()), "updatedAt": datetime.utcnow()}}
+        )
+
+    def _get_importer(self) -> ImportPipeline:
+        with self._importer_lock:
+            if self._importer is None:
+                cache = ParseCache(self.config.PARSE_CACHE_DIR, self.config.PARSE_CACHE_MAX_ENTRIES)
+                self.metrics.track_cache("parse", cache)
+                ai = AIPipeline(self.config.BASE_DIR / "schema" / "resume.schema.json", cache=cache)
+                self._importer = ImportPipeline(ai, self.storage, self.generator, self.compiler)
+            return self._importer
+
+    def _import_source_pdf(self, job: dict) -> dict:
+        """
+        Parse an uploaded PDF (`source_pdf`, a storage ref) into a validated
+        payload, in memory. The file keeps its upload name (`source_filename`,
+        else the ref's), which is where a PDF in our naming scheme carries
+        its meta code.
+        """
+        filename = Path(job.get("source_filename") or "").name or None
+        with self.storage.open_local(job["source_pdf"], filename=filename) as pdf_path:
+            return self._get_importer().parse(pdf_path)
+
+    def _start_profiler(self, job: dict):
+        """Start profiling this job's thread if it is flagged or sampled; None otherwise."""
+        if not should_profile(job, self.config.PROFILE_SAMPLE_RATE):
+            return None
+        try:
+            return start_profiler(self.config.PROFILE_MODE, self.config.PROFILE_INTERVAL_MS / 1000)
+        except Exception as e:
+            print(f"   [WARN] Profiling not started: {e}")
+            return None
+
+    def _save_profile(self, job_id, profiler, job_trace) -> dict:
+        """Stop the profiler, store its artifact next to the PDFs and return the job fields pointing at it."""
+        if profiler is None:
+            return {}
+        try:
+            artifact = profiler.stop()
+            ref = self.storage.save_stream(
+                io.BytesIO(artifact.data),
+                f"profile_{job_id}.{artifact.extension}",
+                metadata={"job_id": job_id},
+                content_type=artifact.content_type,
+            )
+        except Exception as e:
+            print(f"   [WARN] Could not store profile: {e}")
+            return {}
+        # The profiler sees pdflatex only as a wait in subprocess; its wall time comes from the trace
+        pdflatex_ms = sum(ms for name, ms in job_trace.stages().items() if name.startswith("pdflatex"))
+        print(f"   [PROFILE] {artifact.format} profile stored ({self.storage.name}: {ref})")
+        return {"profile_artifact": {
+            "ref": ref,
+            "storage": self.storage.name,
+            "format": artifact.format,
+            "samples": artifact.samples,
+            "total_ms": round(job_trace.total_ms(), 1),
+            "pdflatex_ms": round(pdflatex_ms, 1),
+        }}
 
     def _process_job(self, job: dict):
-        """Full pipeline: JSON -> LaTeX -> PDF -> Drive -> Update DB"""
+        """Full pipeline: [PDF -> JSON] -> LaTeX -> PDF -> Drive -> Update DB"""
         job_id = job["_id"]
-        filename = job["output_filename"]
-        data = job["resume_data"]
+        filename = job.get("output_filename") or f"import_{job_id}"
         meta_code = job.get("meta_code", "RES")
         
         print(f"[JOB] Processing: {filename} (ID: {job_id})")
-        
-        try:
-            # 1. Render LaTeX
-            tex_content = self.generator.generate_tex_from_data(data)
-            
-            # Write LaTeX to temporary output file
-            tex_path = self.config.OUTPUT_DIR / f"{filename}.tex"
-            with open(tex_path, "w", encoding="utf-8") as f:
-                f.write(tex_content)
-                
-            # 2. Compile PDF
-            pdf_path = self.compiler.compile_tex(tex_path)
-            
-            # Optional: Move to clean naming convention relative to output folder
-            # compiler.compile_tex already places it in self.config.OUTPUT_DIR
-            relative_pdf_path = f"/output/{pdf_path.name}"
+
+        # Per-job scratch directory: concurrent jobs never share pdflatex aux files
+        build_dir = self.config.BUILD_DIR / str(job_id)
+
+        # Per-stage timings, persisted as the job's `timings` subdocument
+        with trace() as job_trace:
+            profiler = self._start_profiler(job)
+            profile = None  # job fields from _save_profile, which stops the profiler
+            try:
+                # 1. Resolve the payload (embedded, by snapshot reference, or parsed
+                # from an uploaded PDF) and render LaTeX
+                imported = {}
+                if job.get("source_pdf"):
+                    print("   [PARSE] Parsing uploaded PDF...")
+                    with span("parse"):
+                        data = self._import_source_pdf(job)
+                    meta_code = data["meta"]["code"]
+                    # Keep the parsed payload so the app can turn it into a resume
+                    with span("db_snapshot_store"):
+                        imported = {"content_hash": self.snapshots.store(data), "meta_code": meta_code}
+                else:
+                    with span("db_resolve"):
+                        data = self.snapshots.resolve(job)
+                tex_content = self.generator.generate_tex_from_data(data)
             
-            # Clean up the .tex file since we only need the PDF
-            if tex_path.exists():
-                tex_path.unlink()
+                # Write LaTeX to the job's build directory
+                build_dir.mkdir(parents=True, exist_ok=True)
+                tex_path = build_dir / f"{filename}.tex"
+                with open(tex_path, "w", encoding="utf-8") as f:
+                    f.write(tex_content)
                 
-            print(f"   [OK] Compiled: {relative_pdf_path}")
-                
-            # 3. Upload to Google Drive (if configured)
-            drive_link = None
-            if self.uploader:
-                print("   [UPLOAD] Uploading to Drive...")
-                drive_link = self.uploader.upload_pdf(pdf_path, meta_code=meta_code)
-                print(f"   [OK] Drive Link: {drive_link}")
+                # 2. Compile in the scratch dir and stream the PDF into storage.
+                # The PDF is durable before any COMPLETED status can be written.
+                try:
+                    pdf_path = self.compiler.compile_tex(tex_path)
+                except Exception as e:
+                    self.metrics.compile_failed(e)
+                    raise
+                with span("storage_save"):
+                    ref = self.storage.save(
+                        pdf_path, metadata={"job_id": job_id, "resume_id": job.get("resume_id")}
+                    )
+                print(f"   [OK] Compiled: {pdf_path.name} ({self.storage.name}: {ref})")
+
+                # 3. Upload to Google Drive (if configured)
+                drive_link = None
+                with span("db_owner_lookup"):
+                    uploader = self._uploader_for(job)
+                if uploader:
+                    print("   [UPLOAD] Uploading to Drive...")
+                    drive_link = uploader.upload_pdf(pdf_path, meta_code=meta_code)
+                    print(f"   [OK] Drive Link: {drive_link}")
                 
-            # 4. Mark Completed
-            self.db.generations.update_one(
-                {"_id": job_id},
-                {"$set": {
+                # 4. Mark Completed (buffered; only applied if we still hold the
+                # lease). Success is logged by _release_jobs once it is written
+                profile = self._save_profile(job_id, profiler, job_trace)
+                op = self.queue.completion_op(job, {
                     "status": "COMPLETED",
-                    "pdf_path": relative_pdf_path,
+                    **self.storage.job_fields(ref),
+                    **imported,
                     "drive_link": drive_link,
-                    "updatedAt": datetime.utcnow()
-                }}
-            )
-            print(f"[SUCCESS] Job COMPLETED: {filename}")
+                    "timings": job_trace.as_document(),
+                    **profile,
+                })
+                with self._in_flight_lock:
+                    self._completed[job_id] = (filename, job_trace.summary())
+                self.status_writer.submit(job_id, op, self.queue.completed_filter(job))
+                self.metrics.observe_job("completed", job_trace)
             
-        except Exception as e:
-            error_msg = str(e)
-            print(f"[ERROR] Job FAILED: {filename} - {error_msg}")
+            except Exception as e:
+                error_msg = str(e)
+                print(f"[ERROR] Job FAILED: {filename} - {error_msg}")
             
-            # Log full traceback for debugging
-            import traceback
-            traceback.print_exc()
+                # Log full traceback for debugging
+                traceback.print_exc()
             
-            self.db.generations.update_one(
-                {"_id": job_id},
-                {"$set": {
+                if profile is None:
+                    profile = self._save_profile(job_id, profiler, job_trace)
+                self.status_writer.submit(job_id, self.queue.completion_op(job, {
                     "status": "FAILED",
                     "error_log": error_msg,
-                    "updatedAt": datetime.utcnow()
-                }}
-            )
+                    "timings": job_trace.as_document(),
+                    **profile,
+                }), self.queue.completed_filter(job))
+                self.metrics.observe_job("failed", job_trace)
+            finally:
+                if profiler is not None and profile is None:
+                    profiler.stop()
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def _stop_on_sigterm(signum, frame):
+    # `docker stop` sends SIGTERM (ignored by default as PID 1): shut down
+    # like Ctrl+C so in-flight jobs finish and buffered statuses are written
+    raise KeyboardInterrupt
+
 
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, _stop_on_sigterm)
+    worker = None
     try:
         worker = ResumeWorker()
         worker.run()
     except KeyboardInterrupt:
+        # Let in-flight jobs finish; anything still leased after a hard kill
+        # simply expires and the reaper re-queues it
+        if worker is not None:
+            print("\n[EXIT] Waiting for in-flight jobs...")
+            worker.shutdown()
         print("\n[EXIT] Worker shut down gracefully.")
         sys.exit(0)
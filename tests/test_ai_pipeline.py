@@ -0,0 +1,375 @@
+"""
+tests/test_ai_pipeline.py
+-------------------------
+pytest suite for AIPipeline against a local fake of the google-genai client
+(no network, no API key).
+
+Run: pytest tests/test_ai_pipeline.py -v
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from tenacity import wait_none
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.ai_pipeline import AIPipeline, ParseAborted, RateLimiter, UploadProcessingError, response_schema_for
+from src.parse_cache import ParseCache
+
+SCHEMA_PATH = PROJECT_ROOT / "schema" / "resume.schema.json"
+
+
+# -----------------------------------------------------------------------
+# Fake client
+# -----------------------------------------------------------------------
+
+class FakeGenAI:
+    """
+    Mimics client.files / client.models and client.aio.files / client.aio.models.
+    Each upload reports PROCESSING for `processing_polls` polls, then ACTIVE.
+    """
+
+    def __init__(self, processing_polls: int = 1, latency: float = 0.01, fail_names=()):
+        self.processing_polls = processing_polls
+        self.latency = latency
+        self.fail_names = set(fail_names)
+        self.polls: dict[str, int] = {}
+        self.deleted: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.streamed: list[str] = []
+
+        client = self
+
+        class Files:
+            def upload(self, file, config=None):
+                return client._upload(file)
+
+            def get(self, name):
+                return client._get(name)
+
+            def delete(self, name):
+                client.deleted.append(name)
+
+        class Models:
+            def generate_content(self, model, contents, config=None):
+                return client._respond(contents)
+
+            def generate_content_stream(self, model, contents, config=None):
+                return client._chunks(client._respond(contents))
+
+        class AsyncFiles:
+            async def upload(self, file, config=None):
+                return client._upload(file)
+
+            async def get(self, name):
+                return client._get(name)
+
+            async def delete(self, name):
+                client.deleted.append(name)
+
+        class AsyncModels:
+            async def generate_content(self, model, contents, config=None):
+                client.in_flight += 1
+                client.max_in_flight = max(client.max_in_flight, client.in_flight)
+                try:
+                    await asyncio.sleep(client.latency)
+                    return client._respond(contents)
+                finally:
+                    client.in_flight -= 1
+
+            async def generate_content_stream(self, model, contents, config=None):
+                response = await self.generate_content(model, contents, config)
+
+                async def chunks():
+                    for chunk in client._chunks(response):
+                        client.streamed.append(chunk.text)
+                        yield chunk
+                return chunks()
+
+        self.files = Files()
+        self.models = Models()
+        self.aio = SimpleNamespace(files=AsyncFiles(), models=AsyncModels())
+
+    def _upload(self, path: str):
+        name = f"files/{Path(path).stem}"
+        self.polls[name] = 0
+        return self._file(name)
+
+    def _get(self, name: str):
+        self.polls[name] += 1
+        return self._file(name)
+
+    def _file(self, name: str):
+        if name in self.fail_names:
+            state = "FAILED"
+        elif self.polls[name] < self.processing_polls:
+            state = "PROCESSING"
+        else:
+            state = "ACTIVE"
+        return SimpleNamespace(name=name, state=SimpleNamespace(name=state))
+
+    @staticmethod
+    def _chunks(response, size: int = 64):
+        text = response.text
+        return [SimpleNamespace(text=text[i:i + size]) for i in range(0, len(text), size)]
+
+    def _respond(self, contents):
+        uploaded_file = contents[0]
+        return SimpleNamespace(text=json.dumps({"meta": {"code": uploaded_file.name.split("/")[1].upper()}}))
+
+
+class RepairingGenAI(FakeGenAI):
+    """
+    First extraction returns `replies[0]` (then `replies[1]`, ...); repair
+    prompts are answered from `repairs` by path and recorded in `repaired`.
+    """
+
+    def __init__(self, replies: list[str], repairs: dict[str, object]):
+        super().__init__(processing_polls=0, latency=0)
+        self.replies = list(replies)
+        self.repairs = repairs
+        self.repaired: list[str] = []
+        self.uploads = 0
+
+    def _upload(self, path: str):
+        self.uploads += 1
+        return super()._upload(path)
+
+    def _respond(self, contents):
+        prompt = contents[1]
+        if prompt.startswith("Part of the JSON"):
+            label = prompt.split("Path: ", 1)[1].split("\n", 1)[0]
+            self.repaired.append(label)
+            return SimpleNamespace(text=json.dumps(self.repairs[label]))
+        return SimpleNamespace(text=self.replies.pop(0) if len(self.replies) > 1 else self.replies[0])
+
+
+def make_pipeline(client, **kwargs) -> AIPipeline:
+    kwargs.setdefault("requests_per_minute", 0)
+    kwargs.setdefault("repair_rounds", 0)
+    return AIPipeline(SCHEMA_PATH, client=client, poll_interval=0.001, **kwargs)
+
+
+def make_pdfs(tmp_path: Path, count: int) -> list[Path]:
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"cv{i}.pdf"
+        path.write_bytes(b"%PDF-1.5")
+        paths.append(path)
+    return paths
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+def test_sync_parse_polls_until_active(tmp_path):
+    client = FakeGenAI(processing_polls=3)
+    pdf = make_pdfs(tmp_path, 1)[0]
+
+    data = make_pipeline(client).parse_pdf_to_json(pdf)
+
+    assert data == {"meta": {"code": "CV0"}}
+    assert client.polls["files/cv0"] == 3
+    assert client.deleted == ["files/cv0"]
+
+
+def test_parse_many_bounds_concurrency_and_keeps_order(tmp_path):
+    client = FakeGenAI(latency=0.02)
+    pdfs = make_pdfs(tmp_path, 12)
+    seen = []
+
+    results = asyncio.run(
+        make_pipeline(client, max_concurrency=3).parse_many(pdfs, on_result=lambda p, d, e: seen.append(p))
+    )
+
+    assert [r[0] for r in results] == pdfs
+    assert all(error is None for _, _, error in results)
+    assert results[5][1] == {"meta": {"code": "CV5"}}
+    assert 1 < client.max_in_flight <= 3
+    assert sorted(seen) == sorted(pdfs)
+    assert sorted(client.deleted) == sorted(f"files/{p.stem}" for p in pdfs)
+
+
+def test_parse_many_reports_failures_per_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(AIPipeline._parse_remote_async.retry, "wait", wait_none())
+    client = FakeGenAI(fail_names={"files/cv1"})
+    pdfs = make_pdfs(tmp_path, 3)
+
+    results = asyncio.run(make_pipeline(client).parse_many(pdfs))
+
+    assert results[0][1] is not None and results[2][1] is not None
+    assert results[1][1] is None
+    assert isinstance(results[1][2], UploadProcessingError)
+
+
+def test_cache_hit_skips_the_model(tmp_path):
+    valid = (PROJECT_ROOT / "data" / "fs_resume.json").read_text(encoding="utf-8")
+    client = RepairingGenAI([valid], {})
+    pdf = make_pdfs(tmp_path, 1)[0]
+    pipeline = make_pipeline(client, cache=ParseCache(tmp_path / "cache"))
+
+    first = pipeline.parse_pdf_to_json(pdf)
+    second = asyncio.run(pipeline.parse_many([pdf]))[0][1]
+
+    assert first == second == json.loads(valid)
+    assert client.uploads == 1  # nothing uploaded the second time
+    assert client.deleted == ["files/cv0"]
+
+
+def test_invalid_parse_is_not_cached(tmp_path):
+    client = FakeGenAI()  # replies with only "meta", which the schema rejects
+    pdf = make_pdfs(tmp_path, 1)[0]
+    pipeline = make_pipeline(client, cache=ParseCache(tmp_path / "cache"))
+
+    pipeline.parse_pdf_to_json(pdf)
+    asyncio.run(pipeline.parse_many([pdf]))
+
+    assert client.deleted == ["files/cv0", "files/cv0"]  # parsed by the model both times
+
+
+def test_template_layout_is_parsed_without_the_model(tmp_path):
+    pytest.importorskip("pypdf")
+    from pypdf import PdfReader, PdfWriter
+
+    # Our layout, named by our scheme, without body links the fast path can't place
+    writer = PdfWriter()
+    for page in PdfReader(str(PROJECT_ROOT / "template_resume" / "template.pdf")).pages:
+        page.pop("/Annots", None)
+        writer.add_page(page)
+    pdf = tmp_path / "Aryan_BE_2602.pdf"
+    with open(pdf, "wb") as f:
+        writer.write(f)
+    client = FakeGenAI()
+
+    data = make_pipeline(client).parse_pdf_to_json(pdf)
+
+    assert data["basics"]["name"]["full"] == "Aryan Walia"
+    assert data["meta"] == {"code": "BE"}
+    assert client.polls == {} and client.deleted == []
+
+
+def test_template_pdf_without_a_meta_code_goes_to_the_model():
+    pytest.importorskip("pypdf")
+    client = FakeGenAI()
+
+    data = make_pipeline(client).parse_pdf_to_json(PROJECT_ROOT / "template_resume" / "template.pdf")
+
+    assert data == {"meta": {"code": "TEMPLATE"}}
+    assert client.deleted == ["files/template"]
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(per_minute=1200)  # one call per 50 ms
+
+    async def burst():
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+        return time.monotonic() - started
+
+    assert asyncio.run(burst()) >= 0.19
+
+
+def test_schema_travels_as_response_schema_not_prompt():
+    pipeline = make_pipeline(FakeGenAI())
+    config = pipeline._generate_config()
+    schema = config.response_schema
+
+    assert "minLength" not in pipeline._prompt() and len(pipeline._prompt()) < 1000
+    assert schema is response_schema_for(json.loads(SCHEMA_PATH.read_text(encoding="utf-8")))  # built once
+    assert schema.required == ["meta", "basics", "work", "skills", "projects", "education"]
+    assert schema.property_ordering[:2] == ["meta", "basics"]
+    assert schema.properties["work"].items.required[0] == "company"
+    profiles = schema.properties["basics"].properties["profiles"]
+    assert profiles.additional_properties["required"] == ["network", "url"]
+
+
+def test_inline_schema_keeps_the_old_prompt():
+    pipeline = make_pipeline(FakeGenAI(), inline_schema=True)
+
+    assert '"minLength": 1' in pipeline._prompt()
+    assert pipeline._generate_config().response_schema is None
+
+
+def test_failing_subtrees_are_repaired_in_place(tmp_path):
+    valid = json.loads((PROJECT_ROOT / "data" / "fs_resume.json").read_text(encoding="utf-8"))
+    broken = json.loads(json.dumps(valid))
+    del broken["skills"]
+    broken["work"][1]["company"] = ""
+    client = RepairingGenAI([json.dumps(broken)], {"skills": valid["skills"], "work[1]": valid["work"][1]})
+    pdf = make_pdfs(tmp_path, 1)[0]
+
+    data = make_pipeline(client, repair_rounds=2).parse_pdf_to_json(pdf)
+
+    assert data == valid
+    assert sorted(client.repaired) == ["skills", "work[1]"]
+    assert client.uploads == 1
+
+
+def test_invalid_json_is_re_asked_without_re_uploading(tmp_path):
+    valid = (PROJECT_ROOT / "data" / "fs_resume.json").read_text(encoding="utf-8")
+    client = RepairingGenAI(['{"meta": {"code": "FS"}, "basics": {', valid], {})
+    pdf = make_pdfs(tmp_path, 1)[0]
+
+    results = asyncio.run(make_pipeline(client, repair_rounds=1).parse_many([pdf]))
+
+    assert results[0][1] == json.loads(valid)
+    assert client.uploads == 1 and client.repaired == []
+
+
+def test_sections_are_validated_as_they_stream(tmp_path):
+    valid = json.loads((PROJECT_ROOT / "data" / "fs_resume.json").read_text(encoding="utf-8"))
+    broken = json.loads(json.dumps(valid))
+    broken["work"][0]["company"] = ""
+    client = RepairingGenAI([json.dumps(broken)], {"work[0]": valid["work"][0]})
+    pdf = make_pdfs(tmp_path, 1)[0]
+    seen = []
+
+    results = asyncio.run(make_pipeline(client, repair_rounds=1).parse_many(
+        [pdf], on_section=lambda path, name, value, errors: seen.append((path, name, errors))
+    ))
+
+    assert [name for _, name, _ in seen] == list(valid)
+    assert all(path == pdf for path, _, _ in seen)
+    assert dict((name, errors) for _, name, errors in seen)["work"] == ["work[0].company: '' should be non-empty"]
+    assert results[0][1] == valid  # repaired after the stream
+
+
+def test_malformed_stream_is_abandoned_early(tmp_path):
+    valid = (PROJECT_ROOT / "data" / "fs_resume.json").read_text(encoding="utf-8")
+    malformed = '{"meta": {"code": "FS"}] ' + " " * 2000 + "}"
+    client = RepairingGenAI([malformed, valid], {})
+    pdf = make_pdfs(tmp_path, 1)[0]
+
+    results = asyncio.run(make_pipeline(client, repair_rounds=1).parse_many([pdf]))
+
+    assert results[0][1] == json.loads(valid)
+    # Only the first chunk of the malformed reply was read before re-asking
+    assert len(client.streamed) == 1 + len(client._chunks(SimpleNamespace(text=valid)))
+
+
+def test_on_section_can_abort_without_retry(tmp_path):
+    client = RepairingGenAI([(PROJECT_ROOT / "data" / "fs_resume.json").read_text(encoding="utf-8")], {})
+    pdf = make_pdfs(tmp_path, 1)[0]
+
+    def reject(name, value, errors):
+        if name == "basics":
+            raise ParseAborted("not a resume we want")
+
+    with pytest.raises(ParseAborted):
+        make_pipeline(client).parse_pdf_to_json(pdf, on_section=reject)
+    assert client.uploads == 1 and client.deleted == ["files/cv0"]
+
+
+def test_missing_api_key_without_client(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    with pytest.raises(ValueError):
+        AIPipeline(SCHEMA_PATH)
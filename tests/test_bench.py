@@ -0,0 +1,75 @@
+"""
+tests/test_bench.py
+-------------------
+pytest suite for the benchmark tooling: synthetic payloads
+(scripts/synthetic.py) and the regression check (scripts/bench.py).
+
+Run: pytest tests/test_bench.py -v
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+from jsonschema import Draft7Validator, FormatChecker
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.bench import baselines, regressions
+from scripts.synthetic import synthetic_resume, synthetic_text
+from src.generator import ResumeGenerator
+from src.utils import LatexSanitizer
+
+SCHEMA = json.loads((PROJECT_ROOT / "schema" / "resume.schema.json").read_text(encoding="utf-8"))
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+@pytest.mark.parametrize("scale", [1, 4])
+@pytest.mark.parametrize("unicode, special", [(False, False), (True, True)])
+def test_synthetic_resumes_are_valid_and_render(scale, unicode, special):
+    data = synthetic_resume(random.Random(scale), scale=scale, unicode=unicode, special=special)
+
+    assert list(Draft7Validator(SCHEMA, format_checker=FormatChecker()).iter_errors(data)) == []
+    tex = ResumeGenerator().generate_tex_from_data(data)
+    assert len(data["work"]) == 2 * scale
+    if special:
+        assert "\\&" in tex and "\\%" in tex
+
+
+def test_synthetic_text_is_deterministic_and_escapable():
+    text = synthetic_text(random.Random(1), 4096, special=True)
+
+    assert text == synthetic_text(random.Random(1), 4096, special=True)
+    assert len(text) >= 4096
+    assert "\\href{" in LatexSanitizer.escape(text)
+
+
+def test_regressions_compare_against_recent_runs_on_the_same_host():
+    history = [
+        {"host": "ci", "results": {"render": 1.0, "compile_cold": 1.0}},
+        {"host": "ci", "results": {"render": 2.0, "compile_cold": 1.0}},
+        {"host": "ci", "results": {"render": 2.0}},
+        {"host": "laptop", "results": {"render": 0.1, "escape": 0.1}},
+    ]
+    baseline = baselines(history, "ci", window=2)
+
+    assert baseline == {"render": 2.0, "compile_cold": 1.0}
+    assert regressions({"render": 2.4, "compile_cold": 9.0, "escape": 9.0}, baseline, 0.25) == []
+    assert regressions({"render": 2.6}, baseline, 0.25) == [("render", 2.6, 2.0)]
+
+
+def test_regressed_results_stay_out_of_the_baseline():
+    history = [
+        {"host": "ci", "results": {"render": 1.0, "escape": 1.0}},
+        {"host": "ci", "results": {"render": 3.0, "escape": 1.0}, "regressed": ["render"]},
+        {"host": "ci", "results": {"render": 3.1, "escape": 1.0}, "regressed": ["render"]},
+    ]
+
+    assert baselines(history, "ci", window=5) == {"render": 1.0, "escape": 1.0}
+    assert regressions({"render": 3.2}, baselines(history, "ci", window=5), 0.25) == [("render", 3.2, 1.0)]
@@ -0,0 +1,64 @@
+"""
+tests/test_coordination.py
+---------------------------
+pytest suite for worker partitioning.
+
+Run: pytest tests/test_coordination.py -v
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.coordination import Partitioner, partition_of
+from src.scheduler import owner_of
+
+
+def test_partition_is_stable():
+    assert partition_of("resume_42", 4) == partition_of("resume_42", 4)
+
+
+def test_every_key_has_exactly_one_owner():
+    replicas = [Partitioner(index=i, count=3) for i in range(3)]
+    for n in range(200):
+        job = {"_id": n, "resume_id": f"r{n}"}
+        assert sum(p.owns(job) for p in replicas) == 1
+
+
+def test_partitions_are_roughly_balanced():
+    counts = [0, 0, 0, 0]
+    for n in range(4000):
+        counts[partition_of(f"r{n}", 4)] += 1
+    assert min(counts) > 800
+
+
+def test_single_worker_owns_everything():
+    assert Partitioner().owns({"_id": 1, "resume_id": "anything"})
+
+
+def test_stale_foreign_jobs_can_be_stolen():
+    now = datetime(2026, 1, 1, 12, 0)
+    p = Partitioner(index=0, count=2, steal_after_seconds=30)
+    foreign = next(
+        {"_id": n, "resume_id": f"r{n}"} for n in range(100) if not p.owns({"resume_id": f"r{n}"})
+    )
+    assert not p.may_claim({**foreign, "createdAt": now - timedelta(seconds=5)}, now)
+    assert p.may_claim({**foreign, "createdAt": now - timedelta(seconds=60)}, now)
+
+
+def test_invalid_partition_rejected():
+    with pytest.raises(ValueError):
+        Partitioner(index=2, count=2)
+
+
+def test_partition_key_is_the_fair_share_owner():
+    replicas = [Partitioner(index=i, count=4) for i in range(4)]
+    jobs = [{"_id": n, "user_id": "u1", "resume_id": f"r{n}"} for n in range(50)]
+    # Every job of one user lands on the same replica, whatever its resume
+    assert sum(any(p.owns(job) for job in jobs) for p in replicas) == 1
+    assert Partitioner.key_of({"_id": 7}) == owner_of({"_id": 7})
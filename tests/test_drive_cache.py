@@ -0,0 +1,156 @@
+"""
+tests/test_drive_cache.py
+--------------------------
+pytest suite for the per-user DriveUploaderCache.
+
+Run: pytest tests/test_drive_cache.py -v
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.drive import DriveUploaderCache
+
+
+# -----------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------
+
+class FakeCreds:
+    def __init__(self, expired=False, refresh_token="r1"):
+        self.expired = expired
+        self.refresh_token = refresh_token
+
+
+class FakeUploader:
+    def __init__(self, token_dict: dict):
+        self.token = token_dict
+        self.creds = FakeCreds()
+
+
+def make_cache(**kwargs):
+    built = []
+
+    def factory(token_dict):
+        uploader = FakeUploader(token_dict)
+        built.append(uploader)
+        return uploader
+
+    return DriveUploaderCache(factory=factory, **kwargs), built
+
+
+# -----------------------------------------------------------------------
+# 1. Reuse and LRU eviction
+# -----------------------------------------------------------------------
+
+def test_same_user_reuses_uploader():
+    cache, built = make_cache()
+    token = {"refresh_token": "r1"}
+    assert cache.get("u1", token) is cache.get("u1", token)
+    assert len(built) == 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache, built = make_cache(max_size=2)
+    a = cache.get("a", {"refresh_token": "a"})
+    cache.get("b", {"refresh_token": "b"})
+    cache.get("a", {"refresh_token": "a"})
+    cache.get("c", {"refresh_token": "c"})
+
+    assert len(cache) == 2
+    assert cache.get("a", {"refresh_token": "a"}) is a
+    cache.get("b", {"refresh_token": "b"})
+    assert len(built) == 4
+
+
+def test_idle_entries_are_dropped():
+    cache, built = make_cache(idle_seconds=0)
+    cache.get("u1", {"refresh_token": "r1"})
+    cache.get("u1", {"refresh_token": "r1"})
+    assert len(built) == 2
+
+
+# -----------------------------------------------------------------------
+# 2. Token changes and expiry
+# -----------------------------------------------------------------------
+
+def test_new_grant_rebuilds_uploader():
+    cache, built = make_cache()
+    first = cache.get("u1", {"refresh_token": "old"})
+    second = cache.get("u1", {"refresh_token": "new"})
+    assert first is not second
+    assert len(cache) == 1
+
+
+def test_expired_without_refresh_token_is_rebuilt():
+    cache, built = make_cache()
+    first = cache.get("u1", {"refresh_token": "r1"})
+    first.creds = FakeCreds(expired=True, refresh_token=None)
+    second = cache.get("u1", {"refresh_token": "r1"})
+    assert second is not first
+    assert len(built) == 2
+
+
+def test_invalidate_drops_entry():
+    cache, built = make_cache()
+    cache.get("u1", {"refresh_token": "r1"})
+    cache.invalidate("u1")
+    assert len(cache) == 0
+
+
+def test_dropped_entries_release_their_refresh_locks():
+    cache, built = make_cache(max_size=2)
+    for user in ("a", "b", "c", "d"):
+        cache.get(user, {"refresh_token": user})
+        cache.get(user, {"refresh_token": user})  # a hit takes the user's refresh lock
+    cache.invalidate("d")
+
+    assert set(cache._refresh_locks) == {"c"}
+
+
+def test_token_refreshed_on_build_is_persisted():
+    refreshed = []
+
+    def factory(token_dict):
+        # Like get_credentials(): an expired access token is refreshed on build
+        uploader = FakeUploader(token_dict)
+        uploader.creds.token = "fresh" if token_dict["token"] == "stale" else token_dict["token"]
+        return uploader
+
+    cache = DriveUploaderCache(factory=factory, on_refresh=lambda user, creds: refreshed.append((user, creds.token)))
+    cache.get("u1", {"refresh_token": "r1", "token": "stale"})
+    cache.get("u2", {"refresh_token": "r2", "token": "valid"})
+
+    assert refreshed == [("u1", "fresh")]
+
+
+def test_token_refresh_does_not_block_other_users():
+    cache, built = make_cache()
+    slow = cache.get("slow", {"refresh_token": "r1"})
+    refreshing, release = threading.Event(), threading.Event()
+
+    def refresh(request):
+        refreshing.set()
+        release.wait(5)
+        slow.creds.expired = False
+
+    slow.creds = FakeCreds(expired=True)
+    slow.creds.refresh = refresh
+    thread = threading.Thread(target=cache.get, args=("slow", {"refresh_token": "r1"}))
+    thread.start()
+    try:
+        assert refreshing.wait(5)
+        # Another user's lookup completes while the refresh is still in flight
+        other = threading.Thread(target=cache.get, args=("other", {"refresh_token": "r2"}))
+        other.start()
+        other.join(1)
+        assert not other.is_alive()
+        assert len(built) == 2
+    finally:
+        release.set()
+        thread.join()
+    assert cache.hits == 1 and len(built) == 2
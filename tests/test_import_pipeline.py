@@ -0,0 +1,137 @@
+"""
+tests/test_import_pipeline.py
+-----------------------------
+pytest suite for the pipelined PDF -> JSON -> PDF import
+(src/import_pipeline.py), with a fake parser and a fake pdflatex.
+
+Run: pytest tests/test_import_pipeline.py -v
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from jsonschema import Draft7Validator, FormatChecker
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.import_pipeline import ImportPipeline, InvalidResumeError, output_name
+from src.storage import LocalStorage
+
+SCHEMA = json.loads((PROJECT_ROOT / "schema" / "resume.schema.json").read_text(encoding="utf-8"))
+RESUME = json.loads((PROJECT_ROOT / "data" / "fs_resume.json").read_text(encoding="utf-8"))
+
+
+# -----------------------------------------------------------------------
+# Fakes
+# -----------------------------------------------------------------------
+
+class FakeAI:
+    """AIPipeline stand-in: `parse_latency` per PDF; PDFs named bad*.pdf come back invalid."""
+
+    def __init__(self, parse_latency: float = 0.05, max_concurrency: int = 4):
+        self.parse_latency = parse_latency
+        self.max_concurrency = max_concurrency
+        self.validator = Draft7Validator(SCHEMA, format_checker=FormatChecker())
+        self.parse_finished: list[float] = []
+
+    def _result(self, pdf_path: Path) -> dict:
+        data = json.loads(json.dumps(RESUME))
+        if pdf_path.stem.startswith("bad"):
+            del data["work"]
+        return data
+
+    def parse_pdf_to_json(self, pdf_path: Path) -> dict:
+        return self._result(pdf_path)
+
+    async def parse_pdf_async(self, pdf_path: Path) -> dict:
+        await asyncio.sleep(self.parse_latency)
+        self.parse_finished.append(time.monotonic())
+        return self._result(pdf_path)
+
+
+class FakeCompiler:
+    """compile_to_storage without pdflatex: checks the .tex and stores a stub PDF."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.started: list[float] = []
+        self.tex_dirs: list[Path] = []
+        self._lock = threading.Lock()
+
+    def compile_to_storage(self, tex_path: Path, storage, metadata=None):
+        with self._lock:
+            self.started.append(time.monotonic())
+            self.tex_dirs.append(tex_path.parent)
+        assert "\\begin{document}" in tex_path.read_text(encoding="utf-8")
+        time.sleep(self.latency)
+        pdf_path = tex_path.with_suffix(".pdf")
+        pdf_path.write_bytes(b"%PDF-1.5 stub")
+        return storage.save(pdf_path, metadata=metadata), pdf_path
+
+
+@pytest.fixture
+def importer(tmp_path, monkeypatch):
+    from src.config import Config
+
+    monkeypatch.setattr(Config.get_instance(), "BUILD_DIR", tmp_path / "build")
+    return ImportPipeline(FakeAI(), LocalStorage(tmp_path / "out"), compiler=FakeCompiler(), compile_concurrency=2)
+
+
+def make_pdfs(tmp_path: Path, names: list[str]) -> list[Path]:
+    paths = []
+    for name in names:
+        path = tmp_path / f"{name}.pdf"
+        path.write_bytes(b"%PDF-1.5")
+        paths.append(path)
+    return paths
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+def test_run_builds_valid_inputs_and_reports_invalid_ones(importer, tmp_path):
+    pdfs = make_pdfs(tmp_path, ["jane", "bad_scan", "john doe"])
+    seen = []
+
+    results = asyncio.run(importer.run(pdfs, on_result=seen.append))
+
+    assert [r.source for r in results] == pdfs
+    assert [r.ok for r in results] == [True, False, True]
+    assert results[0].ref == "jane_FS.pdf" and results[2].ref == "john_doe_FS.pdf"
+    assert importer.storage.exists("jane_FS.pdf")
+    assert results[1].errors == ["(root): 'work' is a required property"]
+    assert len(seen) == 3
+    # Scratch build directories are removed; nothing else is written
+    assert not any(d.exists() for d in importer.compiler.tex_dirs)
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["jane_FS.pdf", "john_doe_FS.pdf"]
+
+
+def test_builds_overlap_with_parsing(importer, tmp_path):
+    importer.ai = FakeAI(parse_latency=0.05, max_concurrency=1)
+    pdfs = make_pdfs(tmp_path, [f"cv{i}" for i in range(4)])
+
+    asyncio.run(importer.run(pdfs))
+
+    # The first build starts while later PDFs are still being parsed
+    assert min(importer.compiler.started) < max(importer.ai.parse_finished)
+
+
+def test_parse_raises_on_invalid_result(importer, tmp_path):
+    good, bad = make_pdfs(tmp_path, ["good", "bad"])
+
+    assert importer.parse(good)["meta"]["code"] == "FS"
+    with pytest.raises(InvalidResumeError) as excinfo:
+        importer.parse(bad)
+    assert excinfo.value.errors == ["(root): 'work' is a required property"]
+
+
+def test_output_name_is_storage_safe():
+    assert output_name(Path("../My CV (final).pdf"), {"meta": {"code": "be"}}) == "My_CV_final_BE.pdf"
+    assert output_name(Path("x.pdf"), {}) == "x_NEW.pdf"
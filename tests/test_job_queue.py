@@ -0,0 +1,344 @@
+"""
+tests/test_job_queue.py
+------------------------
+pytest suite for batched claiming, leases and admission control in
+src/job_queue.py, against an in-memory mongomock collection.
+
+Run: pytest tests/test_job_queue.py -v
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import mongomock
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.coordination import Partitioner
+from src.job_queue import JobQueue
+from src.scheduler import owner_of
+
+
+# -----------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------
+
+T0 = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().db.generations
+
+
+def add_jobs(collection, count: int, owner: str = "u1", start: int = 0, **fields) -> list:
+    docs = [
+        {
+            "_id": f"{owner}-{start + n}",
+            "status": "PENDING",
+            "user_id": owner,
+            "createdAt": T0 + timedelta(minutes=start + n),
+            **fields,
+        }
+        for n in range(count)
+    ]
+    collection.insert_many(docs)
+    return [doc["_id"] for doc in docs]
+
+
+# -----------------------------------------------------------------------
+# 1. Batched claiming
+# -----------------------------------------------------------------------
+
+def test_claim_ids_claims_pending_jobs_in_given_order(collection):
+    ids = add_jobs(collection, 3)
+    queue = JobQueue(collection, worker_id="w1")
+
+    claimed = queue.claim_ids(reversed(ids))
+
+    assert [job["_id"] for job in claimed] == list(reversed(ids))
+    for doc in collection.find():
+        assert doc["status"] == "PROCESSING" and doc["worker_id"] == "w1"
+        assert doc["claim_token"] and doc["leased_until"] > doc["claimedAt"]
+
+
+def test_claim_ids_skips_jobs_that_are_not_pending(collection):
+    ids = add_jobs(collection, 2)
+    collection.update_one({"_id": ids[0]}, {"$set": {"status": "COMPLETED"}})
+
+    claimed = JobQueue(collection, worker_id="w1").claim_ids(ids)
+
+    assert [job["_id"] for job in claimed] == [ids[1]]
+    assert JobQueue(collection, worker_id="w2").claim_ids(ids) == []
+
+
+def test_claim_pending_respects_the_batch_size(collection):
+    add_jobs(collection, 5)
+    queue = JobQueue(collection, batch_size=3, worker_id="w1")
+
+    assert len(queue.claim_pending()) == 3
+    assert len(queue.claim_pending()) == 2
+    assert queue.claim_pending() == []
+
+
+def test_concurrent_claimers_never_share_a_job(collection):
+    ids = add_jobs(collection, 200)
+    queues = [JobQueue(collection, worker_id=f"w{n}") for n in range(4)]
+    start = threading.Barrier(len(queues))
+    claimed = {queue.worker_id: [] for queue in queues}
+
+    def claim(queue):
+        start.wait()
+        for n in range(0, len(ids), 10):
+            claimed[queue.worker_id].extend(job["_id"] for job in queue.claim_ids(ids[n:n + 20]))
+
+    threads = [threading.Thread(target=claim, args=(queue,)) for queue in queues]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    everything = [job_id for jobs in claimed.values() for job_id in jobs]
+    assert sorted(everything) == sorted(ids)
+    for worker_id, jobs in claimed.items():
+        assert collection.count_documents({"_id": {"$in": jobs}, "worker_id": worker_id}) == len(jobs)
+
+
+# -----------------------------------------------------------------------
+# 2. Releasing claims
+# -----------------------------------------------------------------------
+
+def test_completion_clears_the_claim(collection):
+    ids = add_jobs(collection, 2)
+    queue = JobQueue(collection, worker_id="w1")
+    done, failed = queue.claim_ids(ids)
+
+    assert queue.complete(done, {"status": "COMPLETED"})
+    assert queue.complete(failed, {"status": "FAILED", "error_log": "boom"})
+
+    for doc in collection.find():
+        assert "claim_token" not in doc and "leased_until" not in doc
+
+
+def test_buffered_completion_is_stamped_when_written(collection):
+    ids = add_jobs(collection, 1)
+    queue = JobQueue(collection, worker_id="w1")
+    [job] = queue.claim_ids(ids)
+    op = queue.completion_op(job, {"status": "COMPLETED"})
+
+    # The StatusWriter applies the op some time after it was built
+    built_at = datetime.utcnow()
+    time.sleep(0.01)
+    collection.update_one(op._filter, op._doc)
+
+    assert collection.find_one({"_id": ids[0]})["updatedAt"] > built_at
+
+
+def test_reaped_jobs_lose_their_claim(collection):
+    ids = add_jobs(collection, 2)
+    collection.update_one({"_id": ids[1]}, {"$set": {"attempts": 2}})
+    queue = JobQueue(collection, lease_seconds=-1, max_attempts=3, worker_id="w1")
+    queue.claim_ids(ids)
+
+    assert queue.reap_expired() == (1, 1)
+
+    requeued, failed = collection.find_one({"_id": ids[0]}), collection.find_one({"_id": ids[1]})
+    assert requeued["status"] == "PENDING" and failed["status"] == "FAILED"
+    for doc in (requeued, failed):
+        assert not {"claim_token", "worker_id", "leased_until"} & doc.keys()
+
+
+# -----------------------------------------------------------------------
+# 3. Leases
+# -----------------------------------------------------------------------
+
+def test_heartbeat_extends_only_leases_this_worker_holds(collection):
+    ids = add_jobs(collection, 3)
+    mine, theirs = JobQueue(collection, worker_id="w1"), JobQueue(collection, worker_id="w2")
+    mine.claim_ids(ids[:2])
+    theirs.claim_ids(ids[2:])
+    stale = datetime.utcnow() - timedelta(seconds=5)
+    collection.update_many({}, {"$set": {"leased_until": stale}})
+
+    assert mine.heartbeat(ids) == 2
+    assert mine.heartbeat([]) == 0
+
+    leases = {doc["_id"]: doc["leased_until"] for doc in collection.find()}
+    assert leases[ids[0]] > datetime.utcnow() and leases[ids[1]] > datetime.utcnow()
+    assert leases[ids[2]] < datetime.utcnow()
+
+
+def test_heartbeat_skips_finished_jobs(collection):
+    ids = add_jobs(collection, 1)
+    queue = JobQueue(collection, worker_id="w1")
+    [job] = queue.claim_ids(ids)
+    queue.complete(job, {"status": "COMPLETED"})
+
+    assert queue.heartbeat(ids) == 0
+    assert "leased_until" not in collection.find_one({"_id": ids[0]})
+
+
+def test_reap_leaves_live_leases_alone(collection):
+    ids = add_jobs(collection, 1)
+    queue = JobQueue(collection, lease_seconds=60, worker_id="w1")
+    queue.claim_ids(ids)
+
+    assert queue.reap_expired() == (0, 0)
+    assert collection.find_one({"_id": ids[0]})["status"] == "PROCESSING"
+
+
+def test_complete_after_losing_the_lease_is_rejected(collection):
+    ids = add_jobs(collection, 1)
+    slow = JobQueue(collection, lease_seconds=-1, worker_id="w1")
+    [stale] = slow.claim_ids(ids)
+    slow.reap_expired()
+
+    # Re-queued: the old claim must not overwrite the PENDING job
+    assert not slow.complete(stale, {"status": "COMPLETED"})
+    assert collection.find_one({"_id": ids[0]})["status"] == "PENDING"
+
+    # Re-claimed by the same worker id: only the current claim may finish it
+    [current] = slow.claim_ids(ids)
+    assert not slow.complete(stale, {"status": "FAILED"})
+    assert slow.complete(current, {"status": "COMPLETED"})
+
+    # Already finished: a late duplicate write changes nothing
+    assert not slow.complete(current, {"status": "FAILED"})
+    assert collection.find_one({"_id": ids[0]})["status"] == "COMPLETED"
+
+    # Only the claim whose completion was applied is confirmed by its filter
+    assert collection.count_documents(JobQueue.completed_filter(current)) == 1
+    assert collection.count_documents(JobQueue.completed_filter(stale)) == 0
+
+
+# -----------------------------------------------------------------------
+# 4. Candidates
+# -----------------------------------------------------------------------
+
+def test_candidates_are_capped_per_owner(collection):
+    add_jobs(collection, 50, owner="bulk")
+    add_jobs(collection, 1, owner="solo", start=100)
+    queue = JobQueue(collection, worker_id="w1")
+
+    candidates = queue._candidates(limit=3)
+
+    assert [job["_id"] for job in candidates] == ["bulk-0", "bulk-1", "bulk-2", "solo-100"]
+    assert set(candidates[0]) <= {"_id", "priority", "createdAt", "user_id", "resume_id"}
+
+
+def test_candidates_group_by_priority_tier(collection):
+    add_jobs(collection, 2, owner="u1")
+    add_jobs(collection, 2, owner="u1", start=10, priority=5)
+    collection.update_one({"_id": "u1-1"}, {"$set": {"priority": 0}})
+
+    candidates = JobQueue(collection, worker_id="w1")._candidates(limit=5)
+
+    assert [job["_id"] for job in candidates] == ["u1-10", "u1-11", "u1-0", "u1-1"]
+
+
+def test_ownerless_jobs_are_their_own_owners(collection):
+    collection.insert_many([
+        {"_id": f"anon-{n}", "status": "PENDING", "createdAt": T0 + timedelta(minutes=n)}
+        for n in range(3)
+    ] + [
+        {"_id": "r-0", "status": "PENDING", "resume_id": "r", "createdAt": T0},
+        {"_id": "r-1", "status": "PENDING", "resume_id": "r", "user_id": None, "createdAt": T0},
+    ])
+    queue = JobQueue(collection, worker_id="w1")
+
+    # One group per owner-less job (as scheduler.owner_of sees them), not one null group
+    candidates = queue._candidates(limit=4)
+    assert sorted(job["_id"] for job in candidates) == ["anon-0", "anon-1", "anon-2", "r-0", "r-1"]
+    assert len({owner_of(job) for job in candidates}) == 4
+    assert queue.throttle_overflow(max_pending_per_owner=1) == 1
+    assert collection.find_one({"_id": "r-1"})["status"] == "THROTTLED"
+
+
+# -----------------------------------------------------------------------
+# 5. Partitioning
+# -----------------------------------------------------------------------
+
+def test_partition_is_applied_before_the_group_limit(collection):
+    replica = Partitioner(index=0, count=2, steal_after_seconds=3600)
+    owners = [f"user{n}" for n in range(40)]
+    mine = [owner for owner in owners if replica.owns_key(owner)]
+    theirs = [owner for owner in owners if not replica.owns_key(owner)]
+    # Plenty of older foreign owners ahead of this replica's only owner
+    now = datetime.utcnow()
+    for n, owner in enumerate(theirs + mine[:1]):
+        collection.insert_one({"_id": f"{owner}-job", "status": "PENDING", "user_id": owner,
+                               "createdAt": now - timedelta(minutes=30) + timedelta(seconds=n)})
+    queue = JobQueue(collection, worker_id="w1", partitioner=replica)
+
+    claimed = queue.claim_pending(limit=2)
+
+    assert [job["user_id"] for job in claimed] == mine[:1]
+
+
+def test_stale_foreign_owners_are_stolen(collection):
+    replica = Partitioner(index=0, count=2, steal_after_seconds=60)
+    foreign = next(f"user{n}" for n in range(100) if not replica.owns_key(f"user{n}"))
+    now = datetime.utcnow()
+    collection.insert_many([
+        {"_id": "old", "status": "PENDING", "user_id": foreign, "createdAt": now - timedelta(minutes=5)},
+        {"_id": "new", "status": "PENDING", "user_id": foreign, "createdAt": now},
+    ])
+    queue = JobQueue(collection, worker_id="w1", partitioner=replica)
+
+    assert [job["_id"] for job in queue.claim_pending(limit=5)] == ["old"]
+
+
+# -----------------------------------------------------------------------
+# 6. Admission control
+# -----------------------------------------------------------------------
+
+def test_depth_counts_every_queued_status(collection):
+    ids = add_jobs(collection, 4)
+    collection.update_one({"_id": ids[0]}, {"$set": {"status": "THROTTLED"}})
+    collection.update_one({"_id": ids[1]}, {"$set": {"status": "COMPLETED"}})
+    JobQueue(collection, worker_id="w1").claim_ids(ids[2:3])
+
+    assert JobQueue(collection).depth() == {"PENDING": 1, "THROTTLED": 1, "PROCESSING": 1}
+
+
+def test_throttle_parks_each_owners_newest_overflow(collection):
+    bulk = add_jobs(collection, 5, owner="bulk")
+    add_jobs(collection, 2, owner="small", start=100)
+    urgent = add_jobs(collection, 1, owner="bulk", start=200, priority=5)
+    queue = JobQueue(collection, worker_id="w1")
+
+    assert queue.throttle_overflow(max_pending_per_owner=3) == 3
+    assert queue.throttle_overflow(max_pending_per_owner=0) == 0
+
+    throttled = {doc["_id"] for doc in collection.find({"status": "THROTTLED"})}
+    # Highest priority first, then oldest: the urgent job stays PENDING
+    assert throttled == set(bulk[2:])
+    assert collection.find_one({"_id": urgent[0]})["status"] == "PENDING"
+    assert all("throttledAt" in doc for doc in collection.find({"status": "THROTTLED"}))
+
+
+def test_release_refills_owners_up_to_the_limit(collection):
+    ids = add_jobs(collection, 5, owner="bulk")
+    queue = JobQueue(collection, worker_id="w1")
+    queue.throttle_overflow(max_pending_per_owner=2)
+    queue.claim_ids(ids[:1])
+
+    # One PENDING left, so one slot frees up; the oldest parked job goes first
+    assert queue.release_throttled(max_pending_per_owner=2) == 1
+    assert collection.find_one({"_id": ids[2]})["status"] == "PENDING"
+    assert "throttledAt" not in collection.find_one({"_id": ids[2]})
+    assert queue.release_throttled(max_pending_per_owner=2) == 0
+
+
+def test_release_everything_when_the_limit_is_off(collection):
+    add_jobs(collection, 4)
+    queue = JobQueue(collection, worker_id="w1")
+    queue.throttle_overflow(max_pending_per_owner=1)
+
+    assert queue.release_throttled(max_pending_per_owner=0) == 3
+    assert queue.depth()["THROTTLED"] == 0
@@ -0,0 +1,66 @@
+"""
+tests/test_json_stream.py
+-------------------------
+pytest suite for the incremental JSON object parser (src/json_stream.py).
+
+Run: pytest tests/test_json_stream.py -v
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.json_stream import SectionStream, StreamDecodeError
+
+
+def feed_in_chunks(text: str, size: int) -> tuple[SectionStream, list[tuple[int, str]]]:
+    """Feed `text` `size` characters at a time; returns the parser and (chunk index, name) per section."""
+    parser = SectionStream()
+    completed = []
+    for index, start in enumerate(range(0, len(text), size)):
+        completed.extend((index, name) for name, _ in parser.feed(text[start:start + size]))
+    return parser, completed
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+@pytest.mark.parametrize("size", [1, 7, 64, 100000])
+def test_sections_complete_in_order_for_any_chunking(size):
+    data = json.loads((PROJECT_ROOT / "data" / "fs_resume.json").read_text(encoding="utf-8"))
+    data["meta"]["note"] = 'braces } ] , and "quotes" \\ inside strings'
+    text = json.dumps(data, indent=2, ensure_ascii=False)
+
+    parser, completed = feed_in_chunks(text, size)
+
+    assert parser.close() == data
+    assert [name for _, name in completed] == list(data)
+
+
+def test_sections_are_released_before_the_stream_ends():
+    text = json.dumps({"meta": {"code": "FS"}, "work": ["x" * 500]})
+
+    _, completed = feed_in_chunks(text, 32)
+
+    assert completed[0] == (0, "meta")
+    assert completed[1][0] > 10
+
+
+@pytest.mark.parametrize("text", ['["not", "an", "object"]', '{"a": 1,}', '{"a": [1}', '{"a": tru}', '{"a": 1} x'])
+def test_malformed_output_fails_on_the_spot(text):
+    with pytest.raises(StreamDecodeError):
+        SectionStream().feed(text)
+
+
+def test_truncated_stream_fails_on_close():
+    parser = SectionStream()
+    assert parser.feed('{"meta": {"code": "FS"}, "basics": {"name"') == [("meta", {"code": "FS"})]
+
+    with pytest.raises(json.JSONDecodeError):
+        parser.close()
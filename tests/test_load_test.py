@@ -0,0 +1,69 @@
+"""
+tests/test_load_test.py
+-----------------------
+pytest suite for the synthetic load generator's scheduling and reporting
+(scripts/load_test.py), without MongoDB.
+
+Run: pytest tests/test_load_test.py -v
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.load_test import make_job, parse_mix, percentile, report, schedule, throughput_curve
+
+T0 = datetime(2026, 1, 1)
+
+
+def finished_job(created: float, claimed: float, finished: float, status: str = "COMPLETED") -> dict:
+    return {
+        "status": status,
+        "createdAt": T0 + timedelta(seconds=created),
+        "claimedAt": T0 + timedelta(seconds=claimed),
+        "updatedAt": T0 + timedelta(seconds=finished),
+        "timings": {"total_ms": (finished - claimed) * 1000},
+        "load_profile": {"size": "small"},
+    }
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+def test_schedule_combines_steady_rate_and_bursts():
+    events = schedule(rate=2, duration=3, burst=10, burst_every=2)
+
+    assert events == [(0.0, 11), (0.5, 1), (1.0, 1), (1.5, 1), (2.0, 11), (2.5, 1)]
+    assert schedule(rate=0, duration=10, burst=5, burst_every=10) == [(0.0, 5)]
+
+
+def test_parse_mix_and_make_job():
+    assert parse_mix("small:3,large") == {"small": 3.0, "large": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("huge:1")
+
+    job = make_job(random.Random(1), "abc", 7, {"large": 1}, owners=5, unicode_ratio=1, special_ratio=0)
+    assert job["resume_id"] == "load_abc_0002"
+    assert job["load_profile"] == {"size": "large", "unicode": True, "special": False}
+    assert len(job["resume_data"]["work"]) == 12
+
+
+def test_percentiles_and_throughput_curve(capsys):
+    assert percentile([5, 1, 4, 2, 3], 50) == 3
+    assert percentile([5, 1, 4, 2, 3], 99) == 5
+
+    jobs = [finished_job(0, 1, 2), finished_job(1, 2, 6), finished_job(6, 6.5, 12, "FAILED"),
+            {"status": "PENDING", "createdAt": T0 + timedelta(seconds=7)}]
+    assert throughput_curve(jobs, bucket=5) == [(0, 2, 1), (5, 2, 1), (10, 0, 1)]
+
+    report(jobs, bucket=5)
+    output = capsys.readouterr().out
+    assert "Statuses: {'COMPLETED': 2, 'FAILED': 1, 'PENDING': 1}" in output
+    assert "n=3" in output
@@ -0,0 +1,100 @@
+"""
+tests/test_metrics.py
+---------------------
+pytest suite for the worker's Prometheus metrics (src/metrics.py).
+
+Run: pytest tests/test_metrics.py -v
+"""
+
+import subprocess
+import sys
+import urllib.request
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.metrics import Histogram, WorkerMetrics, compile_failure_cause
+from src.tracing import span, trace
+
+
+def latex_failure(log: str) -> subprocess.CalledProcessError:
+    return subprocess.CalledProcessError(1, ["pdflatex"], output=log, stderr="")
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("stage_seconds", "Stage time.", buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, stage="render")
+
+    assert histogram.render().splitlines()[2:] == [
+        'stage_seconds_bucket{stage="render",le="0.1"} 2',
+        'stage_seconds_bucket{stage="render",le="1"} 3',
+        'stage_seconds_bucket{stage="render",le="+Inf"} 4',
+        'stage_seconds_sum{stage="render"} 3.65',
+        'stage_seconds_count{stage="render"} 4',
+    ]
+
+
+def test_job_traces_feed_stage_and_drive_histograms():
+    metrics = WorkerMetrics()
+    with trace() as job_trace:
+        for name in ("render", "pdflatex_pass1", "drive_folders", "drive_upload", "drive_wait", "drive_lookup", "drive_lookup"):
+            with span(name):
+                pass
+
+    metrics.observe_job("completed", job_trace)
+    metrics.observe_job("failed", job_trace)
+
+    assert metrics.jobs.value(status="completed") == 1
+    assert metrics.stage_duration.count(stage="pdflatex_pass1") == 2
+    assert metrics.drive_calls.count(call="lookup") == 4
+    assert metrics.stage_duration.count(stage="drive_upload") == 0
+    # Polling and folder resolution are not Drive requests
+    assert metrics.drive_calls.count(call="wait") == metrics.drive_calls.count(call="folders") == 0
+    assert metrics.stage_duration.count(stage="drive_wait") == 2
+    assert metrics.job_duration.count() == 2
+
+
+def test_compile_failures_are_classified():
+    assert compile_failure_cause(latex_failure(
+        "This is pdfTeX\n! Undefined control sequence.\nl.12 \\foo\n! Emergency stop."
+    )) == "undefined_control_sequence"
+    assert compile_failure_cause(latex_failure("! LaTeX Error: File `fontawesome5.sty' not found.")) == "missing_package"
+    assert compile_failure_cause(latex_failure("! Missing $ inserted.")) == "missing_dollar"
+    assert compile_failure_cause(latex_failure("no error line")) == "latex_error"
+    assert compile_failure_cause(subprocess.TimeoutExpired(["pdflatex"], 60)) == "timeout"
+    assert compile_failure_cause(FileNotFoundError(2, "No such file", "pdflatex")) == "pdflatex_missing"
+    assert compile_failure_cause(RuntimeError("storage down")) == "other"
+
+
+def test_scrape_serves_exposition_format():
+    metrics = WorkerMetrics()
+    in_flight = {"job1", "job2"}
+    metrics.track_in_flight(lambda: len(in_flight))
+    metrics.track_cache("snapshot", SimpleNamespace(hits=7, misses=3))
+    metrics.queue_depth.set(5, status="PENDING")
+    metrics.compile_failed(latex_failure("! Missing $ inserted."))
+
+    server = metrics.serve(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            content_type = response.headers["Content-Type"]
+            body = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert content_type.startswith("text/plain; version=0.0.4")
+    lines = body.splitlines()
+    assert "# TYPE resume_worker_stage_duration_seconds histogram" in lines
+    assert "resume_worker_jobs_in_flight 2" in lines
+    assert 'resume_worker_queue_depth{status="PENDING"} 5' in lines
+    assert 'resume_worker_cache_requests_total{cache="snapshot",result="hit"} 7' in lines
+    assert 'resume_worker_compile_failures_total{cause="missing_dollar"} 1' in lines
@@ -0,0 +1,72 @@
+"""
+tests/test_parse_cache.py
+-------------------------
+pytest suite for the on-disk parse-result cache.
+
+Run: pytest tests/test_parse_cache.py -v
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.parse_cache import ParseCache, parse_key
+
+
+# -----------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------
+
+def make_pdf(tmp_path: Path, name: str, content: bytes = b"%PDF-1.5 resume") -> Path:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return path
+
+
+# -----------------------------------------------------------------------
+# Keys
+# -----------------------------------------------------------------------
+
+def test_key_depends_on_bytes_schema_and_model(tmp_path):
+    schema = {"type": "object", "required": ["meta"]}
+    pdf = make_pdf(tmp_path, "a.pdf")
+    key = parse_key(pdf, schema, "gemini-2.5-flash")
+
+    # Same bytes under another name -> same key
+    assert parse_key(make_pdf(tmp_path, "copy.pdf"), schema, "gemini-2.5-flash") == key
+    assert parse_key(make_pdf(tmp_path, "b.pdf", b"%PDF other"), schema, "gemini-2.5-flash") != key
+    assert parse_key(pdf, {**schema, "required": ["meta", "basics"]}, "gemini-2.5-flash") != key
+    assert parse_key(pdf, schema, "gemini-2.5-pro") != key
+
+
+# -----------------------------------------------------------------------
+# Store
+# -----------------------------------------------------------------------
+
+def test_round_trip_and_miss(tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+
+    assert cache.get("missing") is None
+    cache.put("k1", {"meta": {"code": "BE"}})
+    assert cache.get("k1") == {"meta": {"code": "BE"}}
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ParseCache(tmp_path / "cache", max_entries=2)
+    cache.put("old", {"n": 1})
+    cache.put("used", {"n": 2})
+    past = time.time() - 100
+    os.utime(cache.directory / "old.json", (past, past))
+    os.utime(cache.directory / "used.json", (past - 10, past - 10))
+
+    cache.get("used")  # refreshes its mtime
+    cache.put("new", {"n": 3})
+
+    assert cache.get("old") is None
+    assert cache.get("used") == {"n": 2}
+    assert cache.get("new") == {"n": 3}
@@ -0,0 +1,33 @@
+"""
+tests/test_parse_pdf.py
+------------------------
+pytest suite for bulk output naming in scripts/parse_pdf.py (also used by
+scripts/import_pdf.py --save-json).
+
+Run: pytest tests/test_parse_pdf.py -v
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.parse_pdf import collect_pdfs, json_paths
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+def test_same_named_pdfs_keep_their_folders(tmp_path, capsys):
+    for name in ("a/cv.pdf", "b/nested/cv.pdf", "b/jane.pdf"):
+        (tmp_path / "legacy" / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / "legacy" / name).write_bytes(b"%PDF-1.5")
+    pdfs = collect_pdfs([str(tmp_path / "legacy")])
+    out = tmp_path / "parsed"
+
+    outputs = json_paths(pdfs, out)
+
+    assert sorted(str(p.relative_to(out)) for p in outputs.values()) == ["a/cv.json", "b/nested/cv.json", "jane.json"]
+    assert "2 PDFs are named cv.pdf" in capsys.readouterr().out
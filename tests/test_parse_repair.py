@@ -0,0 +1,64 @@
+"""
+tests/test_parse_repair.py
+--------------------------
+pytest suite for narrowing schema errors down to repairable subtrees
+(src/parse_repair.py).
+
+Run: pytest tests/test_parse_repair.py -v
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from jsonschema import Draft7Validator, FormatChecker
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.parse_repair import MISSING, apply_repair, repair_prompt, repair_requests
+
+SCHEMA = json.loads((PROJECT_ROOT / "schema" / "resume.schema.json").read_text(encoding="utf-8"))
+VALIDATOR = Draft7Validator(SCHEMA, format_checker=FormatChecker())
+
+
+def load_resume() -> dict:
+    return json.loads((PROJECT_ROOT / "data" / "fs_resume.json").read_text(encoding="utf-8"))
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+def test_valid_resume_needs_no_repair():
+    assert repair_requests(VALIDATOR, SCHEMA, load_resume()) == []
+
+
+def test_errors_are_grouped_by_smallest_subtree():
+    data = load_resume()
+    del data["education"]
+    data["work"][0]["highlights"][0] = ""
+    data["work"][0]["position"] = ""
+    data["basics"]["contact"]["email"] = "not-an-email"
+
+    requests = sorted(repair_requests(VALIDATOR, SCHEMA, data), key=lambda r: r.label)
+
+    assert [r.label for r in requests] == ["basics", "education", "work[0]"]
+    work = requests[2]
+    assert work.schema is SCHEMA["properties"]["work"]["items"]
+    assert len(work.errors) == 2 and work.errors[0].startswith("work[0].")
+    assert requests[1].value is MISSING
+    assert "(missing)" in repair_prompt(requests[1])
+
+
+def test_apply_repair_replaces_only_the_subtree():
+    data = load_resume()
+    repaired = apply_repair(data, ("work", 0, "position"), "Staff Engineer")
+
+    assert repaired["work"][0]["position"] == "Staff Engineer"
+    assert data["work"][0]["position"] != "Staff Engineer"
+    assert repaired["work"][1] == data["work"][1]
+
+
+def test_wrong_root_type_needs_a_full_reparse():
+    assert repair_requests(VALIDATOR, SCHEMA, ["not", "an", "object"]) is None
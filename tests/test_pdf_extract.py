@@ -0,0 +1,178 @@
+"""
+tests/test_pdf_extract.py
+-------------------------
+pytest suite for the local template-layout PDF parser (src/pdf_extract.py).
+
+Run: pytest tests/test_pdf_extract.py -v
+"""
+
+import json
+import re
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+from jsonschema import Draft7Validator
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.pdf_extract import extract_template_resume, parse_layout, read_layout
+
+SCHEMA = json.loads((PROJECT_ROOT / "schema" / "resume.schema.json").read_text(encoding="utf-8"))
+TEMPLATE_PDF = PROJECT_ROOT / "template_resume" / "template.pdf"
+# Built from data/fs_resume.json
+GENERATED_PDF = PROJECT_ROOT / "output" / "generated_resume.pdf"
+SOURCE_JSON = PROJECT_ROOT / "data" / "fs_resume.json"
+MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+
+
+# -----------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------
+
+# Layout-mode text as pypdf extracts it from a base_resume.tex build
+LATEX_LINES = """
+                              Jane Doe
+      +1 555-0100 | jane@example.com | GitHub | Portfolio
+              Backend engineer who likes boring, reliable systems.
+WORK EXPERIENCE
+  Acme Corp                                                   Berlin
+  Senior Engineer                                   Jan 2023 – Present
+     • Cut p99 latency by 40% by moving hot paths to a
+       connection-pooled cache.
+     • Led the queue migration.
+  Initech
+  Engineer                                          Mar 2020 – Dec 2022
+     • Shipped billing v2.
+SKILLS
+  Languages: Python, Go
+  Tools: Docker, Kubernetes, Terraform (AWS, GCP)
+PERSONAL PROJECTS
+  Resume Builder
+  JSON to LaTeX to PDF pipeline with a job queue.
+  Tiny DB
+  An LSM tree in 2k lines.
+EDUCATION
+  State University
+  B.Sc. Computer Science                                          2019
+     CGPA: 3.8
+""".splitlines()
+
+LATEX_BOLD = {"JaneDoe", "AcmeCorp", "Initech", "Languages:", "Tools:", "ResumeBuilder", "TinyDB", "StateUniversity"}
+LATEX_LINKS = ["mailto:jane@example.com", "https://github.com/jane", "https://jane.dev"]
+
+
+def without_links(source: Path, dest: Path) -> Path:
+    """Copy of a PDF with its link annotations removed (text unchanged)."""
+    from pypdf import PdfReader, PdfWriter
+
+    writer = PdfWriter()
+    for page in PdfReader(str(source)).pages:
+        page.pop("/Annots", None)
+        writer.add_page(page)
+    with open(dest, "wb") as f:
+        writer.write(f)
+    return dest
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+def test_latex_layout_maps_onto_schema():
+    data = parse_layout(LATEX_LINES, LATEX_BOLD, LATEX_LINKS, filename="Jane_BE_2602.pdf")
+
+    assert list(Draft7Validator(SCHEMA).iter_errors(data)) == []
+    assert data["meta"] == {"code": "BE"}
+    assert data["basics"]["contact"] == {"phone": {"display": "+1 555-0100"}, "email": "jane@example.com"}
+    assert data["basics"]["profiles"]["github"] == {"network": "GitHub", "url": "https://github.com/jane"}
+    assert data["work"][0] == {
+        "company": "Acme Corp",
+        "location": "Berlin",
+        "position": "Senior Engineer",
+        "startDate": "Jan 2023",
+        "endDate": "Present",
+        "highlights": [
+            "Cut p99 latency by 40% by moving hot paths to a connection-pooled cache.",
+            "Led the queue migration.",
+        ],
+    }
+    assert "location" not in data["work"][1]
+    assert data["skills"][1]["keywords"] == ["Docker", "Kubernetes", "Terraform (AWS, GCP)"]
+    assert [p["name"] for p in data["projects"]] == ["Resume Builder", "Tiny DB"]
+    assert data["education"][0] == {
+        "institution": "State University",
+        "degree": "B.Sc. Computer Science",
+        "completionDate": "2019",
+        "score": {"label": "CGPA", "value": "3.8"},
+    }
+
+
+def test_inline_bold_is_restored():
+    lines = [line.replace("Led the queue migration.", "Led the queue migration to Mongo.") for line in LATEX_LINES]
+    emphasis = ["Jane Doe", "Acme Corp", "p99 latency by 40%", "queue mi gration"]
+
+    data = parse_layout(lines, LATEX_BOLD, LATEX_LINKS, filename="Jane_BE_2602.pdf", emphasis=emphasis)
+
+    assert data["work"][0]["highlights"] == [
+        "Cut **p99 latency by 40%** by moving hot paths to a connection-pooled cache.",
+        "Led the **queue migration** to Mongo.",
+    ]
+
+
+def test_unrecognized_layout_is_rejected():
+    lines = ["John Smith", "john@example.com", "EXPERIENCE", "Did things", "EDUCATION", "School"]
+
+    assert parse_layout(lines, set(), [], filename="John_SWE_2602.pdf") is None
+
+
+def test_unrecoverable_data_goes_to_the_model():
+    # No meta code in the filename
+    assert parse_layout(LATEX_LINES, LATEX_BOLD, LATEX_LINKS, filename="upload.pdf") is None
+    assert parse_layout(LATEX_LINES, LATEX_BOLD, LATEX_LINKS) is None
+    # A link on body text: its anchor can't be placed
+    links = LATEX_LINKS + ["https://example.com/billing"]
+    assert parse_layout(LATEX_LINES, LATEX_BOLD, links, filename="Jane_BE_2602.pdf") is None
+
+
+def test_generated_pdf_round_trips_to_its_source():
+    pytest.importorskip("pypdf")
+    source = json.loads(SOURCE_JSON.read_text(encoding="utf-8"))
+    lines, bold, links, emphasis = read_layout(GENERATED_PDF)
+
+    # The resume links project articles, so the whole file goes to the model
+    assert extract_template_resume(GENERATED_PDF) is None
+
+    # Everything else comes back exactly as written, **bold** included
+    header_links = links[:4]
+    data = parse_layout(lines, bold, header_links, filename="Aryan_FS_2601.pdf", emphasis=emphasis)
+    assert data["meta"] == source["meta"]
+    assert data["work"] == json.loads(MARKDOWN_LINK.sub(r"\1", json.dumps(source["work"])))
+    assert data["skills"] == source["skills"]
+    assert data["education"] == source["education"]
+    unlinked = [p for p in source["projects"] if not MARKDOWN_LINK.search(p["description"])]
+    assert unlinked and all(project in data["projects"] for project in unlinked)
+
+
+def test_template_pdf_round_trip(tmp_path):
+    pytest.importorskip("pypdf")
+    assert extract_template_resume(shutil.copy(TEMPLATE_PDF, tmp_path / "Aryan_BE_2602.pdf")) is None
+
+    data = extract_template_resume(without_links(TEMPLATE_PDF, tmp_path / "Aryan_BE_2602.pdf"))
+
+    assert data is not None
+    assert list(Draft7Validator(SCHEMA).iter_errors(data)) == []
+    assert data["meta"] == {"code": "BE"}
+    assert data["basics"]["name"]["full"] == "Aryan Walia"
+    assert [job["company"] for job in data["work"]] == ["E SOLUTIONS", "TICKETING AND SUPPORT SYSTEM"]
+    assert len(data["projects"]) == 4
+    assert data["education"][0]["score"] == {"label": "Cumulative CGPA", "value": "8.5"}
+
+
+def test_non_pdf_input_escalates(tmp_path):
+    bogus = tmp_path / "scan.pdf"
+    bogus.write_bytes(b"%PDF-1.5 not really")
+
+    assert extract_template_resume(bogus) is None
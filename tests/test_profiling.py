@@ -0,0 +1,81 @@
+"""
+tests/test_profiling.py
+-----------------------
+pytest suite for opt-in per-job profiling (src/profiling.py) and the
+profile summary in scripts/profile_job.py.
+
+Run: pytest tests/test_profiling.py -v
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.profile_job import print_pstats, summarize_folded
+from src.profiling import should_profile, start_profiler
+
+
+def busy_wait(seconds: float) -> None:
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+def test_should_profile_flagged_or_sampled_jobs():
+    assert should_profile({"profile": True}, sample_rate=0)
+    assert not should_profile({}, sample_rate=0, rand=lambda: pytest.fail("no draw when disabled"))
+    assert should_profile({}, sample_rate=0.1, rand=lambda: 0.05)
+    assert not should_profile({"profile": "yes"}, sample_rate=0.1, rand=lambda: 0.5)
+
+
+def test_sampling_profile_is_folded_stacks_of_the_job_thread():
+    profiler = start_profiler("sampling", interval=0.001)
+    busy_wait(0.1)
+    artifact = profiler.stop()
+
+    assert artifact.format == "folded" and artifact.extension == "folded"
+    assert artifact.samples > 10
+    text = artifact.data.decode("utf-8")
+    assert "test_sampling_profile_is_folded_stacks_of_the_job_thread (test_profiling.py:" in text
+    top = summarize_folded(text, top=50)
+    busy = next(row for row in top if row[0].startswith("busy_wait "))
+    assert busy[2] >= artifact.samples * 0.5
+    assert profiler.stop().samples == artifact.samples
+
+
+def test_cprofile_artifact_loads_as_pstats(capsys):
+    profiler = start_profiler("cprofile")
+    busy_wait(0.01)
+    artifact = profiler.stop()
+
+    assert artifact.format == "pstats" and artifact.extension == "prof"
+    print_pstats(artifact.data, top=5)
+    assert "busy_wait" in capsys.readouterr().out
+
+
+def test_concurrent_cprofile_jobs_fall_back_to_sampling():
+    first = start_profiler("cprofile")
+    try:
+        second = start_profiler("cprofile", interval=0.001)
+        busy_wait(0.01)
+        assert second.stop().format == "folded"
+    finally:
+        assert first.stop().format == "pstats"
+
+    # The slot is free again once the first job's profile is stopped
+    third = start_profiler("cprofile")
+    assert third.stop().format == "pstats"
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        start_profiler("perf")
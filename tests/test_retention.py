@@ -0,0 +1,175 @@
+"""
+tests/test_retention.py
+------------------------
+pytest suite for the retention sweeper: output/ and stored PDFs, and the
+generations archive (against mongomock).
+
+Run: pytest tests/test_retention.py -v
+"""
+
+import gzip
+import os
+import stat
+import sys
+import time
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import mongomock
+from bson import json_util
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import src.retention as retention
+from src.retention import RetentionSweeper
+
+
+# -----------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------
+
+def make_config(tmp_path: Path, **overrides) -> SimpleNamespace:
+    output = tmp_path / "output"
+    output.mkdir()
+    values = {
+        "OUTPUT_DIR": output,
+        "ARCHIVE_DIR": tmp_path / "archive",
+        "BUILD_DIR": tmp_path / "build",
+        "OUTPUT_RETENTION_DAYS": 30,
+        "OUTPUT_MAX_FILES": 0,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def make_pdf(directory: Path, name: str, age_days: float) -> Path:
+    path = directory / name
+    path.write_bytes(b"%PDF-1.5 test")
+    mtime = time.time() - age_days * 86400
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+def test_old_pdfs_are_swept(tmp_path):
+    config = make_config(tmp_path)
+    old = make_pdf(config.OUTPUT_DIR, "Aryan_BE_2501.pdf", age_days=60)
+    new = make_pdf(config.OUTPUT_DIR, "Aryan_BE_2602.pdf", age_days=1)
+
+    swept = RetentionSweeper(config).sweep_output()
+
+    assert swept == [old]
+    assert not old.exists() and new.exists()
+
+
+def test_max_files_keeps_newest(tmp_path):
+    config = make_config(tmp_path, OUTPUT_RETENTION_DAYS=0, OUTPUT_MAX_FILES=2)
+    paths = [make_pdf(config.OUTPUT_DIR, f"Aryan_FS_260{i}.pdf", age_days=5 - i) for i in range(4)]
+
+    RetentionSweeper(config).sweep_output()
+
+    assert [p.exists() for p in paths] == [False, False, True, True]
+
+
+def test_compact_moves_pdf_into_zip(tmp_path):
+    config = make_config(tmp_path)
+    old = make_pdf(config.OUTPUT_DIR, "Aryan_PI_2401.pdf", age_days=90)
+
+    RetentionSweeper(config).sweep_output(compact=True)
+
+    archives = list((config.ARCHIVE_DIR / "pdfs").glob("*.zip"))
+    assert len(archives) == 1
+    with zipfile.ZipFile(archives[0]) as zf:
+        assert zf.namelist() == ["Aryan_PI_2401.pdf"]
+    assert not old.exists()
+
+
+def test_dry_run_changes_nothing(tmp_path):
+    config = make_config(tmp_path)
+    old = make_pdf(config.OUTPUT_DIR, "Aryan_BE_2501.pdf", age_days=60)
+
+    swept = RetentionSweeper(config, dry_run=True).sweep_output()
+
+    assert swept == [old] and old.exists()
+
+
+def test_profiles_are_swept_and_counted_with_pdfs(tmp_path):
+    config = make_config(tmp_path, OUTPUT_MAX_FILES=2)
+    old_profile = make_pdf(config.OUTPUT_DIR, "profile_job-1.folded", age_days=60)
+    stats = make_pdf(config.OUTPUT_DIR, "profile_job-2.prof", age_days=3)
+    pdfs = [make_pdf(config.OUTPUT_DIR, f"Aryan_FS_260{i}.pdf", age_days=2 - i) for i in range(2)]
+    partial = make_pdf(config.OUTPUT_DIR, ".profile_job-3.folded.1a2b.part", age_days=90)
+    db = mongomock.MongoClient().db
+    db.generations.insert_one(
+        {"_id": "job-1", "profile_artifact": {"ref": "profile_job-1.folded", "storage": "local"}}
+    )
+
+    swept = RetentionSweeper(config, db).sweep_output(compact=True)
+
+    assert sorted(p.name for p in swept) == ["profile_job-1.folded", "profile_job-2.prof"]
+    assert not old_profile.exists() and not stats.exists()
+    assert all(p.exists() for p in pdfs) and partial.exists()
+    archived = []
+    for archive in (config.ARCHIVE_DIR / "profiles").glob("profiles-*.zip"):
+        with zipfile.ZipFile(archive) as zf:
+            archived += zf.namelist()
+    assert sorted(archived) == ["profile_job-1.folded", "profile_job-2.prof"]
+    assert not (config.ARCHIVE_DIR / "pdfs").exists()
+    profile = db.generations.find_one({"_id": "job-1"})["profile_artifact"]
+    assert profile["ref"] is None
+    assert profile["archive"].endswith(":profile_job-1.folded")
+
+
+def test_sweep_stored_clears_job_references(tmp_path):
+    removed_ids = ["file-a", "file-b"]
+    storage = SimpleNamespace(
+        name="gridfs",
+        ref_field="pdf_file_id",
+        job_value=lambda ref: f"oid:{ref}",
+        delete_older_than=lambda days: removed_ids if days == 30 else [],
+    )
+    updates = []
+    db = SimpleNamespace(generations=SimpleNamespace(update_many=lambda q, u: updates.append((q, u))))
+
+    count = RetentionSweeper(make_config(tmp_path), db, storage=storage).sweep_stored()
+
+    assert count == 2
+    assert updates == [
+        ({"pdf_file_id": {"$in": ["oid:file-a", "oid:file-b"]}}, {"$set": {"pdf_file_id": None}}),
+        (
+            {"profile_artifact.storage": "gridfs", "profile_artifact.ref": {"$in": ["file-a", "file-b"]}},
+            {"$set": {"profile_artifact.ref": None}},
+        ),
+    ]
+
+
+def test_archive_is_fsynced_before_jobs_are_deleted(tmp_path, monkeypatch):
+    db = mongomock.MongoClient().db
+    old = datetime.utcnow() - timedelta(days=40)
+    db.generations.insert_many([
+        {"_id": "done", "status": "COMPLETED", "updatedAt": old, "resume_data": {"big": True}},
+        {"_id": "recent", "status": "COMPLETED", "updatedAt": datetime.utcnow()},
+        {"_id": "queued", "status": "PENDING", "updatedAt": old},
+    ])
+    events = []
+    monkeypatch.setattr(retention.os, "fsync", lambda fd: events.append(
+        "fsync file" if stat.S_ISREG(os.fstat(fd).st_mode) else "fsync dir"
+    ))
+    delete_many = db.generations.delete_many
+    monkeypatch.setattr(db.generations, "delete_many", lambda q: events.append("delete") or delete_many(q))
+
+    count = RetentionSweeper(make_config(tmp_path), db).archive_generations(older_than_days=30)
+
+    assert count == 1
+    assert events.index("delete") > events.index("fsync file")
+    assert sorted(doc["_id"] for doc in db.generations.find()) == ["queued", "recent"]
+    [archive] = (tmp_path / "archive" / "generations").glob("*.jsonl.gz")
+    with gzip.open(archive, "rt", encoding="utf-8") as f:
+        [job] = [json_util.loads(line) for line in f]
+    assert job["_id"] == "done" and "resume_data" not in job
@@ -0,0 +1,87 @@
+"""
+tests/test_scheduler.py
+------------------------
+pytest suite for the priority / fair-share job scheduler.
+
+Run: pytest tests/test_scheduler.py -v
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.scheduler import FairScheduler, owner_of, parse_weights
+
+
+# -----------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------
+
+T0 = datetime(2026, 1, 1)
+
+
+def job(name: str, owner: str, minute: int, priority: int | None = None) -> dict:
+    doc = {"_id": name, "user_id": owner, "createdAt": T0 + timedelta(minutes=minute)}
+    if priority is not None:
+        doc["priority"] = priority
+    return doc
+
+
+def names(jobs: list[dict]) -> list[str]:
+    return [j["_id"] for j in jobs]
+
+
+# -----------------------------------------------------------------------
+# 1. Fair share
+# -----------------------------------------------------------------------
+
+def test_bulk_owner_does_not_starve_single_job():
+    bulk = [job(f"bulk{i}", "bulk", i) for i in range(50)]
+    solo = job("solo", "solo", 100)
+    picked = FairScheduler().order(bulk + [solo], limit=4)
+    assert "solo" in names(picked)[:2]
+
+
+def test_owner_jobs_stay_in_creation_order():
+    jobs = [job("a2", "a", 2), job("a1", "a", 1), job("b1", "b", 3)]
+    assert names(FairScheduler().order(jobs, limit=3)) == ["a1", "b1", "a2"]
+
+
+def test_weights_skew_the_share():
+    jobs = [job(f"a{i}", "a", i) for i in range(6)] + [job(f"b{i}", "b", i) for i in range(6)]
+    picked = FairScheduler(weights={"a": 2}).order(jobs, limit=6)
+    assert sum(1 for j in picked if j["user_id"] == "a") == 4
+
+
+# -----------------------------------------------------------------------
+# 2. Priority tiers
+# -----------------------------------------------------------------------
+
+def test_higher_priority_goes_first():
+    jobs = [job("old", "a", 0), job("urgent", "b", 10, priority=5)]
+    assert names(FairScheduler().order(jobs, limit=2)) == ["urgent", "old"]
+
+
+def test_limit_is_respected():
+    jobs = [job(f"j{i}", f"o{i}", i) for i in range(10)]
+    assert len(FairScheduler().order(jobs, limit=3)) == 3
+
+
+# -----------------------------------------------------------------------
+# 3. Helpers
+# -----------------------------------------------------------------------
+
+def test_owner_falls_back_to_resume_id():
+    assert owner_of({"_id": 1, "resume_id": "r1"}) == "r1"
+
+
+def test_parse_weights():
+    assert parse_weights("alice:3, bob:1") == {"alice": 3, "bob": 1}
+    assert parse_weights("") == {}
+    with pytest.raises(ValueError):
+        parse_weights("nocolon")
@@ -0,0 +1,131 @@
+"""
+tests/test_snapshots.py
+------------------------
+pytest suite for content-addressed resume snapshots (src/snapshots.py),
+against an in-memory mongomock database.
+
+Run: pytest tests/test_snapshots.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import mongomock
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.snapshots import SnapshotNotFoundError, SnapshotStore, content_hash
+
+
+# -----------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------
+
+RESUME = {"meta": {"code": "SWE"}, "basics": {"name": {"full": "Jane Doë"}}}
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient().db
+
+
+# -----------------------------------------------------------------------
+# 1. Content hashes
+# -----------------------------------------------------------------------
+
+def test_hash_ignores_key_order_but_not_content():
+    reordered = {"basics": {"name": {"full": "Jane Doë"}}, "meta": {"code": "SWE"}}
+    assert content_hash(reordered) == content_hash(RESUME)
+    assert content_hash({**RESUME, "meta": {"code": "PM"}}) != content_hash(RESUME)
+
+
+def test_hash_is_stable_across_releases():
+    # Stored hashes key existing snapshots, and the app hashes the same
+    # canonical JSON: {"a":"é","b":[1,2.5,null]} as UTF-8
+    assert content_hash({"b": [1, 2.5, None], "a": "é"}) == (
+        "d764fee2563da33e3d57334755404e635da33c995824b0adfabc4b6e1af4f608"
+    )
+
+
+def test_identical_payloads_are_stored_once(db):
+    store = SnapshotStore(db)
+    first = store.put("r1", 1, RESUME)
+    second = store.put("r1", 2, dict(RESUME))
+
+    assert first == second == content_hash(RESUME)
+    assert db.resume_snapshots.count_documents({}) == 1
+    assert db.resumeversions.count_documents({"content_hash": first}) == 2
+
+
+# -----------------------------------------------------------------------
+# 2. Resolving jobs
+# -----------------------------------------------------------------------
+
+def test_resolve_prefers_embedded_data(db):
+    job = {"resume_data": RESUME, "content_hash": "missing", "resume_id": "r1", "version_number": 9}
+    assert SnapshotStore(db).resolve(job) is RESUME
+
+
+def test_resolve_by_hash_reference(db):
+    digest = SnapshotStore(db).store(RESUME)
+    assert SnapshotStore(db).resolve({"content_hash": digest}) == RESUME
+
+
+def test_resolve_by_version_reference(db):
+    SnapshotStore(db).put("r1", 3, RESUME)
+    # Versions written by older clients carry only their data
+    db.resumeversions.insert_one({"resume_id": "r1", "version_number": 4, "data": {"meta": {"code": "PM"}}})
+    store = SnapshotStore(db)
+
+    assert store.resolve({"resume_id": "r1", "version_number": 3}) == RESUME
+    assert store.resolve({"resume_id": "r1", "version_number": 4}) == {"meta": {"code": "PM"}}
+    # Cached: the second lookup of a version doesn't query resumeversions
+    db.resumeversions.delete_many({})
+    assert store.resolve({"resume_id": "r1", "version_number": 3}) == RESUME
+
+
+def test_data_only_versions_survive_lru_eviction(db):
+    db.resumeversions.insert_many([
+        {"resume_id": "r1", "version_number": 1, "data": {"meta": {"code": "A"}}},
+        {"resume_id": "r2", "version_number": 1, "data": {"meta": {"code": "B"}}},
+    ])
+    store = SnapshotStore(db, cache_size=1)
+
+    store.get("r1", 1)
+    store.get("r2", 1)  # evicts r1's payload
+    assert store.get("r1", 1) == {"meta": {"code": "A"}}
+
+
+def test_resolve_reports_missing_payloads(db):
+    store = SnapshotStore(db)
+    with pytest.raises(SnapshotNotFoundError):
+        store.resolve({"resume_id": "r1"})
+    with pytest.raises(SnapshotNotFoundError):
+        store.resolve({"resume_id": "r1", "version_number": 1})
+    with pytest.raises(SnapshotNotFoundError):
+        store.resolve({"content_hash": "0" * 64})
+
+
+# -----------------------------------------------------------------------
+# 3. Payload cache
+# -----------------------------------------------------------------------
+
+def test_get_by_hash_is_an_lru(db):
+    payloads = [{"meta": {"code": code}} for code in ("A", "B", "C")]
+    a, b, c = (SnapshotStore(db).store(data) for data in payloads)
+    store = SnapshotStore(db, cache_size=2)
+
+    store.get_by_hash(a)
+    store.get_by_hash(b)
+    store.get_by_hash(a)  # a is now the most recently used
+    store.get_by_hash(c)  # evicts b
+    assert (store.hits, store.misses) == (1, 3)
+
+    db.resume_snapshots.delete_many({})
+    assert store.get_by_hash(a) == payloads[0]
+    assert store.get_by_hash(c) == payloads[2]
+    with pytest.raises(SnapshotNotFoundError):
+        store.get_by_hash(b)
+    assert store.hits == 3
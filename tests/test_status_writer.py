@@ -0,0 +1,165 @@
+"""
+tests/test_status_writer.py
+----------------------------
+pytest suite for the buffered terminal-status writer.
+
+Run: pytest tests/test_status_writer.py -v
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.status_writer import StatusWriter
+
+
+# -----------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------
+
+class BulkResult:
+    def __init__(self, matched: int):
+        self.matched_count = matched
+
+
+class RecordingCollection:
+    def __init__(self, fail_times: int = 0):
+        self.batches: list[list] = []
+        self.fail_times = fail_times
+
+    def bulk_write(self, ops, ordered=True):
+        assert ordered is False
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("primary stepped down")
+        self.batches.append(list(ops))
+        return BulkResult(len(ops))
+
+
+class LeaseCollection(RecordingCollection):
+    """Applies only the updates of jobs in `held`; find() reports which those were."""
+
+    def __init__(self, held):
+        super().__init__()
+        self.held = set(held)
+
+    def bulk_write(self, ops, ordered=True):
+        super().bulk_write(ops, ordered)
+        return BulkResult(sum(o._filter["_id"] in self.held for o in ops))
+
+    def find(self, query, projection=None):
+        return [{"_id": check["_id"]} for check in query["$or"] if check["_id"] in self.held]
+
+
+class RejectingCollection(RecordingCollection):
+    """Rejects the update at `index`; the rest of the unordered batch is applied."""
+
+    def __init__(self, index: int):
+        super().__init__()
+        self.index = index
+
+    def bulk_write(self, ops, ordered=True):
+        super().bulk_write(ops, ordered)
+        raise BulkWriteError({
+            "writeErrors": [{"index": self.index, "code": 121, "errmsg": "Document failed validation"}],
+            "nMatched": len(ops) - 1,
+        })
+
+
+def op(job_id) -> UpdateOne:
+    return UpdateOne({"_id": job_id}, {"$set": {"status": "COMPLETED"}})
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+def test_flush_writes_one_bulk_and_reports_ids():
+    coll = RecordingCollection()
+    flushed = []
+    writer = StatusWriter(coll, on_flushed=lambda applied, lost: flushed.append((applied, lost)))
+    for i in range(3):
+        writer.submit(i, op(i))
+    assert writer.flush() == 3
+    assert len(coll.batches) == 1 and len(coll.batches[0]) == 3
+    assert flushed == [([0, 1, 2], [])]
+
+
+def test_failed_flush_keeps_updates_for_retry():
+    coll = RecordingCollection(fail_times=1)
+    writer = StatusWriter(coll)
+    writer.submit(1, op(1))
+    with pytest.raises(ConnectionError):
+        writer.flush()
+    assert writer.flush() == 1
+
+
+def test_only_updates_that_matched_are_reported_applied():
+    coll = LeaseCollection(held={1, 3})
+    flushed = []
+    writer = StatusWriter(coll, on_flushed=lambda applied, lost: flushed.append((applied, lost)))
+    for i in range(1, 4):
+        writer.submit(i, op(i), applied={"_id": i, "finished_claim": f"t{i}"})
+
+    assert writer.flush() == 2
+    assert flushed == [([1, 3], [2])]
+
+
+def test_rejected_update_is_dropped_not_retried(capsys):
+    coll = RejectingCollection(index=1)
+    flushed = []
+    writer = StatusWriter(coll, on_flushed=lambda applied, lost: flushed.append((applied, lost)))
+    for i in range(3):
+        writer.submit(i, op(i))
+
+    assert writer.flush() == 2
+    assert flushed == [([0, 2], [1])]
+    assert "job 1 rejected: Document failed validation" in capsys.readouterr().out
+    # Nothing was put back
+    assert writer.flush() == 0 and len(coll.batches) == 1
+
+
+def test_non_transient_error_drops_the_batch():
+    class UnencodableCollection(RecordingCollection):
+        def bulk_write(self, ops, ordered=True):
+            raise TypeError("cannot encode object")
+
+    coll = UnencodableCollection()
+    flushed = []
+    writer = StatusWriter(coll, on_flushed=lambda applied, lost: flushed.append((applied, lost)))
+    writer.submit(1, op(1))
+
+    assert writer.flush() == 0
+    assert flushed == [([], [1])]
+    assert writer.flush() == 0
+
+
+def test_background_flush_on_batch_size():
+    coll = RecordingCollection()
+    writer = StatusWriter(coll, max_batch=2, max_delay=60)
+    writer.start()
+    try:
+        writer.submit(1, op(1))
+        writer.submit(2, op(2))
+        deadline = time.monotonic() + 2
+        while not coll.batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(coll.batches) == 1
+    finally:
+        writer.close()
+
+
+def test_close_flushes_remaining():
+    coll = RecordingCollection()
+    writer = StatusWriter(coll, max_batch=100, max_delay=60)
+    writer.start()
+    writer.submit(1, op(1))
+    writer.close()
+    assert sum(len(b) for b in coll.batches) == 1
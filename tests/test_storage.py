@@ -0,0 +1,264 @@
+"""
+tests/test_storage.py
+---------------------
+pytest suite for the artifact storage backends: the local filesystem
+backend, and the GridFS and S3 backends against in-memory stand-ins.
+
+Run: pytest tests/test_storage.py -v
+"""
+
+import io
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.main import get_unique_output_name
+from src.storage import ArtifactNotFoundError, ArtifactStorage, GridFSStorage, LocalStorage, S3Storage
+
+
+# -----------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------
+
+class MissingKey(Exception):
+    """Shaped like botocore's ClientError for a missing object."""
+
+    def __init__(self):
+        super().__init__("Not Found")
+        self.response = {"Error": {"Code": "404"}}
+
+
+class FakeBody:
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+        self.closed = False
+
+    def iter_chunks(self, chunk_size):
+        while chunk := self._stream.read(chunk_size):
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeS3Client:
+    """The handful of boto3 S3 client calls S3Storage makes, kept in memory."""
+
+    def __init__(self):
+        self.objects: dict[str, dict] = {}
+
+    def upload_fileobj(self, source, bucket, key, ExtraArgs=None):
+        self.objects[key] = {
+            "data": source.read(),
+            "LastModified": datetime.now(timezone.utc),
+            "ExtraArgs": ExtraArgs,
+        }
+
+    def download_fileobj(self, bucket, key, destination):
+        if key not in self.objects:
+            raise MissingKey()
+        destination.write(self.objects[key]["data"])
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise MissingKey()
+        return {"Body": FakeBody(self.objects[Key]["data"])}
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise MissingKey()
+        return {}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def get_paginator(self, name):
+        client = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                contents = [
+                    {"Key": key, "LastModified": obj["LastModified"]}
+                    for key, obj in sorted(client.objects.items())
+                    if key.startswith(Prefix)
+                ]
+                yield {"Contents": contents}
+
+        return Paginator()
+
+
+class FakeGridFSBucket:
+    """GridFSBucket.find() over a list of stored files."""
+
+    def __init__(self, files: list[dict]):
+        self.files = files
+
+    def find(self, filter, limit=0):
+        matches = [
+            SimpleNamespace(**f) for f in self.files
+            if all(f.get(field) == value for field, value in filter.items())
+        ]
+        return matches[:limit] if limit else matches
+
+
+def make_gridfs(files: list[dict]) -> GridFSStorage:
+    storage = GridFSStorage.__new__(GridFSStorage)
+    storage.bucket = FakeGridFSBucket(files)
+    return storage
+
+
+def make_pdf(directory: Path, name: str = "Aryan_BE_2602.pdf", size: int = 600_000) -> Path:
+    path = directory / name
+    path.write_bytes(b"%PDF-1.5\n" + b"x" * size)
+    return path
+
+
+# -----------------------------------------------------------------------
+# Local filesystem
+# -----------------------------------------------------------------------
+
+def test_local_save_streams_into_root(tmp_path):
+    source = make_pdf(tmp_path)
+    storage = LocalStorage(tmp_path / "output")
+
+    ref = storage.save(source)
+
+    assert ref == "Aryan_BE_2602.pdf"
+    assert (tmp_path / "output" / ref).read_bytes() == source.read_bytes()
+    assert b"".join(storage.iter_chunks(ref)) == source.read_bytes()
+    assert list(storage.iter_artifacts()) == [(ref, ref)]
+    assert storage.job_fields(ref) == {"pdf_path": "/output/Aryan_BE_2602.pdf"}
+    assert storage.ref_from_job({"pdf_path": "/output/Aryan_BE_2602.pdf"}) == ref
+    # No partial files left behind
+    assert [p.name for p in (tmp_path / "output").iterdir()] == [ref]
+
+
+def test_local_refs_cannot_escape_root(tmp_path):
+    storage = LocalStorage(tmp_path / "output")
+    storage.save_stream(io.BytesIO(b"%PDF"), "../../etc/evil.pdf")
+
+    assert (tmp_path / "output" / "evil.pdf").exists()
+    assert not (tmp_path / "etc").exists()
+
+
+def test_local_missing_artifact(tmp_path):
+    storage = LocalStorage(tmp_path / "output")
+
+    assert not storage.exists("nope.pdf")
+    with pytest.raises(ArtifactNotFoundError):
+        list(storage.iter_chunks("nope.pdf"))
+
+
+def test_local_open_local_under_another_name(tmp_path):
+    storage = LocalStorage(tmp_path / "output")
+    ref = storage.save_stream(io.BytesIO(b"%PDF upload"), "65f0c0ffee.pdf")
+
+    with storage.open_local(ref) as path:
+        assert path == tmp_path / "output" / ref
+    with storage.open_local(ref, filename="Aryan_BE_2602.pdf") as path:
+        assert path.name == "Aryan_BE_2602.pdf"
+        assert path.read_bytes() == b"%PDF upload"
+    assert not path.exists()
+    assert (tmp_path / "output" / ref).exists()
+
+
+def test_local_unique_names_skip_existing_files(tmp_path):
+    storage = LocalStorage(tmp_path / "output")
+    storage.save(make_pdf(tmp_path, "Aryan_BE_2602.pdf"))
+    storage.save(make_pdf(tmp_path, "Aryan_BE_2602_v1.pdf"))
+
+    assert storage.exists_name("Aryan_BE_2602.pdf")
+    assert get_unique_output_name(storage, "Aryan_BE_2602", ".pdf") == "Aryan_BE_2602_v2.pdf"
+
+
+# -----------------------------------------------------------------------
+# GridFS
+# -----------------------------------------------------------------------
+
+def test_gridfs_names_are_looked_up_by_filename():
+    file_id = ObjectId()
+    storage = make_gridfs([{"_id": file_id, "filename": "Aryan_BE_2602.pdf"}])
+
+    # Refs are ObjectIds; filenames must not be parsed as one
+    assert storage.exists(str(file_id))
+    assert storage.exists_name("Aryan_BE_2602.pdf")
+    assert not storage.exists_name("Aryan_BE_2603.pdf")
+    assert get_unique_output_name(storage, "Aryan_BE_2602", ".pdf") == "Aryan_BE_2602_v1.pdf"
+
+
+# -----------------------------------------------------------------------
+# S3-compatible
+# -----------------------------------------------------------------------
+
+def test_s3_round_trip(tmp_path):
+    client = FakeS3Client()
+    storage = S3Storage("resumes", prefix="pdfs/", client=client)
+    source = make_pdf(tmp_path)
+
+    ref = storage.save(source, metadata={"job_id": 42})
+
+    assert ref == "pdfs/Aryan_BE_2602.pdf"
+    assert client.objects[ref]["ExtraArgs"]["Metadata"] == {"job_id": "42"}
+    assert client.objects[ref]["ExtraArgs"]["ContentType"] == "application/pdf"
+    assert storage.exists(ref)
+    assert list(storage.iter_artifacts()) == [(ref, "Aryan_BE_2602.pdf")]
+    assert storage.job_fields(ref) == {"pdf_path": None, "pdf_key": ref}
+
+    out = io.BytesIO()
+    storage.download_to(ref, out)
+    assert out.getvalue() == source.read_bytes()
+    assert b"".join(storage.iter_chunks(ref)) == source.read_bytes()
+
+
+def test_s3_open_local_downloads_to_temp_file(tmp_path):
+    storage = S3Storage("resumes", client=FakeS3Client())
+    ref = storage.save(make_pdf(tmp_path))
+
+    with storage.open_local(ref) as path:
+        assert path.name == "Aryan_BE_2602.pdf"
+        assert path.read_bytes().startswith(b"%PDF")
+    assert not path.exists()
+
+
+def test_s3_missing_and_expired_objects(tmp_path):
+    client = FakeS3Client()
+    storage = S3Storage("resumes", client=client)
+    old = storage.save(make_pdf(tmp_path, "Aryan_PI_2401.pdf"))
+    new = storage.save(make_pdf(tmp_path, "Aryan_PI_2602.pdf"))
+    client.objects[old]["LastModified"] -= timedelta(days=60)
+
+    assert not storage.exists("missing.pdf")
+    with pytest.raises(ArtifactNotFoundError):
+        storage.download_to("missing.pdf", io.BytesIO())
+
+    assert storage.delete_older_than(30) == [old]
+    assert list(client.objects) == [new]
+
+
+def test_s3_names_are_looked_up_under_the_prefix(tmp_path):
+    storage = S3Storage("resumes", prefix="pdfs/", client=FakeS3Client())
+    storage.save(make_pdf(tmp_path, "Aryan_BE_2602.pdf"))
+
+    assert storage.exists_name("Aryan_BE_2602.pdf")
+    assert not storage.exists("Aryan_BE_2602.pdf")
+    assert get_unique_output_name(storage, "Aryan_BE_2602", ".pdf") == "Aryan_BE_2602_v1.pdf"
+
+
+# -----------------------------------------------------------------------
+# Interface
+# -----------------------------------------------------------------------
+
+def test_backends_must_implement_the_interface():
+    class Incomplete(ArtifactStorage):
+        def save_stream(self, source, name, metadata=None, content_type="application/pdf"):
+            return name
+
+    with pytest.raises(TypeError, match="iter_chunks"):
+        Incomplete()
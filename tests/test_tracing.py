@@ -0,0 +1,76 @@
+"""
+tests/test_tracing.py
+---------------------
+pytest suite for per-job stage timings (src/tracing.py).
+
+Run: pytest tests/test_tracing.py -v
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.generator import ResumeGenerator
+from src.tracing import current_trace, span, trace, traced
+
+
+# -----------------------------------------------------------------------
+# Tests
+# -----------------------------------------------------------------------
+
+def test_spans_are_summed_per_stage():
+    with trace() as job_trace:
+        for _ in range(2):
+            with span("pdflatex_pass"):
+                time.sleep(0.01)
+        with span("drive_upload"):
+            pass
+
+    document = job_trace.as_document()
+    assert list(document) == ["total_ms", "pdflatex_pass_ms", "drive_upload_ms"]
+    assert document["pdflatex_pass_ms"] >= 20
+    assert document["total_ms"] >= document["pdflatex_pass_ms"]
+    assert current_trace() is None
+
+
+def test_spans_outside_a_trace_are_no_ops():
+    @traced("lookup")
+    def lookup():
+        return 42
+
+    with span("orphan"):
+        assert lookup() == 42
+    assert current_trace() is None
+
+
+def test_render_stages_are_recorded_deep_in_the_call_stack():
+    data = json.loads((PROJECT_ROOT / "data" / "fs_resume.json").read_text(encoding="utf-8"))
+
+    with trace() as job_trace:
+        ResumeGenerator().generate_tex_from_data(data)
+
+    assert set(job_trace.stages()) == {"sanitize", "render"}
+
+
+def test_concurrent_jobs_keep_separate_traces():
+    documents = {}
+
+    def job(name: str, delay: float):
+        with trace() as job_trace:
+            with span(name):
+                time.sleep(delay)
+        documents[name] = job_trace.as_document()
+
+    threads = [threading.Thread(target=job, args=(f"job{i}", 0.01)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name, document in documents.items():
+        assert set(document) == {"total_ms", f"{name}_ms"}
@@ -0,0 +1,277 @@
+"""
+tests/test_worker.py
+---------------------
+pytest suite for ResumeWorker's change-stream handling and job threads, on
+a worker built without a database connection (only the attributes each
+test needs).
+
+Run: pytest tests/test_worker.py -v
+"""
+
+import io
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+from pymongo import UpdateOne
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import src.worker as worker_module
+from src.coordination import Partitioner
+from src.metrics import WorkerMetrics
+from src.status_writer import StatusWriter
+from src.storage import LocalStorage
+from src.worker import ResumeWorker, _stop_on_sigterm
+
+
+# -----------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------
+
+class Stop(BaseException):
+    """Ends the watch loop, which retries on any Exception."""
+
+
+class FailingStream:
+    """Opens fine, then errors on the first read."""
+
+    alive = True
+    resume_token = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def try_next(self):
+        raise ConnectionError("stream dropped")
+
+
+class OneEventStream(FailingStream):
+    """Delivers one insert event, stays quiet past the batch window, then errors."""
+
+    def __init__(self):
+        self.events = [{"documentKey": {"_id": "job-1"}}]
+        self.quiet_until = None
+
+    def try_next(self):
+        if self.events:
+            self.quiet_until = time.monotonic() + 0.05
+            return self.events.pop()
+        if time.monotonic() < self.quiet_until:
+            return None
+        raise ConnectionError("stream dropped")
+
+
+def make_worker(index: int = 0, count: int = 1) -> ResumeWorker:
+    worker = ResumeWorker.__new__(ResumeWorker)
+    worker.config = SimpleNamespace(
+        WORKER_BATCH_WINDOW_MS=10, WORKER_BATCH_SIZE=10, STREAM_RECONNECT_MAX_SECONDS=5,
+    )
+    worker.db = mongomock.MongoClient().db
+    worker.queue = SimpleNamespace(partitioner=Partitioner(index=index, count=count))
+    worker._sweep_requested = SimpleNamespace(is_set=lambda: False)
+    worker._sweep_backlog = lambda: None
+    return worker
+
+
+# -----------------------------------------------------------------------
+# 1. Resume tokens
+# -----------------------------------------------------------------------
+
+def test_resume_token_is_kept_per_partition():
+    first, second = make_worker(0, 2), make_worker(1, 2)
+    second.db = first.db
+
+    first._save_resume_token({"_data": "a"})
+    second._save_resume_token({"_data": "b"})
+
+    assert first._load_resume_token() == {"_data": "a"}
+    assert second._load_resume_token() == {"_data": "b"}
+
+
+# -----------------------------------------------------------------------
+# 2. Reconnect backoff
+# -----------------------------------------------------------------------
+
+def test_stream_that_fails_after_opening_keeps_backing_off(monkeypatch):
+    worker = make_worker()
+    worker.db.generations.watch = lambda *args, **kwargs: FailingStream()
+    delays = []
+
+    def sleep(seconds):
+        delays.append(seconds)
+        if len(delays) == 4:
+            raise Stop
+
+    monkeypatch.setattr(worker_module.time, "sleep", sleep)
+    with pytest.raises(Stop):
+        worker._watch_live_jobs()
+
+    assert delays == [0.2, 0.4, 0.8, 1.6]
+
+
+def test_an_event_resets_the_backoff(monkeypatch):
+    worker = make_worker()
+    worker.db.generations.watch = lambda *args, **kwargs: OneEventStream()
+    worker._owns_event = lambda change: True
+    drains, delays = [], []
+
+    def drain(source):
+        drains.append(source)
+        if len(drains) == 3:
+            raise Stop
+
+    def sleep(seconds):
+        delays.append(seconds)
+        raise Stop
+
+    worker._drain_pending = drain
+    monkeypatch.setattr(worker_module.time, "sleep", sleep)
+    with pytest.raises(Stop):
+        worker._watch_live_jobs()
+
+    # Each reconnect after a working stream is immediate
+    assert delays == []
+
+
+# -----------------------------------------------------------------------
+# 3. Job threads
+# -----------------------------------------------------------------------
+
+def test_crashed_job_thread_is_logged_and_released(capsys):
+    worker = make_worker()
+    worker._slots = threading.BoundedSemaphore(1)
+    worker._slots.acquire()
+    worker._in_flight, worker._in_flight_lock = {"job-1"}, threading.Lock()
+    worker._completed = {}
+
+    def crash(job):
+        raise RuntimeError("profiler exploded")
+
+    worker._process_job = crash
+    worker._run_job({"_id": "job-1"})
+
+    captured = capsys.readouterr()
+    assert "Job thread crashed: job-1" in captured.out
+    assert "profiler exploded" in captured.err
+    # Slot freed; no longer heartbeated, so the reaper can re-queue it
+    assert worker._slots.acquire(blocking=False)
+    assert worker._in_flight == set()
+
+
+def test_success_is_logged_once_the_status_is_written(capsys):
+    worker = make_worker()
+    worker._in_flight, worker._in_flight_lock = {"job-1", "job-2"}, threading.Lock()
+    worker._completed = {"job-1": ("Jane_SWE_2601", "total 812 ms")}
+    jobs = SimpleNamespace(bulk_write=lambda ops, ordered: SimpleNamespace(matched_count=len(ops)))
+    writer = StatusWriter(jobs, on_flushed=worker._release_jobs)
+
+    writer.submit("job-1", UpdateOne({"_id": "job-1"}, {"$set": {"status": "COMPLETED"}}))
+    writer.submit("job-2", UpdateOne({"_id": "job-2"}, {"$set": {"status": "FAILED"}}))
+    assert "[SUCCESS]" not in capsys.readouterr().out
+
+    writer.flush()
+    out = capsys.readouterr().out
+    assert out.count("[SUCCESS] Job COMPLETED: Jane_SWE_2601") == 1
+    assert "[TIMING] total 812 ms" in out
+    assert worker._in_flight == set() and worker._completed == {}
+
+
+def test_no_success_for_a_completion_that_lost_its_lease(capsys):
+    worker = make_worker()
+    worker._in_flight, worker._in_flight_lock = {"job-1"}, threading.Lock()
+    worker._completed = {"job-1": ("Jane_SWE_2601", "total 812 ms")}
+
+    worker._release_jobs([], ["job-1"])
+
+    out = capsys.readouterr().out
+    assert "[SUCCESS]" not in out and "Jane_SWE_2601" in out
+    assert worker._in_flight == set() and worker._completed == {}
+
+
+class CountingProfiler:
+    def __init__(self):
+        self.stops = 0
+
+    def stop(self):
+        self.stops += 1
+        return SimpleNamespace(
+            data=b"main;work 3\n", extension="folded", format="folded", samples=3, content_type="text/plain"
+        )
+
+
+def make_job_worker(tmp_path, completion_op) -> ResumeWorker:
+    """A worker whose _process_job runs with fakes for everything but storage and tracing."""
+    worker = make_worker()
+    worker.config.BUILD_DIR = tmp_path / "build"
+    worker.storage = LocalStorage(tmp_path / "output")
+    worker.snapshots = SimpleNamespace(resolve=lambda job: {"meta": {"code": "SWE"}})
+    worker.generator = SimpleNamespace(generate_tex_from_data=lambda data: "\\documentclass{article}")
+
+    def compile_tex(tex_path):
+        pdf_path = tex_path.with_suffix(".pdf")
+        pdf_path.write_bytes(b"%PDF-1.5")
+        return pdf_path
+
+    worker.compiler = SimpleNamespace(compile_tex=compile_tex)
+    worker._uploader_for = lambda job: None
+    worker.profiler = CountingProfiler()
+    worker._start_profiler = lambda job: worker.profiler
+    worker.queue = SimpleNamespace(completion_op=completion_op, completed_filter=lambda job: {"_id": job["_id"]})
+    worker.submitted = []
+    worker.status_writer = SimpleNamespace(submit=lambda job_id, op, applied: worker.submitted.append(op))
+    worker.metrics = WorkerMetrics()
+    worker._in_flight_lock, worker._completed = threading.Lock(), {}
+    return worker
+
+
+def test_failure_while_recording_completion_is_not_reported_as_success(tmp_path):
+    def completion_op(job, fields):
+        if fields["status"] == "COMPLETED":
+            raise ValueError("cannot encode drive_link")
+        return fields
+
+    worker = make_job_worker(tmp_path, completion_op)
+    worker._process_job({"_id": "job-1", "output_filename": "Jane_SWE_2601"})
+
+    assert [op["status"] for op in worker.submitted] == ["FAILED"]
+    assert worker._completed == {}
+    # Stopped once; the profile saved before the failure is kept on the FAILED job
+    assert worker.profiler.stops == 1
+    assert worker.submitted[0]["profile_artifact"]["samples"] == 3
+
+
+def test_imported_pdf_keeps_its_upload_name(tmp_path):
+    worker = make_worker()
+    worker.storage = LocalStorage(tmp_path)
+    ref = worker.storage.save_stream(io.BytesIO(b"%PDF upload"), "upload-7f3a.pdf")
+    worker._get_importer = lambda: SimpleNamespace(parse=lambda path: path.name)
+
+    job = {"_id": "job-1", "source_pdf": ref, "source_filename": "cv/Aryan_BE_2602.pdf"}
+    assert worker._import_source_pdf(job) == "Aryan_BE_2602.pdf"
+    # Without one, the stored name (never the job id)
+    assert worker._import_source_pdf({"_id": "job-2", "source_pdf": ref}) == "upload-7f3a.pdf"
+
+
+# -----------------------------------------------------------------------
+# 4. Shutdown
+# -----------------------------------------------------------------------
+
+def test_sigterm_shuts_down_like_ctrl_c():
+    previous = signal.signal(signal.SIGTERM, _stop_on_sigterm)
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            os.kill(os.getpid(), signal.SIGTERM)
+            time.sleep(1)
+    finally:
+        signal.signal(signal.SIGTERM, previous)